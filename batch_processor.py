@@ -0,0 +1,40 @@
+# batch_processor.py
+"""
+Procesamiento por lotes sin interacción (ej. corridas nocturnas).
+
+    python batch_processor.py data/raw/ --output results/ --workers 4
+
+Si la corrida se interrumpe, repetir el mismo comando retoma donde quedó.
+"""
+
+import argparse
+
+from src.processing.batch import discover_surveys, run_batch
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GIF - Procesamiento por lotes de levantamientos")
+    parser.add_argument("inputs", nargs="+",
+                        help="Archivos .raw o carpetas que los contienen")
+    parser.add_argument("--output", default="results",
+                        help="Carpeta de resultados (.npz por levantamiento + manifiesto)")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Levantamientos procesados en paralelo")
+    parser.add_argument("--omp-threads", type=int, default=None,
+                        help="Hilos OpenMP por proceso (por defecto: núcleos / procesos)")
+    parser.add_argument("--channels", type=int, default=24)
+    parser.add_argument("--fs", type=float, default=24000)
+    parser.add_argument("--segment-sec", type=float, default=0.5)
+    parser.add_argument("--memory-mb", type=float, default=512,
+                        help="Presupuesto de memoria por proceso para los bloques")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Ignora el manifiesto y reprocesa todo")
+    args = parser.parse_args()
+
+    surveys = discover_surveys(args.inputs)
+    if not surveys:
+        parser.error("No se encontraron archivos .raw en las rutas indicadas")
+
+    run_batch(surveys, args.output, n_workers=args.workers, omp_threads=args.omp_threads,
+              resume=not args.no_resume, n_channels=args.channels, fs=args.fs,
+              segment_sec=args.segment_sec, memory_budget_mb=args.memory_mb)
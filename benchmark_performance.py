@@ -1,11 +1,29 @@
 # benchmark_performance.py
+"""
+Benchmarks de rendimiento con línea base y detección de regresiones.
 
+    python benchmark_performance.py                      # barrido completo -> build/benchmarks/
+    python benchmark_performance.py --quick              # un tamaño por kernel
+    python benchmark_performance.py --save-baseline      # guarda el resultado como línea base
+    python benchmark_performance.py --baseline build/benchmarks/baseline.json --threshold 0.1
+    python benchmark_performance.py --chart              # gráfico Python vs C++ del filtro
+
+Con --baseline el proceso termina con código 1 si hay regresiones (para CI).
+"""
+
+import argparse
+import os
+import sys
 import time
 import numpy as np
 from src.processing.stream_filters import GeophysicalStreamFilter
-from src.visualization.plots import plot_benchmark_results
+
+BENCH_DIR = os.path.join("build", "benchmarks")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
 
 def run_benchmark():
+    from src.visualization.plots import plot_benchmark_results
+
     FS = 1000
     N_SAMPLES = 2_000_000 # Aumentamos muestras para notar la diferencia
     N_ITERATIONS = 50      # Promediamos 50 ejecuciones
@@ -41,5 +59,59 @@ def run_benchmark():
     
     plot_benchmark_results(avg_py, avg_cpp, N_SAMPLES)
 
+def run_suite_cli(args):
+    from src.processing.benchmark import (BENCHMARKS, compare_meta, compare_results, load_results,
+                                          print_comparison, run_suite, save_results)
+
+    kernels = args.kernels or BENCHMARKS
+    if args.quick:
+        sweep = {"channels": (24,), "samples": (12000,), "threads": None, "repeats": 5}
+    else:
+        sweep = {"channels": tuple(args.channels), "samples": tuple(args.samples),
+                 "threads": tuple(args.threads) if args.threads else None, "repeats": args.repeats}
+    print(f"--- Suite de benchmarks: {', '.join(kernels)} ---")
+    report = run_suite(kernels=kernels, **sweep)
+
+    output = args.output or os.path.join(BENCH_DIR, time.strftime("bench_%Y%m%d_%H%M%S.json"))
+    save_results(report, output)
+    print(f"[OK] Resultados guardados en {output}")
+    if args.save_baseline:
+        save_results(report, args.save_baseline)
+        print(f"[OK] Línea base actualizada: {args.save_baseline}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"[!] No existe la línea base {args.baseline}; usa --save-baseline primero")
+            return 2
+        baseline = load_results(args.baseline)
+        rows = compare_results(report, baseline, args.threshold)
+        n_reg = print_comparison(rows, args.threshold, meta_diff=compare_meta(report, baseline))
+        return 1 if n_reg else 0
+    return 0
+
 if __name__ == "__main__":
-    run_benchmark()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="GIF - Benchmarks de rendimiento")
+    parser.add_argument("--chart", action="store_true",
+                        help="Solo el gráfico Python vs C++ del filtro de un canal")
+    parser.add_argument("--kernels", nargs="+", default=None,
+                        help="Subconjunto: load filter spectrum stacking interpolation workflow master")
+    parser.add_argument("--quick", action="store_true",
+                        help="Un solo tamaño (24 canales x 12000 muestras) por kernel")
+    parser.add_argument("--channels", type=int, nargs="+", default=[2, 24])
+    parser.add_argument("--samples", type=int, nargs="+", default=[12000, 120000])
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="Hilos OpenMP a barrer (por defecto: 1 y todos los núcleos)")
+    parser.add_argument("--repeats", type=int, default=7)
+    parser.add_argument("--output", default=None, help="JSON de resultados")
+    parser.add_argument("--baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help="Compara contra esta línea base (por defecto build/benchmarks/baseline.json)")
+    parser.add_argument("--save-baseline", nargs="?", const=BASELINE_PATH, default=None,
+                        help="Guarda los resultados también como línea base")
+    parser.add_argument("--threshold", type=float, default=0.15,
+                        help="Empeoramiento relativo de la mediana que cuenta como regresión")
+    args = parser.parse_args()
+
+    if args.chart:
+        run_benchmark()
+    else:
+        sys.exit(run_suite_cli(args))
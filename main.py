@@ -6,7 +6,20 @@ from test import (
     run_multichannel_test,
     run_spectral_analysis,
     run_geophysics_test,
-    run_stacking_test
+    run_stacking_test,
+    run_inversion_test,
+    run_volume_test,
+    run_out_of_core_test,
+    run_async_streaming_test,
+    run_shared_memory_test,
+    run_backends_test,
+    run_parallel_policy_test,
+    run_realtime_replay_test,
+    run_sliding_spectrum_test,
+    run_tem_stacking_test,
+    run_timebase_alignment_test,
+    run_results_store_test,
+    run_batch_resume_test
 )
 
 
@@ -19,6 +32,19 @@ if __name__ == "__main__":
     print("5: Test Espectral Analyzer (Análisis de FFT)")
     print("6: Test Geophysics (Resistividad Aparente)")
     print("7: Test Stacking (Refinamiento por Promediado)")
+    print("8: Test Inversión MT 1D (Modelo de Capas)")
+    print("9: Test Volumen 3D (Interpolación IDW)")
+    print("10: Test Out-of-Core (Levantamiento por Bloques)")
+    print("11: Test Streaming Asíncrono (24 CH x 24 kHz)")
+    print("12: Test Memoria Compartida (Adquisición Multiproceso)")
+    print("13: Test Motores de Cómputo (C++ / NumPy / SciPy)")
+    print("14: Test Política de Paralelismo (Hilos / Eje por Kernel)")
+    print("15: Test Replay en Tiempo Real (Latencia por Bloque)")
+    print("16: Test Espectrograma Deslizante (SDFT / Seguimiento de Red)")
+    print("17: Test Stacking TEM (Gates / Resistividad Tardía)")
+    print("18: Test Alineación Multi-Estación (GPS / Deriva de Reloj)")
+    print("19: Test Almacén de Resultados (Columnar / Consultas mmap)")
+    print("20: Test Lote Reanudable (Manifiesto / Huellas)")
 
     while True:
         numero= input("Seleccione el número de test a ejecutar ('S' para salir.):\n")
@@ -50,6 +76,48 @@ if __name__ == "__main__":
                 print("\n--- Ejecutando Test Stacking ---")
                 print("(Cierra la ventana del gráfico para continuar...)")
                 run_stacking_test()
+            case '8':
+                print("\n--- Ejecutando Test Inversión MT 1D ---")
+                print("(Cierra la ventana del gráfico para continuar...)")
+                run_inversion_test()
+            case '9':
+                print("\n--- Ejecutando Test Volumen 3D ---")
+                print("(Cierra la ventana 3D para continuar...)")
+                run_volume_test()
+            case '10':
+                print("\n--- Ejecutando Test Out-of-Core ---")
+                print("(Cierra la ventana del gráfico para continuar...)")
+                run_out_of_core_test()
+            case '11':
+                print("\n--- Ejecutando Test Streaming Asíncrono ---")
+                run_async_streaming_test()
+            case '12':
+                print("\n--- Ejecutando Test Memoria Compartida ---")
+                run_shared_memory_test()
+            case '13':
+                print("\n--- Ejecutando Test Motores de Cómputo ---")
+                run_backends_test()
+            case '14':
+                print("\n--- Ejecutando Test Política de Paralelismo ---")
+                run_parallel_policy_test()
+            case '15':
+                print("\n--- Ejecutando Test Replay en Tiempo Real ---")
+                run_realtime_replay_test()
+            case '16':
+                print("\n--- Ejecutando Test Espectrograma Deslizante ---")
+                run_sliding_spectrum_test()
+            case '17':
+                print("\n--- Ejecutando Test Stacking TEM ---")
+                run_tem_stacking_test()
+            case '18':
+                print("\n--- Ejecutando Test Alineación Multi-Estación ---")
+                run_timebase_alignment_test()
+            case '19':
+                print("\n--- Ejecutando Test Almacén de Resultados ---")
+                run_results_store_test()
+            case '20':
+                print("\n--- Ejecutando Test Lote Reanudable ---")
+                run_batch_resume_test()
             case 'S':
                 print("--- Proceso Finalizado ---")
                 break
\ No newline at end of file
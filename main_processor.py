@@ -1,21 +1,43 @@
 # main_processor.py
 import numpy as np
 import time
-import matplotlib.pyplot as plt
-from src.processing.cpp_bridge import (
-    c_interpolate_data,
-    c_load_raw_data, 
-    c_apply_multichannel_filter, 
-    c_compute_stacking, 
-    c_calculate_spectrum
-)
-from src.processing.geophysics import compute_apparent_resistivity
-from src.visualization.plots import plot_multichannel_wiggle, plot_sounding_curve
-from scipy import signal
-
-from src.visualization.render_3d import render_dynamic_slicing, render_resistivity_section
-
-def run_master_workflow():
+from src.processing.tracing import span, start_trace, stop_trace
+from src.processing.workflow import build_master_pipeline
+
+# Matplotlib y PyVista/VTK se importan recién en la rama que los usa: una corrida
+# headless no paga el costo de cargar el backend interactivo ni VTK.
+
+def run_master_workflow(report_dir=None, report_workers=None, cache_dir=".gif_cache",
+                        trace_path=None, results_store=None):
+    """
+    Pipeline completo. Con report_dir las figuras se escriben a archivo en un
+    pool de procesos (modo headless) en lugar de abrir ventanas.
+    cache_dir: Caché de etapas en disco (None para recalcular todo).
+    trace_path: Guarda una traza Chrome/Perfetto (JSON) de etapas y llamadas al
+                motor C++, con los contadores nativos por kernel.
+    results_store: Carpeta de un ResultsStore donde anexar espectros, resistividad
+                   y trazas apiladas de la corrida (src/io/results_store.py).
+    """
+    if trace_path is not None:
+        start_trace("master_processor")
+    try:
+        _master_workflow(report_dir, report_workers, cache_dir, results_store)
+    finally:
+        # También si una etapa falla: la traza parcial es justo la que hace falta
+        if trace_path is not None:
+            from src.processing.cpp_bridge import native_available
+            from src.processing.tracing import print_counter_report
+
+            tracer = stop_trace(trace_path)
+            print(f"[*] Traza guardada en {trace_path} ({len(tracer.events)} eventos)")
+            if native_available():
+                from src.processing.cpp_bridge import kernel_counters
+                print_counter_report(kernel_counters())
+    if report_dir is None:
+        import matplotlib.pyplot as plt
+        plt.show()
+
+def _master_workflow(report_dir, report_workers, cache_dir, results_store):
     print("==========================================================")
     print("   GEOPHYSICAL IMAGING FRAMEWORK - MASTER PROCESSOR")
     print("==========================================================\n")
@@ -26,102 +48,100 @@ def run_master_workflow():
     N_CHANNELS = 24
     N_SEGMENTS = 15          # Para un stacking robusto
     SEGMENT_SEC = 0.5        # Bloques de medio segundo
-    SAMPLES_PER_SEG = int(FS * SEGMENT_SEC)
     
     # Frecuencias para el sondeo final (log-spaced)
     target_freqs = np.logspace(0.5, 3, 20).astype(np.float32)
 
-    # 1. CARGA MASIVA (C++)
-    print(f"[*] Cargando {N_CHANNELS} canales desde {FILENAME}...")
+    # 1-4. CARGA → FILTRADO → STACKING → ESPECTRO → RESISTIVIDAD → INTERPOLACIÓN
+    # Cada etapa se cachea en disco bajo un hash de sus entradas y parámetros:
+    # al cambiar solo la malla de interpolación, las etapas previas no se recalculan.
+    print(f"[*] Ejecutando pipeline ({N_CHANNELS} canales, Notch 60Hz Q=100, "
+          f"stacking de {N_SEGMENTS} segmentos)...")
     start_time = time.perf_counter()
-    total_samples = N_CHANNELS * N_SEGMENTS * SAMPLES_PER_SEG
-    raw_flat = c_load_raw_data(FILENAME, total_samples)
-    
-    # Reshape a (Canales, Segmentos, Muestras)
-    data_cube = raw_flat.reshape((N_CHANNELS, N_SEGMENTS, SAMPLES_PER_SEG))
-    print(f"[OK] Datos cargados en {time.perf_counter() - start_time:.4f}s\n")
-
-    # 2. FILTRADO NOTCH PRO (C++ / OpenMP)
-    # Aplicamos Q=100 para garantizar >30dB de reducción de ruido de línea
-    print(f"[*] Aplicando Filtro Notch (60Hz, Q=100) en paralelo...")
-    b, a = signal.iirnotch(60.0, 100.0, FS)
-    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
-    
-    # Procesamos todos los segmentos de todos los canales de un solo golpe
-    # Aplanamos temporalmente para el bridge multicanal
-    flat_segments = data_cube.reshape((N_CHANNELS * N_SEGMENTS, SAMPLES_PER_SEG))
-    zi = np.zeros((N_CHANNELS * N_SEGMENTS, (len(sos)//6) * 2), dtype=np.float32)
-    
-    filtered_flat, _ = c_apply_multichannel_filter(flat_segments, sos, zi)
-    filtered_cube = filtered_flat.reshape((N_CHANNELS, N_SEGMENTS, SAMPLES_PER_SEG))
-    print("[OK] Filtrado completado.\n")
-
-    # 3. STACKING (C++ / OpenMP)
-    print(f"[*] Ejecutando Stacking Estadístico ({N_SEGMENTS} promedios por canal)...")
-    stacked_data = np.zeros((N_CHANNELS, SAMPLES_PER_SEG), dtype=np.float32)
-    for ch in range(N_CHANNELS):
-        stacked_data[ch] = c_compute_stacking(filtered_cube[ch])
-    print("[OK] Señales maestras generadas.\n")
-
-    # 4. CÁLCULO DE RESISTIVIDAD (Geophysics Engine)
-    print("[*] Calculando Resistividad Aparente (Cagniard Transfer)...")
-    # Usamos CH1 como Eléctrico (E) y CH2 como Magnético (H)
-    mags = c_calculate_spectrum(stacked_data[:2], float(FS), target_freqs)
-    rho = compute_apparent_resistivity(mags[0], mags[1], target_freqs)
-
-    # Suponiendo que los canales pares son E y los impares son H 
-    # o simplemente comparando cada canal contra una referencia magnética fija (CH2)
-    n_freqs = len(target_freqs)
-    rho_matrix = np.zeros((N_CHANNELS, n_freqs), dtype=np.float32)
-    
-    # Calculamos espectros para todos los canales de una vez
-    all_mags = c_calculate_spectrum(stacked_data, float(FS), target_freqs)
-    
-    # Referencia magnética (CH2) para todos los cálculos
-    mag_H_ref = all_mags[1] 
-    
-    for ch in range(N_CHANNELS):
-        rho_matrix[ch] = compute_apparent_resistivity(all_mags[ch], mag_H_ref, target_freqs)
-
-
-    
-
+    pipeline = build_master_pipeline(
+        FILENAME, fs=FS, n_channels=N_CHANNELS, n_segments=N_SEGMENTS,
+        segment_sec=SEGMENT_SEC, target_freqs=target_freqs, out_shape=(200, 100),
+        cache_dir=cache_dir
+    )
+    with span("pipeline", cat="workflow"):
+        targets = ["stack", "resistivity", "interpolate"] + (["spectrum"] if results_store else [])
+        results = pipeline.run(targets=targets)
+    print(f"[OK] Pipeline completado en {time.perf_counter() - start_time:.4f}s\n")
+
+    stacked_data = results["stack"]["stacked"]
+    rho_matrix = results["resistivity"]["rho_matrix"]
+    rho = rho_matrix[0] # CH1 (E) contra la referencia magnética CH2 (H)
+    rho_smooth = results["interpolate"]["rho_smooth"]
+    freqs_smooth = results["interpolate"]["freqs_smooth"]
+
+    if results_store is not None:
+        from src.io.results_store import ResultsStore, store_workflow_results
+        store = ResultsStore(results_store)
+        store_workflow_results(store, {"mags": results["spectrum"]["mags"], "rho_matrix": rho_matrix,
+                                       "stacked": stacked_data}, time=np.datetime64("now", "ns"),
+                               freqs=target_freqs)
+        summary = ", ".join(f"{t}: {m['rows']} filas" for t, m in store.tables().items())
+        print(f"[OK] Resultados anexados a {results_store} ({summary})\n")
 
     # 5. GENERACIÓN DE REPORTES (Visualization Engine)
-    print("[*] Generando visualizaciones finales...")
-    
-    # Reporte 1: QC de Trazas
-    plot_multichannel_wiggle(stacked_data, stacked_data, FS, 
-                             title="Master QC: Trazas Finales (Filtradas + Stacked)")
-    
-    # Reporte 2: Curva de Sondeo
-    plot_sounding_curve(target_freqs, rho, 
-                        title="Resultado Final: Curva de Sondeo Magnetotelúrico")
-
-    # NUEVO Reporte 3: Visualización 3D con PyVista
-
-    # NUEVO: Interpolación de Alta Resolución (de 24x20 a 200x100 puntos)
-    print("[*] Suavizando malla mediante Interpolación Bilineal en C++...")
-    high_res_shape = (200, 100)
-    rho_smooth = c_interpolate_data(rho_matrix, high_res_shape)
-    
-    # Re-generamos frecuencias para la malla suavizada
-    freqs_smooth = np.logspace(np.log10(target_freqs[0]), np.log10(target_freqs[-1]), high_res_shape[1])
-
-    # Reporte 3: Sección Suavizada
-    print("[*] Renderizando sección de alta resolución...")
-    render_resistivity_section(freqs_smooth, rho_smooth)
-
-    # Reporte 4: Slicing Dinámico
-    print("[*] Iniciando herramienta de Slicing Dinámico...")
-    render_dynamic_slicing(freqs_smooth, rho_smooth)
+    if report_dir is not None:
+        # Modo headless: todas las figuras a archivo, en paralelo y sin ventanas
+        from src.visualization.reports import render_report_batch, print_report_summary
+        print(f"[*] Generando reportes en {report_dir} (modo headless)...")
+        jobs = [
+            {"kind": "wiggle", "name": "qc_trazas",
+             "args": (stacked_data, stacked_data, FS),
+             "kwargs": {"title": "Master QC: Trazas Finales (Filtradas + Stacked)"}},
+            {"kind": "sounding", "name": "curva_sondeo",
+             "args": (target_freqs, rho),
+             "kwargs": {"title": "Resultado Final: Curva de Sondeo Magnetotelúrico"}},
+            {"kind": "section_3d", "name": "seccion_3d", "args": (freqs_smooth, rho_smooth)},
+            {"kind": "slicing_3d", "name": "slicing_3d", "args": (freqs_smooth, rho_smooth)},
+        ]
+        with span("reports", cat="workflow", jobs=len(jobs)):
+            report = render_report_batch(jobs, report_dir, n_workers=report_workers)
+        print_report_summary(report)
+    else:
+        print("[*] Generando visualizaciones finales...")
+        from src.visualization.plots import plot_multichannel_wiggle, plot_sounding_curve
+        from src.visualization.render_3d import render_dynamic_slicing, render_resistivity_section
+        
+        # Reporte 1: QC de Trazas
+        plot_multichannel_wiggle(stacked_data, stacked_data, FS, 
+                                 title="Master QC: Trazas Finales (Filtradas + Stacked)")
+        
+        # Reporte 2: Curva de Sondeo
+        plot_sounding_curve(target_freqs, rho, 
+                            title="Resultado Final: Curva de Sondeo Magnetotelúrico")
+
+        # Reporte 3: Sección Suavizada
+        print("[*] Renderizando sección de alta resolución...")
+        render_resistivity_section(freqs_smooth, rho_smooth)
+
+        # Reporte 4: Slicing Dinámico
+        print("[*] Iniciando herramienta de Slicing Dinámico...")
+        render_dynamic_slicing(freqs_smooth, rho_smooth)
 
     
     print("\n==========================================================")
     print(f"   PROCESAMIENTO FINALIZADO EXITOSAMENTE")
     print(f"   Tiempo total: {time.perf_counter() - start_time:.4f}s")
     print("==========================================================")
-    plt.show()
 
 if __name__ == "__main__":
-    run_master_workflow()
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="GIF - Procesador maestro")
+    parser.add_argument("--report-dir", default=None,
+                        help="Escribe los reportes como PNG en esta carpeta (sin ventanas)")
+    parser.add_argument("--report-workers", type=int, default=None,
+                        help="Procesos para renderizar los reportes en paralelo")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Recalcula todas las etapas sin usar la caché en disco")
+    parser.add_argument("--trace", default=None, metavar="TRACE_JSON",
+                        help="Guarda una traza Chrome/Perfetto de la corrida (chrome://tracing)")
+    parser.add_argument("--store", default=None, metavar="STORE_DIR",
+                        help="Anexa espectros, resistividad y trazas a un almacén de resultados")
+    args = parser.parse_args()
+    run_master_workflow(report_dir=args.report_dir, report_workers=args.report_workers,
+                        cache_dir=None if args.no_cache else ".gif_cache",
+                        trace_path=args.trace, results_store=args.store)
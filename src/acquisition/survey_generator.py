@@ -0,0 +1,334 @@
+# src\acquisition\survey_generator.py
+"""
+Generador de levantamientos sintéticos grandes (pruebas de carga y de escala).
+
+El archivo se escribe por bloques de tiempo, en paralelo y directo a disco:
+nunca se arma la matriz (canales, muestras) completa en RAM. El formato es el
+mismo .raw canal-tras-canal (float32) que leen los cargadores del framework;
+el archivo se preasigna y cada bloque de cada canal se escribe en su posición
+(os.pwrite), así los procesos no se coordinan entre sí.
+
+Modelo de señal por canal:
+    fuente MT   Campo natural común a todas las estaciones: ruido coloreado con
+                espectro ~ f^-slope entre f_min y f_max. H lleva la fuente y E la
+                misma fuente por la impedancia de un semiespacio de resistividad
+                rho(estación): |E/H| = sqrt(5 rho f) con fase de 45° (la fórmula de
+                Cagniard de src.processing.geophysics la recupera).
+    tonos       Opcional: senoidales exactas en frecuencias dadas (fuente controlada;
+                sobreviven al stacking por segmentos).
+    red         Línea de 50/60 Hz con deriva lenta de frecuencia y armónicos, con
+                amplitud según la distancia de la estación al tendido eléctrico.
+    spikes      Impulsos con decaimiento exponencial (proceso de Poisson por canal).
+    ruido       Ruido blanco del sensor.
+
+Determinismo: la fuente se siembra por bloque (SeedSequence(seed, bloque)) y el
+ruido y los spikes por (canal, bloque). El resultado no depende del número de
+procesos ni del orden en que terminen los bloques.
+"""
+
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+# --- Disposición de estaciones ----------------------------------------------
+
+def line_layout(n_stations=12, spacing=100.0, components=("E", "H"), rho=100.0,
+                powerline_x=None):
+    """
+    Perfil de estaciones sobre el eje x, cada una con los canales 'components'.
+    rho: Resistividad por estación (número, lista o función rho(x, y))
+    powerline_x: Posición del tendido eléctrico (por defecto, el inicio del perfil)
+    Retorna la lista de canales en el orden del archivo (estación por estación).
+    """
+    xy = [(i * spacing, 0.0) for i in range(n_stations)]
+    return _layout_from_positions(xy, components, rho, 0.0 if powerline_x is None else powerline_x)
+
+
+def grid_layout(nx=4, ny=3, spacing=200.0, components=("E", "H"), rho=100.0, powerline_x=None):
+    """Malla regular de nx x ny estaciones (filas en y, x más rápido)."""
+    xy = [(ix * spacing, iy * spacing) for iy in range(ny) for ix in range(nx)]
+    return _layout_from_positions(xy, components, rho, 0.0 if powerline_x is None else powerline_x)
+
+
+def _layout_from_positions(xy, components, rho, powerline_x):
+    channels = []
+    for s, (x, y) in enumerate(xy):
+        if callable(rho):
+            station_rho = float(rho(x, y))
+        elif np.ndim(rho):
+            station_rho = float(rho[s])
+        else:
+            station_rho = float(rho)
+        for comp in components:
+            channels.append({"station": f"S{s + 1:03d}", "x": float(x), "y": float(y),
+                             "component": comp, "rho": station_rho,
+                             "powerline_dist": abs(float(x) - powerline_x)})
+    return channels
+
+
+# --- Especificación del levantamiento ----------------------------------------
+
+DEFAULT_SPEC = {
+    "fs": 24000,
+    "duration_sec": 60.0,
+    "chunk_sec": 10.0,       # Bloque de trabajo (y de siembra): cambiarlo cambia los datos
+    "seed": 0,
+    # Fuente MT natural
+    "source_rms": 1.0,       # RMS del canal H
+    "f_min": 0.1,
+    "f_max": 2000.0,
+    "slope": 1.0,            # Amplitud ~ f^-slope
+    "tones": None,           # Lista de (frecuencia, amplitud en H) para una fuente controlada
+    # Ruido de red
+    "line_freq": 60.0,
+    "line_amp": 1.5,         # Amplitud en el tendido (decae con la distancia)
+    "line_decay_m": 500.0,
+    "line_drift_hz": 0.05,   # Desviación máxima de la frecuencia de red
+    "line_drift_period_sec": 600.0,
+    "harmonics": 5,          # Cantidad de armónicos (incluida la fundamental)
+    "harmonic_ratio": 0.4,   # Cada armónico es harmonic_ratio veces el anterior
+    # Spikes y ruido del sensor
+    "spike_rate_per_min": 2.0,
+    "spike_amp": 20.0,
+    "spike_tau_ms": 2.0,
+    "noise_rms": 0.05,
+}
+
+
+def make_spec(layout=None, **params):
+    """Especificación completa (serializable) a partir de los valores por defecto."""
+    unknown = set(params) - set(DEFAULT_SPEC)
+    if unknown:
+        raise ValueError(f"Parámetros desconocidos: {', '.join(sorted(unknown))}")
+    spec = dict(DEFAULT_SPEC, **params)
+    spec["layout"] = layout if layout is not None else line_layout()
+    spec["n_channels"] = len(spec["layout"])
+    spec["samples_per_channel"] = int(round(spec["duration_sec"] * spec["fs"]))
+    spec["chunk_size"] = int(round(spec["chunk_sec"] * spec["fs"]))
+    spec["f_max"] = min(spec["f_max"], spec["fs"] / 2.0)
+    if spec["tones"] is not None:
+        spec["tones"] = [[float(f), float(a)] for f, a in spec["tones"]]
+    return spec
+
+
+# --- Generación de un bloque ------------------------------------------------
+
+def _source_segment(spec, index):
+    """
+    Segmento 'index' de la fuente (2 bloques de largo) en H y en E/sqrt(rho),
+    generado en frecuencia. Cada bloque mezcla la mitad final del segmento
+    anterior con la inicial del suyo: la fuente es continua entre bloques.
+    """
+    m = 2 * spec["chunk_size"]
+    fs = spec["fs"]
+    freqs = np.fft.rfftfreq(m, 1.0 / fs)
+    band = (freqs >= spec["f_min"]) & (freqs <= spec["f_max"])
+    amp = np.zeros_like(freqs)
+    amp[band] = (freqs[band] / spec["f_min"]) ** -spec["slope"]
+    # Normalización analítica: RMS de H = source_rms
+    amp *= spec["source_rms"] * m / np.sqrt(2.0 * np.sum(amp ** 2))
+
+    rng = np.random.default_rng(np.random.SeedSequence(spec["seed"], spawn_key=(0, index + 1)))
+    spectrum = amp * (rng.standard_normal(len(freqs)) + 1j * rng.standard_normal(len(freqs))) / np.sqrt(2)
+    h = np.fft.irfft(spectrum, m)
+    e_unit = np.fft.irfft(spectrum * np.sqrt(5.0 * freqs) * np.exp(1j * np.pi / 4), m)
+    return h, e_unit
+
+
+_SOURCE_KEYS = ("seed", "fs", "chunk_size", "f_min", "f_max", "slope", "source_rms")
+_segments = {} # Últimos segmentos generados: el bloque siguiente reutiliza el actual
+
+
+def _cached_segment(spec, index):
+    key = tuple(spec[k] for k in _SOURCE_KEYS) + (index,)
+    if key not in _segments:
+        if len(_segments) >= 2:
+            _segments.pop(next(iter(_segments)))
+        _segments[key] = _source_segment(spec, index)
+    return _segments[key]
+
+
+def _crossfade(spec, chunk):
+    """Fuente del bloque 'chunk': H y E/sqrt(rho) con ventanas seno/coseno (potencia constante)."""
+    n = spec["chunk_size"]
+    h_prev, e_prev = _cached_segment(spec, chunk - 1)
+    h_cur, e_cur = _cached_segment(spec, chunk)
+    ramp = np.sin(0.5 * np.pi * (np.arange(n) + 0.5) / n)
+    fade = np.cos(0.5 * np.pi * (np.arange(n) + 0.5) / n)
+    return fade * h_prev[n:] + ramp * h_cur[:n], fade * e_prev[n:] + ramp * e_cur[:n]
+
+
+def _line_noise(spec, t):
+    """Red eléctrica con frecuencia que deriva (fase analítica, continua entre bloques)."""
+    period = spec["line_drift_period_sec"]
+    drift = spec["line_drift_hz"] * period / (2 * np.pi)
+    phase = 2 * np.pi * (spec["line_freq"] * t - drift * np.cos(2 * np.pi * t / period))
+    line = np.zeros_like(t)
+    for k in range(1, spec["harmonics"] + 1):
+        line += spec["harmonic_ratio"] ** (k - 1) * np.sin(k * phase + 0.3 * k)
+    return line
+
+
+def _tones(spec, t):
+    """Fuente controlada: H y E/sqrt(rho) de cada tono (E adelanta 45°)."""
+    h = np.zeros_like(t)
+    e_unit = np.zeros_like(t)
+    for freq, amp in spec["tones"]:
+        arg = 2 * np.pi * freq * t
+        h += amp * np.sin(arg)
+        e_unit += amp * np.sqrt(5.0 * freq) * np.sin(arg + np.pi / 4)
+    return h, e_unit
+
+
+def _add_spikes(row, spec, rng):
+    fs = spec["fs"]
+    n_spikes = rng.poisson(spec["spike_rate_per_min"] * len(row) / fs / 60.0)
+    tau = max(spec["spike_tau_ms"] * 1e-3 * fs, 1.0)
+    length = int(5 * tau)
+    shape = np.exp(-np.arange(length) / tau).astype(np.float32)
+    for pos, sign in zip(rng.integers(0, len(row), n_spikes), rng.choice((-1.0, 1.0), n_spikes)):
+        seg = row[pos:pos + length]
+        seg += sign * spec["spike_amp"] * rng.uniform(0.5, 1.5) * shape[:len(seg)]
+
+
+def generate_chunk(spec, chunk):
+    """
+    Genera el bloque 'chunk' de todos los canales.
+    Retorna (matriz float32 (n_channels, muestras del bloque), muestra inicial).
+    """
+    n = spec["chunk_size"]
+    start = chunk * n
+    count = min(n, spec["samples_per_channel"] - start)
+    t = (start + np.arange(count)) / spec["fs"]
+
+    h_src, e_src = _crossfade(spec, chunk)
+    h_src, e_src = h_src[:count], e_src[:count]
+    if spec["tones"]:
+        h_tone, e_tone = _tones(spec, t)
+        h_src, e_src = h_src + h_tone, e_src + e_tone
+    # Las formas comunes se pasan a float32 una vez; cada canal solo escala y suma
+    h_src = h_src.astype(np.float32)
+    e_src = e_src.astype(np.float32)
+    line = _line_noise(spec, t).astype(np.float32)
+    noise = np.empty(count, dtype=np.float32)
+
+    block = np.empty((spec["n_channels"], count), dtype=np.float32)
+    for ch, info in enumerate(spec["layout"]):
+        rng = np.random.default_rng(np.random.SeedSequence(spec["seed"], spawn_key=(ch + 1, chunk)))
+        row = block[ch]
+        if info["component"].upper().startswith("E"):
+            np.multiply(e_src, np.float32(np.sqrt(info["rho"])), out=row)
+        else:
+            row[:] = h_src
+        line_amp = spec["line_amp"] * np.exp(-info["powerline_dist"] / spec["line_decay_m"])
+        np.multiply(line, np.float32(line_amp), out=noise)
+        row += noise
+        rng.standard_normal(out=noise, dtype=np.float32)
+        noise *= np.float32(spec["noise_rms"])
+        row += noise
+        _add_spikes(row, spec, rng)
+    return block, start
+
+
+# --- Escritura en paralelo ----------------------------------------------------
+
+_worker = {} # Estado de cada proceso: spec y archivo abierto
+
+
+def _write_at(f, offset, data):
+    """Escritura posicional; en Windows (sin os.pwrite) seek + write sobre el handle propio."""
+    if hasattr(os, "pwrite"):
+        view = memoryview(data).cast("B")
+        while view:
+            written = os.pwrite(f.fileno(), view, offset)
+            view, offset = view[written:], offset + written
+    else:
+        f.seek(offset)
+        f.write(data)
+
+
+def _init_writer(spec, filename):
+    _worker["spec"] = spec
+    _worker["file"] = open(filename, "r+b")
+
+
+def _write_chunks(chunks):
+    """Tarea de un proceso: bloques consecutivos (cada uno reutiliza la fuente del anterior)."""
+    spec, f = _worker["spec"], _worker["file"]
+    n_per_ch = spec["samples_per_channel"]
+    gen_s = write_s = 0.0
+    for chunk in chunks:
+        t0 = time.perf_counter()
+        block, start = generate_chunk(spec, chunk)
+        t1 = time.perf_counter()
+        for ch in range(block.shape[0]):
+            _write_at(f, (ch * n_per_ch + start) * 4, block[ch])
+        gen_s += t1 - t0
+        write_s += time.perf_counter() - t1
+    return {"chunks": len(chunks), "gen_s": gen_s, "write_s": write_s}
+
+
+def write_survey(filename, spec, n_workers=None, verbose=True):
+    """
+    Genera el levantamiento completo en 'filename' (más un 'filename'.json con la spec).
+    n_workers: Procesos generadores (por defecto, uno por núcleo)
+    Retorna estadísticas de la escritura (bytes, segundos, MB/s).
+    """
+    folder = os.path.dirname(filename)
+    if folder:
+        os.makedirs(folder, exist_ok=True)
+    n_chunks = -(-spec["samples_per_channel"] // spec["chunk_size"])
+    total_bytes = spec["n_channels"] * spec["samples_per_channel"] * 4
+    n_workers = max(1, min(n_workers or os.cpu_count() or 1, n_chunks))
+
+    # Archivo preasignado: cada bloque se escribe en su lugar, en cualquier orden
+    with open(filename, "wb") as f:
+        f.truncate(total_bytes)
+    with open(filename + ".json", "w", encoding="utf-8") as f:
+        json.dump(spec, f, indent=2)
+
+    if verbose:
+        print(f"[*] Generando {spec['n_channels']} canales x {spec['samples_per_channel']:,} muestras "
+              f"({total_bytes / 1024**3:.2f} GB) en {n_chunks} bloques con {n_workers} procesos...")
+    # Tareas de bloques consecutivos: ~4 por proceso para balancear la carga
+    task_len = max(1, -(-n_chunks // (4 * n_workers)))
+    tasks = [range(c, min(c + task_len, n_chunks)) for c in range(0, n_chunks, task_len)]
+
+    start_t = time.perf_counter()
+    gen_s = write_s = 0.0
+    done = 0
+    if n_workers == 1:
+        _init_writer(spec, filename)
+        try:
+            stats = _write_chunks(range(n_chunks))
+            gen_s, write_s, done = stats["gen_s"], stats["write_s"], n_chunks
+        finally:
+            _worker.pop("file").close()
+    else:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx, initializer=_init_writer,
+                                 initargs=(spec, filename)) as pool:
+            futures = [pool.submit(_write_chunks, task) for task in tasks]
+            for future in as_completed(futures):
+                stats = future.result()
+                gen_s, write_s = gen_s + stats["gen_s"], write_s + stats["write_s"]
+                done += stats["chunks"]
+                if verbose:
+                    elapsed = time.perf_counter() - start_t
+                    print(f"    {done}/{n_chunks} bloques | "
+                          f"{done / n_chunks * total_bytes / 1024**2 / elapsed:.0f} MB/s")
+
+    elapsed = time.perf_counter() - start_t
+    summary = {"filename": filename, "bytes": total_bytes, "chunks": n_chunks,
+               "n_workers": n_workers, "seconds": elapsed,
+               "mb_per_s": total_bytes / 1024**2 / elapsed if elapsed > 0 else 0.0,
+               "generate_s": gen_s, "write_s": write_s}
+    if verbose:
+        print(f"[OK] {filename}: {total_bytes / 1024**2:.1f} MB en {elapsed:.2f}s "
+              f"({summary['mb_per_s']:.0f} MB/s | generación {gen_s:.2f}s, escritura {write_s:.2f}s "
+              f"sumando los procesos)")
+    return summary
@@ -6,10 +6,386 @@
 #include <vector>
 #include <fstream>
 #include <cmath>
+#include <algorithm>
+#include <atomic>
+#include <chrono>
 #include <omp.h>
 
+// ---------------------------------------------------------------------------
+// Política de paralelismo en tiempo de ejecución (controlada desde Python).
+// Los valores son globales a la librería y no por hilo como los ICV de OpenMP:
+// así valen igual para las llamadas hechas desde cualquier hilo de Python.
+// ---------------------------------------------------------------------------
+enum ParallelKernel
+{
+    KERNEL_FILTER = 0,   // apply_sos_filter_multichannel
+    KERNEL_SPECTRUM = 1, // calculate_magnitude_spectrum
+    KERNEL_STACKING = 2, // compute_stacking, tem_stack_gates
+    N_POLICY_KERNELS = 3
+};
+
+enum ParallelAxis
+{
+    AXIS_AUTO = 0,        // Elige según la forma de los datos y los hilos disponibles
+    AXIS_CHANNELS = 1,    // Un canal por tarea
+    AXIS_FREQUENCIES = 2, // Un par (canal, frecuencia) por tarea
+    AXIS_SAMPLES = 3      // Bloques de muestras de un mismo canal
+};
+
+static int g_num_threads = 0; // 0 = lo que decida OpenMP (OMP_NUM_THREADS o núcleos)
+static int g_sched_kind = omp_sched_static;
+static int g_sched_chunk = 0; // 0 = tamaño por defecto del schedule
+static int g_axis[N_POLICY_KERNELS] = {AXIS_AUTO, AXIS_AUTO, AXIS_AUTO};
+
+static const int MIN_BLOCK_SAMPLES = 4096; // Bloque mínimo para repartir un canal entre hilos
+
+static int policy_threads()
+{
+    return g_num_threads > 0 ? g_num_threads : omp_get_max_threads();
+}
+
+// Aplica el schedule elegido al hilo que llama; los bucles usan schedule(runtime)
+static int begin_parallel()
+{
+    omp_set_schedule((omp_sched_t)g_sched_kind, g_sched_chunk);
+    return policy_threads();
+}
+
+// ---------------------------------------------------------------------------
+// Contadores por kernel: llamadas, tiempo total y máximo (ns), bytes procesados
+// (entrada + salida) e hilos de la última llamada. Atómicos porque los kernels
+// se llaman desde varios hilos de Python a la vez. Costo: dos lecturas del reloj.
+// ---------------------------------------------------------------------------
+enum KernelCounterId
+{
+    COUNTER_SOS_FILTER = 0,
+    COUNTER_LOAD_DATA,
+    COUNTER_LOAD_BLOCK,
+    COUNTER_SPECTRUM,
+    COUNTER_MULTICHANNEL_FILTER,
+    COUNTER_STACKING,
+    COUNTER_INTERPOLATE,
+    COUNTER_INTERPOLATION_PLAN,
+    COUNTER_IDW_VOLUME,
+    COUNTER_SLIDING_DFT,
+    COUNTER_TEM_STACKING,
+    COUNTER_RESAMPLE,
+    N_KERNEL_COUNTERS
+};
+
+static const char *KERNEL_COUNTER_NAMES[N_KERNEL_COUNTERS] = {
+    "apply_sos_filter_work", "load_binary_data", "load_binary_block",
+    "calculate_magnitude_spectrum", "apply_sos_filter_multichannel", "compute_stacking",
+    "c_interpolate_resistivity", "apply_interpolation_plan", "idw_interpolate_volume",
+    "sliding_dft_update", "tem_stack_gates", "fractional_delay_resample"};
+
+struct KernelCounter
+{
+    std::atomic<long long> calls{0}, total_ns{0}, max_ns{0}, bytes{0}, threads{0};
+};
+
+static KernelCounter g_counters[N_KERNEL_COUNTERS];
+
+// Mide una llamada completa (incluidos los return anticipados) al salir de su ámbito
+struct KernelTimer
+{
+    int id;
+    long long bytes;
+    int threads;
+    std::chrono::steady_clock::time_point start;
+
+    KernelTimer(int id, long long bytes, int threads = 1)
+        : id(id), bytes(bytes), threads(threads), start(std::chrono::steady_clock::now()) {}
+
+    ~KernelTimer()
+    {
+        long long ns = std::chrono::duration_cast<std::chrono::nanoseconds>(
+                           std::chrono::steady_clock::now() - start).count();
+        KernelCounter &c = g_counters[id];
+        c.calls.fetch_add(1, std::memory_order_relaxed);
+        c.total_ns.fetch_add(ns, std::memory_order_relaxed);
+        c.bytes.fetch_add(bytes, std::memory_order_relaxed);
+        c.threads.store(threads, std::memory_order_relaxed);
+        long long prev = c.max_ns.load(std::memory_order_relaxed);
+        while (ns > prev && !c.max_ns.compare_exchange_weak(prev, ns, std::memory_order_relaxed))
+            ;
+    }
+};
+
+// DF2T de una cascada SOS sobre [0, n), en double. x == nullptr = entrada cero;
+// y == nullptr = solo estados. Con polos cerca del círculo unitario (cortes bajos,
+// órdenes altos) el estado en float32 acumula un error que el filtro amplifica.
+static inline void sos_run_d(const float *x, float *y, long long n, int n_sections,
+                             const float *sos, double *z_all)
+{
+    for (long long i = 0; i < n; ++i)
+    {
+        double val = x ? x[i] : 0.0;
+        for (int s = 0; s < n_sections; ++s)
+        {
+            const float *b = &sos[s * 6];
+            const float *a = &sos[s * 6 + 3];
+            double *z = &z_all[s * 2];
+
+            double out = b[0] * val + z[0];
+            z[0] = b[1] * val - a[1] * out + z[1];
+            z[1] = b[2] * val - a[2] * out;
+            val = out;
+        }
+        if (y)
+            y[i] = (float)val;
+    }
+}
+
+// Misma cascada con los estados zi (float32) de Python: se redondean solo al salir
+static inline void sos_run(const float *x, float *y, long long n, int n_sections,
+                           const float *sos, float *zi)
+{
+    std::vector<double> z(zi, zi + 2 * n_sections);
+    sos_run_d(x, y, n, n_sections, sos, z.data());
+    std::copy(z.begin(), z.end(), zi);
+}
+
+/**
+ * Un solo canal del filtro repartido en bloques de muestras (exacto, no aproximado).
+ * Un IIR es secuencial en el tiempo, pero es lineal: el estado al final de un bloque
+ * es el de la respuesta con estado cero más Phi * (estado inicial), donde Phi es la
+ * propagación del estado por L muestras de entrada cero.
+ *   1. En paralelo: estado final de cada bloque partiendo de cero (el bloque 0 con zi real).
+ *   2. En serie: estado inicial verdadero de cada bloque con la recurrencia de Phi.
+ *   3. En paralelo: se re-filtra cada bloque desde su estado verdadero.
+ * Costo ~2x el secuencial, repartido entre n_blocks hilos.
+ */
+static void sos_filter_blocked(const float *x, float *y, long long n_samples, int n_sections,
+                               const float *sos, float *zi, int n_threads)
+{
+    const int n_states = n_sections * 2;
+    long long block = std::max<long long>(MIN_BLOCK_SAMPLES, (n_samples + n_threads - 1) / n_threads);
+    int n_blocks = (int)((n_samples + block - 1) / block);
+    if (n_blocks <= 1)
+    {
+        sos_run(x, y, n_samples, n_sections, sos, zi);
+        return;
+    }
+
+    // Estados en double en las tres pasadas: el error de redondeo de los estados
+    // parciales y de Phi se amplifica con polos cerca del círculo unitario
+    std::vector<double> end_state((size_t)n_blocks * n_states, 0.0);
+    std::vector<double> phi((size_t)n_states * n_states); // phi[i * n_states + j]: estado i desde e_j
+
+#pragma omp parallel num_threads(n_threads)
+    {
+        // Paso 1: respuesta con estado cero de cada bloque (solo estados)
+#pragma omp for schedule(runtime) nowait
+        for (int b = 0; b < n_blocks; ++b)
+        {
+            long long start = b * block;
+            long long len = std::min(block, n_samples - start);
+            double *z = &end_state[(size_t)b * n_states];
+            if (b == 0)
+            {
+                // El primer bloque ya parte del estado real: su salida es definitiva
+                std::copy(zi, zi + n_states, z);
+                sos_run_d(x, y, len, n_sections, sos, z);
+            }
+            else
+                sos_run_d(x + start, nullptr, len, n_sections, sos, z);
+        }
+
+        // Columnas de Phi: propagación de cada estado unitario por 'block' muestras
+#pragma omp for schedule(runtime)
+        for (int j = 0; j < n_states; ++j)
+        {
+            std::vector<double> z(n_states, 0.0);
+            z[j] = 1.0;
+            sos_run_d(nullptr, nullptr, block, n_sections, sos, z.data());
+            for (int i = 0; i < n_states; ++i)
+                phi[(size_t)i * n_states + j] = z[i];
+        }
+
+        // Paso 2: estados iniciales verdaderos (s_{b+1} = e_b + Phi * s_b)
+#pragma omp single
+        {
+            std::vector<double> s(end_state.begin(), end_state.begin() + n_states), next(n_states);
+            for (int b = 1; b < n_blocks; ++b)
+            {
+                double *e = &end_state[(size_t)b * n_states];
+                for (int i = 0; i < n_states; ++i)
+                {
+                    double acc = e[i];
+                    for (int j = 0; j < n_states; ++j)
+                        acc += phi[(size_t)i * n_states + j] * s[j];
+                    next[i] = acc;
+                }
+                // end_state[b] pasa a guardar el estado inicial verdadero del bloque b
+                std::copy(s.begin(), s.end(), e);
+                s.swap(next);
+            }
+        }
+
+        // Paso 3: re-filtrado de cada bloque desde su estado verdadero
+#pragma omp for schedule(runtime)
+        for (int b = 1; b < n_blocks; ++b)
+        {
+            long long start = b * block;
+            long long len = std::min(block, n_samples - start);
+            sos_run_d(x + start, y + start, len, n_sections, sos, &end_state[(size_t)b * n_states]);
+        }
+    }
+
+    // El último bloque terminó con el estado final del canal
+    std::copy(&end_state[(size_t)(n_blocks - 1) * n_states],
+              &end_state[(size_t)n_blocks * n_states], zi);
+}
+
+// Suma de la DFT de una frecuencia sobre [start, stop) (índices absolutos: los parciales se suman)
+static inline void dft_partial(const float *x, long long start, long long stop, double omega,
+                               double &real, double &imag)
+{
+    for (long long n = start; n < stop; ++n)
+    {
+        double phase = n * omega;
+        real += x[n] * std::cos(phase);
+        imag -= x[n] * std::sin(phase);
+    }
+}
+
+// Suma de la DFT de una frecuencia sobre las muestras absolutas [start, stop] de un
+// buffer circular (la muestra m vive en hist[m % window]). Fase exacta en double.
+static inline void dft_ring(const float *hist, int window, long long start, long long stop,
+                            double omega, double &real, double &imag)
+{
+    real = 0.0;
+    imag = 0.0;
+    for (long long m = start; m <= stop; ++m)
+    {
+        double phase = std::fmod(m * omega, 2.0 * M_PI);
+        double x = hist[m % window];
+        real += x * std::cos(phase);
+        imag -= x * std::sin(phase);
+    }
+}
+
+// Un registro TEM de un canal: suma con polaridad al stack y, por ciclo, valor
+// medio de cada gate (sumas acumuladas del registro) a sus sumas y cuadrados.
+static inline void tem_accumulate(const float *x, float pol, int record_len,
+                                  const int *gate_start, const int *gate_stop, int n_gates,
+                                  double *stack, double *gsum, double *gsumsq, double *prefix)
+{
+    prefix[0] = 0.0;
+    for (int i = 0; i < record_len; ++i)
+    {
+        double v = (double)pol * x[i];
+        stack[i] += v;
+        prefix[i + 1] = prefix[i] + v;
+    }
+    for (int g = 0; g < n_gates; ++g)
+    {
+        double value = (prefix[gate_stop[g]] - prefix[gate_start[g]]) / (gate_stop[g] - gate_start[g]);
+        gsum[g] += value;
+        gsumsq[g] += value * value;
+    }
+}
+
 extern "C"
 {
+    // --- Control de hilos, schedule y eje de paralelismo ---------------------
+
+    /** Hilos por kernel (n <= 0 vuelve al valor por defecto de OpenMP). */
+    void set_parallel_threads(int n)
+    {
+        g_num_threads = n > 0 ? n : 0;
+    }
+
+    int get_parallel_threads()
+    {
+        return policy_threads();
+    }
+
+    /** Valor fijado con set_parallel_threads (0 = sin fijar, sigue a OpenMP). */
+    int get_parallel_threads_setting()
+    {
+        return g_num_threads;
+    }
+
+    int get_num_procs()
+    {
+        return omp_get_num_procs();
+    }
+
+    /**
+     * Schedule de los bucles paralelos: kind 1 = static, 2 = dynamic, 3 = guided, 4 = auto.
+     * chunk <= 0 usa el tamaño por defecto. Retorna -1 si kind no es válido.
+     */
+    int set_parallel_schedule(int kind, int chunk)
+    {
+        if (kind < (int)omp_sched_static || kind > (int)omp_sched_auto)
+            return -1;
+        g_sched_kind = kind;
+        g_sched_chunk = chunk > 0 ? chunk : 0;
+        return 0;
+    }
+
+    void get_parallel_schedule(int *kind, int *chunk)
+    {
+        *kind = g_sched_kind;
+        *chunk = g_sched_chunk;
+    }
+
+    /** Eje de paralelismo de un kernel (ParallelKernel, ParallelAxis). Retorna -1 si no es válido. */
+    int set_parallel_axis(int kernel, int axis)
+    {
+        if (kernel < 0 || kernel >= N_POLICY_KERNELS || axis < AXIS_AUTO || axis > AXIS_SAMPLES)
+            return -1;
+        g_axis[kernel] = axis;
+        return 0;
+    }
+
+    int get_parallel_axis(int kernel)
+    {
+        if (kernel < 0 || kernel >= N_POLICY_KERNELS)
+            return -1;
+        return g_axis[kernel];
+    }
+
+    // --- Contadores por kernel ----------------------------------------------
+
+    int get_kernel_counter_count()
+    {
+        return N_KERNEL_COUNTERS;
+    }
+
+    const char *get_kernel_counter_name(int id)
+    {
+        return (id >= 0 && id < N_KERNEL_COUNTERS) ? KERNEL_COUNTER_NAMES[id] : nullptr;
+    }
+
+    /** values: [calls, total_ns, max_ns, bytes, threads]. Retorna -1 si id no es válido. */
+    int get_kernel_counters(int id, long long *values)
+    {
+        if (id < 0 || id >= N_KERNEL_COUNTERS)
+            return -1;
+        KernelCounter &c = g_counters[id];
+        values[0] = c.calls.load();
+        values[1] = c.total_ns.load();
+        values[2] = c.max_ns.load();
+        values[3] = c.bytes.load();
+        values[4] = c.threads.load();
+        return 0;
+    }
+
+    void reset_kernel_counters()
+    {
+        for (KernelCounter &c : g_counters)
+        {
+            c.calls = 0;
+            c.total_ns = 0;
+            c.max_ns = 0;
+            c.bytes = 0;
+            c.threads = 0;
+        }
+    }
+
     /**
      * Procesa un bloque de datos usando secciones de segundo orden (SOS).
      * x: puntero a los datos de entrada
@@ -21,23 +397,9 @@ extern "C"
      */
     void apply_sos_filter_work(float *x, float *y, int n_samples, int n_sections, float *sos, float *zi)
     {
-        for (int i = 0; i < n_samples; ++i)
-        {
-            float val = x[i];
-            for (int s = 0; s < n_sections; ++s)
-            {
-                float *b = &sos[s * 6];
-                float *a = &sos[s * 6 + 3];
-                float *z = &zi[s * 2];
-
-                // Ecuación de diferencia (Forma Directa II Transpuesta)
-                float out = b[0] * val + z[0];
-                z[0] = b[1] * val - a[1] * out + z[1];
-                z[1] = b[2] * val - a[2] * out;
-                val = out; // La salida de esta sección es la entrada de la siguiente
-            }
-            y[i] = val;
-        }
+        KernelTimer timer(COUNTER_SOS_FILTER, 2LL * n_samples * sizeof(float));
+        // Forma Directa II Transpuesta en double (ver sos_run): mismo motor que el multicanal
+        sos_run(x, y, n_samples, n_sections, sos, zi);
     }
 
     /**
@@ -46,6 +408,7 @@ extern "C"
      */
     int load_binary_data(const char *filename, float *buffer, int n_samples)
     {
+        KernelTimer timer(COUNTER_LOAD_DATA, 0);
         std::ifstream file(filename, std::ios::binary);
         if (!file)
             return -1;
@@ -55,72 +418,286 @@ extern "C"
         if (file.gcount() == 0)
             return -2;
 
+        timer.bytes = file.gcount();
         return (int)(file.gcount() / sizeof(float)); // Retorna muestras leídas
     }
 
+    /**
+     * Carga un bloque de tiempo de un archivo multicanal (canal tras canal).
+     * Lee [start_sample, start_sample + n_samples) de cada canal sin cargar el resto,
+     * para procesar levantamientos más grandes que la RAM.
+     * buffer: salida [n_channels * n_samples]
+     * Retorna las muestras leídas por canal (puede ser menor al final del archivo).
+     */
+    int load_binary_block(const char *filename, float *buffer, int n_channels,
+                          long long samples_per_channel, long long start_sample, int n_samples)
+    {
+        KernelTimer timer(COUNTER_LOAD_BLOCK, 0);
+        std::ifstream file(filename, std::ios::binary);
+        if (!file)
+            return -1;
+        if (start_sample >= samples_per_channel)
+            return 0;
+
+        long long available = samples_per_channel - start_sample;
+        int to_read = (int)std::min<long long>(n_samples, available);
+        timer.bytes = (long long)n_channels * to_read * sizeof(float);
+        for (int ch = 0; ch < n_channels; ++ch)
+        {
+            std::streamoff offset = (std::streamoff)(ch * samples_per_channel + start_sample) * sizeof(float);
+            file.seekg(offset, std::ios::beg);
+            file.read(reinterpret_cast<char *>(&buffer[(long long)ch * n_samples]), to_read * sizeof(float));
+            if (file.gcount() != (std::streamsize)(to_read * sizeof(float)))
+                return -2;
+        }
+        return to_read;
+    }
+
     /**
      * Calcula la magnitud del espectro para un conjunto de frecuencias.
      * Esto es una versión simplificada (estilo Goertzel/DFT) para detectar
      * componentes específicas en los 24 canales en paralelo.
+     * El eje de paralelismo (KERNEL_SPECTRUM) puede ser:
+     *   canales     -> una tarea por canal (lo mejor con muchos canales)
+     *   frecuencias -> una tarea por par (canal, frecuencia): con 2 canales y 20
+     *                  frecuencias hay 40 tareas para repartir
+     *   muestras    -> cada hilo suma un bloque de muestras y los parciales se reducen
+     * La fase y los acumuladores van en double: n * omega pierde precisión en float
+     * con bloques largos.
      */
     void calculate_magnitude_spectrum(float *input, float *output_mag, int n_channels,
                                       int n_samples, float fs, float *target_freqs, int n_freqs)
     {
+        int n_threads = begin_parallel();
+        KernelTimer timer(COUNTER_SPECTRUM,
+                          (long long)n_channels * (n_samples + n_freqs) * sizeof(float), n_threads);
+        long long n_tasks = (long long)n_channels * n_freqs;
+        int axis = g_axis[KERNEL_SPECTRUM];
+        if (axis == AXIS_AUTO)
+        {
+            if (n_channels >= n_threads)
+                axis = AXIS_CHANNELS;
+            else if (n_tasks >= n_threads || n_samples < 2 * MIN_BLOCK_SAMPLES)
+                axis = AXIS_FREQUENCIES;
+            else
+                axis = AXIS_SAMPLES;
+        }
+
+        if (axis == AXIS_SAMPLES)
+        {
+            long long block = std::max<long long>(MIN_BLOCK_SAMPLES, ((long long)n_samples + n_threads - 1) / n_threads);
+            int n_blocks = (int)(((long long)n_samples + block - 1) / block);
+            // partial[b][ch * n_freqs + f] = (real, imag) del bloque b
+            std::vector<double> partial((size_t)n_blocks * n_tasks * 2, 0.0);
+
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+            for (int b = 0; b < n_blocks; b++)
+            {
+                long long start = b * block;
+                long long stop = std::min<long long>(start + block, n_samples);
+                double *acc = &partial[(size_t)b * n_tasks * 2];
+                for (long long t = 0; t < n_tasks; t++)
+                {
+                    const float *ch_input = &input[(t / n_freqs) * (long long)n_samples];
+                    double omega = 2.0 * M_PI * target_freqs[t % n_freqs] / fs;
+                    dft_partial(ch_input, start, stop, omega, acc[2 * t], acc[2 * t + 1]);
+                }
+            }
+
+            for (long long t = 0; t < n_tasks; t++)
+            {
+                double real = 0.0, imag = 0.0;
+                for (int b = 0; b < n_blocks; b++)
+                {
+                    real += partial[((size_t)b * n_tasks + t) * 2];
+                    imag += partial[((size_t)b * n_tasks + t) * 2 + 1];
+                }
+                output_mag[t] = (float)(std::sqrt(real * real + imag * imag) / n_samples);
+            }
+            return;
+        }
+
+        if (axis == AXIS_FREQUENCIES)
+        {
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+            for (long long t = 0; t < n_tasks; t++)
+            {
+                const float *ch_input = &input[(t / n_freqs) * (long long)n_samples];
+                double omega = 2.0 * M_PI * target_freqs[t % n_freqs] / fs;
+                double real = 0.0, imag = 0.0;
+                dft_partial(ch_input, 0, n_samples, omega, real, imag);
+                output_mag[t] = (float)(std::sqrt(real * real + imag * imag) / n_samples);
+            }
+            return;
+        }
 
-#pragma omp parallel for
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
         for (int ch = 0; ch < n_channels; ch++)
         {
-            float *ch_input = &input[ch * n_samples];
-            float *ch_output = &output_mag[ch * n_freqs];
+            float *ch_input = &input[(long long)ch * n_samples];
+            float *ch_output = &output_mag[(long long)ch * n_freqs];
+
+            for (int f = 0; f < n_freqs; f++)
+            {
+                double omega = 2.0 * M_PI * target_freqs[f] / fs;
+                double real = 0.0, imag = 0.0;
+                dft_partial(ch_input, 0, n_samples, omega, real, imag);
+                ch_output[f] = (float)(std::sqrt(real * real + imag * imag) / n_samples);
+            }
+        }
+    }
+
+    /**
+     * DFT deslizante (SDFT) de n_freqs frecuencias sobre una ventana de 'window'
+     * muestras que avanza de a una muestra, para todos los canales.
+     * Por canal y frecuencia se mantiene A = sum x[m] e^{-j omega m} de la ventana
+     * (fase absoluta). Cada muestra nueva suma su término y resta el de la que sale:
+     *     A += e^{-j omega m} (x[m] - x[m - window] e^{j omega window})
+     * con el rotador e^{-j omega m} actualizado por multiplicación: O(1) por bin y muestra.
+     * Corrección de estabilidad: el rotador se resincroniza con la fase exacta al
+     * inicio de cada llamada y cada 'recompute_every' muestras A se recalcula desde
+     * la historia (el error de redondeo acumulado no crece sin límite).
+     *
+     * input: [n_channels * n_samples]; omega: rad/muestra por frecuencia
+     * history: [n_channels * window] buffer circular de cada canal (inicia en cero)
+     * acc: [n_channels * n_freqs * 2] acumuladores (real, imag) en double
+     * state: [muestras procesadas, muestras desde el último recálculo]
+     * Cada 'hop' muestras (índice absoluto) emite un frame con la DFT de la ventana
+     * referida a su primera muestra: out_mag = |X| / window (misma escala que
+     * calculate_magnitude_spectrum) y out_phase = arg X, ambos
+     * [n_channels * frames * n_freqs]. Retorna la cantidad de frames emitidos.
+     */
+    int sliding_dft_update(float *input, int n_channels, int n_samples, double *omega, int n_freqs,
+                           int window, float *history, double *acc, long long *state,
+                           int hop, int recompute_every, float *out_mag, float *out_phase)
+    {
+        int n_threads = begin_parallel();
+        long long n0 = state[0];
+        int n_frames = (int)((n0 + n_samples) / hop - n0 / hop);
+        KernelTimer timer(COUNTER_SLIDING_DFT,
+                          ((long long)n_channels * n_samples + 2LL * n_channels * n_frames * n_freqs) * sizeof(float),
+                          n_threads);
+
+        // Constantes por frecuencia: paso del rotador e^{-j omega} y e^{j omega window}
+        std::vector<double> step_re(n_freqs), step_im(n_freqs), c_re(n_freqs), c_im(n_freqs);
+        for (int f = 0; f < n_freqs; f++)
+        {
+            step_re[f] = std::cos(omega[f]);
+            step_im[f] = -std::sin(omega[f]);
+            double w_phase = std::fmod(omega[f] * window, 2.0 * M_PI);
+            c_re[f] = std::cos(w_phase);
+            c_im[f] = std::sin(w_phase);
+        }
 
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+        for (int ch = 0; ch < n_channels; ch++)
+        {
+            const float *x = &input[(long long)ch * n_samples];
+            float *hist = &history[(long long)ch * window];
+            double *A = &acc[(long long)ch * n_freqs * 2];
+            std::vector<double> rot_re(n_freqs), rot_im(n_freqs);
             for (int f = 0; f < n_freqs; f++)
             {
-                float freq = target_freqs[f];
-                float omega = 2.0 * M_PI * freq / fs;
-                float real = 0.0, imag = 0.0;
+                double phase = std::fmod(omega[f] * n0, 2.0 * M_PI);
+                rot_re[f] = std::cos(phase);
+                rot_im[f] = -std::sin(phase);
+            }
+            long long since = state[1];
+            int frame = 0;
+
+            for (int i = 0; i < n_samples; i++)
+            {
+                long long m = n0 + i;
+                int pos = (int)(m % window);
+                double x_new = x[i];
+                double x_old = hist[pos];
+                hist[pos] = x[i];
+
+                for (int f = 0; f < n_freqs; f++)
+                {
+                    double d_re = x_new - x_old * c_re[f];
+                    double d_im = -x_old * c_im[f];
+                    A[2 * f] += rot_re[f] * d_re - rot_im[f] * d_im;
+                    A[2 * f + 1] += rot_re[f] * d_im + rot_im[f] * d_re;
+                    double r = rot_re[f] * step_re[f] - rot_im[f] * step_im[f];
+                    rot_im[f] = rot_re[f] * step_im[f] + rot_im[f] * step_re[f];
+                    rot_re[f] = r;
+                }
+
+                if (recompute_every > 0 && ++since >= recompute_every)
+                {
+                    long long start = std::max<long long>(0, m - window + 1);
+                    for (int f = 0; f < n_freqs; f++)
+                    {
+                        dft_ring(hist, window, start, m, omega[f], A[2 * f], A[2 * f + 1]);
+                        double phase = std::fmod(omega[f] * (m + 1), 2.0 * M_PI);
+                        rot_re[f] = std::cos(phase);
+                        rot_im[f] = -std::sin(phase);
+                    }
+                    since = 0;
+                }
 
-                for (int n = 0; n < n_samples; n++)
+                if ((m + 1) % hop == 0)
                 {
-                    real += ch_input[n] * cos(n * omega);
-                    imag -= ch_input[n] * sin(n * omega);
+                    long long out_base = ((long long)ch * n_frames + frame) * n_freqs;
+                    for (int f = 0; f < n_freqs; f++)
+                    {
+                        // X = A e^{j omega (m - window + 1)}: fase referida al inicio de la ventana
+                        double phase = std::fmod(omega[f] * (m - window + 1), 2.0 * M_PI);
+                        double cs = std::cos(phase), sn = std::sin(phase);
+                        double re = A[2 * f] * cs - A[2 * f + 1] * sn;
+                        double im = A[2 * f] * sn + A[2 * f + 1] * cs;
+                        out_mag[out_base + f] = (float)(std::sqrt(re * re + im * im) / window);
+                        out_phase[out_base + f] = (float)std::atan2(im, re);
+                    }
+                    frame++;
                 }
-                ch_output[f] = sqrt(real * real + imag * imag) / n_samples;
             }
         }
+
+        state[0] = n0 + n_samples;
+        if (recompute_every > 0)
+            state[1] = (state[1] + n_samples) % recompute_every;
+        return n_frames;
     }
 
-    // Procesa múltiples canales en paralelo
+    /**
+     * Procesa múltiples canales en paralelo.
+     * Eje (KERNEL_FILTER): canales, o bloques de muestras de cada canal (ver
+     * sos_filter_blocked) solo si se pide explícitamente: 'auto' siempre reparte
+     * canales. 'frecuencias' no aplica a este kernel y se trata como canales.
+     */
     void apply_sos_filter_multichannel(float *input, float *output, int n_channels,
                                        int n_samples, int n_sections,
                                        float *sos, float *zi)
     {
+        int n_threads = begin_parallel();
+        KernelTimer timer(COUNTER_MULTICHANNEL_FILTER,
+                          2LL * n_channels * n_samples * sizeof(float), n_threads);
+        int axis = g_axis[KERNEL_FILTER];
+        if (axis == AXIS_AUTO)
+            axis = AXIS_CHANNELS; // Los bloques cuestan ~2x y solo se usan a pedido
+
+        if (axis == AXIS_SAMPLES)
+        {
+            // Canal por canal, cada uno repartido entre todos los hilos
+            for (int ch = 0; ch < n_channels; ch++)
+                sos_filter_blocked(&input[(long long)ch * n_samples], &output[(long long)ch * n_samples],
+                                   n_samples, n_sections, sos, &zi[ch * n_sections * 2], n_threads);
+            return;
+        }
 
 // Esta línea es la "magia": reparte el bucle entre los hilos de la CPU
-#pragma omp parallel for
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
         for (int ch = 0; ch < n_channels; ch++)
         {
             // Calculamos los offsets para este canal específico
-            float *ch_input = &input[ch * n_samples];
-            float *ch_output = &output[ch * n_samples];
+            float *ch_input = &input[(long long)ch * n_samples];
+            float *ch_output = &output[(long long)ch * n_samples];
             float *ch_zi = &zi[ch * n_sections * 2];
 
             // Reutilizamos la lógica muestra a muestra para cada canal
-            for (int i = 0; i < n_samples; ++i)
-            {
-                float val = ch_input[i];
-                for (int s = 0; s < n_sections; ++s)
-                {
-                    float *b = &sos[s * 6];
-                    float *a = &sos[s * 6 + 3];
-                    float *z = &ch_zi[s * 2];
-
-                    float out = b[0] * val + z[0];
-                    z[0] = b[1] * val - a[1] * out + z[1];
-                    z[1] = b[2] * val - a[2] * out;
-                    val = out;
-                }
-                ch_output[i] = val;
-            }
+            sos_run(ch_input, ch_output, n_samples, n_sections, sos, ch_zi);
         }
     }
 
@@ -128,40 +705,186 @@ extern "C"
      * Realiza el promedio (stacking) de múltiples segmentos para reducir ruido.
      * data: matriz de [n_segments * segment_size]
      * output: donde se guardará el promedio [segment_size]
+     * Cada hilo es dueño de un bloque de muestras de la salida y recorre todos los
+     * segmentos sobre él: sin atomics y con accesos contiguos. El orden de la suma
+     * (segmento a segmento) es el mismo que en la versión serie.
      */
     void compute_stacking(float *data, float *output, int n_segments, int segment_size)
     {
-        // Inicializamos el output en cero
-        for (int i = 0; i < segment_size; i++)
-            output[i] = 0.0f;
+        int n_threads = begin_parallel();
+        KernelTimer timer(COUNTER_STACKING,
+                          (n_segments + 1LL) * segment_size * sizeof(float), n_threads);
+        const int block = 1024; // Muestras de salida por tarea (caben en L1)
+        int n_blocks = (segment_size + block - 1) / block;
 
-        // Sumamos todos los segmentos
-        for (int s = 0; s < n_segments; s++)
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+        for (int b = 0; b < n_blocks; b++)
         {
-            float *segment = &data[s * segment_size];
-#pragma omp parallel for
-            for (int i = 0; i < segment_size; i++)
+            int start = b * block;
+            int stop = std::min(start + block, segment_size);
+            for (int i = start; i < stop; i++)
+                output[i] = 0.0f;
+
+            // Sumamos todos los segmentos sobre este bloque
+            for (int s = 0; s < n_segments; s++)
             {
-#pragma omp atomic
-                output[i] += segment[i];
+                const float *segment = &data[(long long)s * segment_size];
+                for (int i = start; i < stop; i++)
+                    output[i] += segment[i];
             }
+
+            // Dividimos por el número de segmentos para obtener el promedio
+            for (int i = start; i < stop; i++)
+                output[i] /= n_segments;
         }
+    }
+
 
-        // Dividimos por el número de segmentos para obtener el promedio
-        for (int i = 0; i < segment_size; i++)
+    /**
+     * Stacking sincrónico TEM y gates en una sola pasada sobre un bloque continuo.
+     * Cada ciclo del transmisor aporta un registro de decaimiento que empieza en el
+     * corte de corriente: [cycle_starts[k], cycle_starts[k] + record_len). El
+     * registro se multiplica por polarity[k] (+1/-1, alternancia del transmisor:
+     * el offset y la deriva lenta se cancelan) y se suma al stack; en la misma
+     * pasada se integra cada gate [gate_start, gate_stop) del registro y se
+     * acumulan su suma y su suma de cuadrados (para el error del stacking).
+     *
+     * input: [n_channels * n_samples]; cada registro debe caber en el bloque
+     * stack_sum: [n_channels * record_len]; gate_sum / gate_sumsq: [n_channels * n_gates]
+     * Los acumuladores (double) se actualizan en su lugar: un sondeo largo se reduce
+     * por bloques llamando varias veces con los mismos buffers.
+     * Eje (KERNEL_STACKING): canales, o ciclos con acumuladores por hilo que se
+     * suman al final cuando hay menos canales que hilos (lo usual: 1-3 componentes).
+     */
+    void tem_stack_gates(float *input, int n_channels, long long n_samples,
+                         long long *cycle_starts, float *polarity, int n_cycles, int record_len,
+                         int *gate_start, int *gate_stop, int n_gates,
+                         double *stack_sum, double *gate_sum, double *gate_sumsq)
+    {
+        int n_threads = begin_parallel();
+        KernelTimer timer(COUNTER_TEM_STACKING,
+                          (long long)n_channels * n_cycles * record_len * sizeof(float), n_threads);
+        int axis = g_axis[KERNEL_STACKING];
+        if (axis == AXIS_AUTO)
+            axis = (n_channels >= n_threads) ? AXIS_CHANNELS : AXIS_SAMPLES;
+
+        if (axis == AXIS_SAMPLES)
+        {
+            long long stack_size = (long long)n_channels * record_len;
+            long long gate_size = (long long)n_channels * n_gates;
+#pragma omp parallel num_threads(n_threads)
+            {
+                std::vector<double> stack(stack_size, 0.0), gsum(gate_size, 0.0), gsumsq(gate_size, 0.0);
+                std::vector<double> prefix(record_len + 1);
+#pragma omp for schedule(runtime) nowait
+                for (int k = 0; k < n_cycles; k++)
+                {
+                    for (int ch = 0; ch < n_channels; ch++)
+                        tem_accumulate(&input[ch * n_samples + cycle_starts[k]], polarity[k], record_len,
+                                       gate_start, gate_stop, n_gates, &stack[(long long)ch * record_len],
+                                       &gsum[(long long)ch * n_gates], &gsumsq[(long long)ch * n_gates],
+                                       prefix.data());
+                }
+#pragma omp critical
+                {
+                    for (long long i = 0; i < stack_size; i++)
+                        stack_sum[i] += stack[i];
+                    for (long long i = 0; i < gate_size; i++)
+                    {
+                        gate_sum[i] += gsum[i];
+                        gate_sumsq[i] += gsumsq[i];
+                    }
+                }
+            }
+            return;
+        }
+
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+        for (int ch = 0; ch < n_channels; ch++)
         {
-            output[i] /= n_segments;
+            std::vector<double> prefix(record_len + 1);
+            const float *x = &input[ch * n_samples];
+            for (int k = 0; k < n_cycles; k++)
+                tem_accumulate(&x[cycle_starts[k]], polarity[k], record_len, gate_start, gate_stop, n_gates,
+                               &stack_sum[(long long)ch * record_len], &gate_sum[(long long)ch * n_gates],
+                               &gate_sumsq[(long long)ch * n_gates], prefix.data());
         }
     }
 
+    /**
+     * Remuestreo con retardo fraccional (sinc con ventana, tabla polifásica) de
+     * varios canales en una pasada. La muestra de salida j del canal ch se
+     * interpola en la posición fraccional de la entrada
+     *     pos = pos0[ch] + step[ch] * j
+     * (retardo + deriva de reloj lineal: cada canal trae su propio mapeo).
+     * table: [(n_phases + 1) * 2 * half_taps] respuesta del filtro para n_phases + 1
+     * fracciones en [0, 1]; entre dos fases se interpola linealmente. El tap t
+     * de la fila multiplica a input[floor(pos) - half_taps + 1 + t]. Las muestras
+     * fuera de [0, n_in) cuentan como cero.
+     *
+     * input: [n_channels * n_in]; output: [n_channels * n_out]
+     * Sin estado: las tareas son pares (canal, bloque de salida), así se reparten
+     * todos los hilos aunque haya pocos canales.
+     */
+    void fractional_delay_resample(float *input, int n_channels, long long n_in,
+                                   double *pos0, double *step, long long n_out,
+                                   float *table, int half_taps, int n_phases, float *output)
+    {
+        int n_threads = begin_parallel();
+        KernelTimer timer(COUNTER_RESAMPLE,
+                          (long long)n_channels * (n_in + n_out) * sizeof(float), n_threads);
+        const long long block = 4096; // Muestras de salida por tarea
+        const int n_taps = 2 * half_taps;
+        long long n_blocks = (n_out + block - 1) / block;
+
+#pragma omp parallel for schedule(runtime) num_threads(n_threads)
+        for (long long task = 0; task < n_channels * n_blocks; task++)
+        {
+            int ch = (int)(task / n_blocks);
+            long long start = (task % n_blocks) * block;
+            long long stop = std::min(start + block, n_out);
+            const float *x = &input[ch * n_in];
+            float *y = &output[ch * n_out];
+
+            for (long long j = start; j < stop; j++)
+            {
+                double pos = pos0[ch] + step[ch] * (double)j;
+                double base = std::floor(pos);
+                double phase = (pos - base) * n_phases;
+                int p = std::min((int)phase, n_phases - 1);
+                float w = (float)(phase - p);
+                const float *h0 = &table[(long long)p * n_taps];
+                const float *h1 = h0 + n_taps;
+                long long first = (long long)base - half_taps + 1;
+
+                float acc = 0.0f;
+                if (first >= 0 && first + n_taps <= n_in)
+                {
+                    const float *xs = &x[first];
+                    for (int t = 0; t < n_taps; t++)
+                        acc += xs[t] * (h0[t] + w * (h1[t] - h0[t]));
+                }
+                else
+                {
+                    // Borde del bloque: solo los taps con muestra
+                    for (int t = std::max(0LL, -first); t < n_taps && first + t < n_in; t++)
+                        acc += x[first + t] * (h0[t] + w * (h1[t] - h0[t]));
+                }
+                y[j] = acc;
+            }
+        }
+    }
 
     // Interpolación bilineal de resistividad en una malla 2D
     void c_interpolate_resistivity(
         float* input_rho, int in_rows, int in_cols,
         float* output_rho, int out_rows, int out_cols) 
     {
+        KernelTimer timer(COUNTER_INTERPOLATE,
+                          ((long long)in_rows * in_cols + (long long)out_rows * out_cols) * sizeof(float),
+                          policy_threads());
         // Paralelismo con OpenMP para procesar la nueva malla ultra rápido
-        #pragma omp parallel for collapse(2)
+        #pragma omp parallel for collapse(2) num_threads(policy_threads())
         for (int i = 0; i < out_rows; ++i) {
             for (int j = 0; j < out_cols; ++j) {
                 // Mapeo de coordenadas de la malla nueva a la original
@@ -191,4 +914,206 @@ extern "C"
         }
     }
 
-}
\ No newline at end of file
+    /**
+     * Aplica un plan de interpolación separable precalculado a un lote de matrices.
+     * Los índices y pesos se calculan una sola vez en Python (InterpolationPlan),
+     * aquí solo queda el gather + FMA por cada celda de salida.
+     * row_idx/col_idx: pares [i0, i1] por fila/columna de salida
+     * row_w/col_w: peso de i1 (el peso de i0 es 1 - w)
+     */
+    void apply_interpolation_plan(
+        float *input, int n_batch, int in_rows, int in_cols,
+        int *row_idx, float *row_w, int out_rows,
+        int *col_idx, float *col_w, int out_cols,
+        float *output)
+    {
+        KernelTimer timer(COUNTER_INTERPOLATION_PLAN,
+                          (long long)n_batch * (in_rows * in_cols + out_rows * out_cols) * sizeof(float),
+                          policy_threads());
+#pragma omp parallel for collapse(2) num_threads(policy_threads())
+        for (int b = 0; b < n_batch; ++b)
+        {
+            for (int i = 0; i < out_rows; ++i)
+            {
+                float *src = &input[(long long)b * in_rows * in_cols];
+                float *r0 = &src[row_idx[2 * i] * in_cols];
+                float *r1 = &src[row_idx[2 * i + 1] * in_cols];
+                float wr = row_w[i];
+                float *dst = &output[((long long)b * out_rows + i) * out_cols];
+
+                for (int j = 0; j < out_cols; ++j)
+                {
+                    int j0 = col_idx[2 * j];
+                    int j1 = col_idx[2 * j + 1];
+                    float wc = col_w[j];
+                    float top = r0[j0] + wc * (r0[j1] - r0[j0]);
+                    float bottom = r1[j0] + wc * (r1[j1] - r1[j0]);
+                    dst[j] = top + wr * (bottom - top);
+                }
+            }
+        }
+    }
+
+    /**
+     * Interpolación 3D por inverso de la distancia (IDW) desde sondeos dispersos.
+     * station_xy: posiciones [x, y] de cada estación (n_stations * 2)
+     * soundings: resistividad de cada estación sobre el eje vertical (n_stations * n_depth)
+     * grid_x/grid_y: ejes de la malla de salida
+     * output: volumen [n_depth][ny][nx] (x más rápido, el orden de VTK)
+     * Las vecinas se buscan con un índice espacial de celdas uniformes.
+     */
+    void idw_interpolate_volume(
+        float *station_xy, float *soundings, int n_stations, int n_depth,
+        float *grid_x, int nx, float *grid_y, int ny,
+        int k_neighbors, float power, float *output)
+    {
+        KernelTimer timer(COUNTER_IDW_VOLUME,
+                          ((long long)n_stations * (2 + n_depth) + (long long)nx * ny * n_depth) * sizeof(float),
+                          policy_threads());
+        if (k_neighbors > n_stations)
+            k_neighbors = n_stations;
+
+        // 1. Índice espacial: malla uniforme con ~2 estaciones por celda
+        float x_min = station_xy[0], x_max = station_xy[0];
+        float y_min = station_xy[1], y_max = station_xy[1];
+        for (int s = 1; s < n_stations; ++s)
+        {
+            x_min = std::min(x_min, station_xy[2 * s]);
+            x_max = std::max(x_max, station_xy[2 * s]);
+            y_min = std::min(y_min, station_xy[2 * s + 1]);
+            y_max = std::max(y_max, station_xy[2 * s + 1]);
+        }
+        float span = std::max(x_max - x_min, y_max - y_min);
+        if (span < 1e-6f)
+        {
+            // Una estación o todas en el mismo punto: una sola celda del tamaño de la
+            // malla de salida (con span ~0 la celda sería ~0 y los índices, enormes)
+            for (int ix = 0; ix < nx; ++ix)
+                span = std::max(span, std::abs(grid_x[ix] - x_min));
+            for (int iy = 0; iy < ny; ++iy)
+                span = std::max(span, std::abs(grid_y[iy] - y_min));
+            span = std::max(span, 1.0f);
+        }
+        int n_side = std::max(1, (int)std::sqrt(n_stations / 2.0));
+        float cell = span / n_side;
+        int ncx = std::max(1, (int)((x_max - x_min) / cell) + 1);
+        int ncy = std::max(1, (int)((y_max - y_min) / cell) + 1);
+
+        // Counting sort de las estaciones por celda
+        std::vector<int> cell_start(ncx * ncy + 1, 0);
+        std::vector<int> cell_items(n_stations);
+        std::vector<int> station_cell(n_stations);
+        for (int s = 0; s < n_stations; ++s)
+        {
+            int cx = std::min(ncx - 1, (int)((station_xy[2 * s] - x_min) / cell));
+            int cy = std::min(ncy - 1, (int)((station_xy[2 * s + 1] - y_min) / cell));
+            station_cell[s] = cy * ncx + cx;
+            cell_start[station_cell[s] + 1]++;
+        }
+        for (int c = 0; c < ncx * ncy; ++c)
+            cell_start[c + 1] += cell_start[c];
+        std::vector<int> fill(cell_start.begin(), cell_start.end() - 1);
+        for (int s = 0; s < n_stations; ++s)
+            cell_items[fill[station_cell[s]]++] = s;
+
+        long long plane = (long long)nx * ny;
+
+        // 2. Cada columna (x, y) es independiente: paralelizamos sobre la malla horizontal
+#pragma omp parallel num_threads(policy_threads())
+        {
+            std::vector<int> best_idx(k_neighbors);
+            std::vector<float> best_d2(k_neighbors);
+            std::vector<float> weights(k_neighbors);
+
+#pragma omp for collapse(2) schedule(dynamic, 16)
+            for (int iy = 0; iy < ny; ++iy)
+            {
+                for (int ix = 0; ix < nx; ++ix)
+                {
+                    float px = grid_x[ix], py = grid_y[iy];
+                    // Puntos lejos del índice se sujetan a la celda vecina al borde: el
+                    // anillo r sigue a >= r - 1 celdas del punto y r_max queda acotado
+                    float fx = std::floor((px - x_min) / cell);
+                    float fy = std::floor((py - y_min) / cell);
+                    int cx = (int)std::min(std::max(fx, -1.0f), (float)ncx);
+                    int cy = (int)std::min(std::max(fy, -1.0f), (float)ncy);
+                    int found = 0;
+
+                    // Búsqueda por anillos concéntricos de celdas
+                    int r_max = std::max(std::max(std::abs(cx), std::abs(ncx - 1 - cx)),
+                                         std::max(std::abs(cy), std::abs(ncy - 1 - cy)));
+                    for (int r = 0; r <= r_max; ++r)
+                    {
+                        for (int gy = cy - r; gy <= cy + r; ++gy)
+                        {
+                            if (gy < 0 || gy >= ncy)
+                                continue;
+                            int step = (gy == cy - r || gy == cy + r) ? 1 : 2 * r;
+                            for (int gx = cx - r; gx <= cx + r; gx += std::max(step, 1))
+                            {
+                                if (gx < 0 || gx >= ncx)
+                                    continue;
+                                int c = gy * ncx + gx;
+                                for (int it = cell_start[c]; it < cell_start[c + 1]; ++it)
+                                {
+                                    int s = cell_items[it];
+                                    float dx = station_xy[2 * s] - px;
+                                    float dy = station_xy[2 * s + 1] - py;
+                                    float d2 = dx * dx + dy * dy;
+                                    if (found < k_neighbors)
+                                    {
+                                        best_idx[found] = s;
+                                        best_d2[found] = d2;
+                                        found++;
+                                    }
+                                    else if (d2 < best_d2[k_neighbors - 1])
+                                    {
+                                        best_idx[k_neighbors - 1] = s;
+                                        best_d2[k_neighbors - 1] = d2;
+                                    }
+                                    else
+                                        continue;
+                                    // Mantener la lista ordenada (inserción, k es pequeño)
+                                    for (int q = found - 1; q > 0 && best_d2[q] < best_d2[q - 1]; --q)
+                                    {
+                                        std::swap(best_d2[q], best_d2[q - 1]);
+                                        std::swap(best_idx[q], best_idx[q - 1]);
+                                    }
+                                }
+                            }
+                        }
+                        // El anillo r+1 está al menos a r celdas de distancia
+                        float ring_dist = r * cell;
+                        if (found == k_neighbors && best_d2[k_neighbors - 1] <= ring_dist * ring_dist)
+                            break;
+                    }
+
+                    // 3. Pesos IDW (una estación coincidente toma todo el peso)
+                    float w_sum = 0.0f;
+                    for (int q = 0; q < found; ++q)
+                    {
+                        if (best_d2[q] < 1e-12f)
+                        {
+                            for (int p = 0; p < found; ++p)
+                                weights[p] = 0.0f;
+                            weights[q] = 1.0f;
+                            w_sum = 1.0f;
+                            break;
+                        }
+                        weights[q] = std::pow(best_d2[q], -0.5f * power);
+                        w_sum += weights[q];
+                    }
+
+                    float *column = &output[(long long)iy * nx + ix];
+                    for (int z = 0; z < n_depth; ++z)
+                    {
+                        float acc = 0.0f;
+                        for (int q = 0; q < found; ++q)
+                            acc += weights[q] * soundings[(long long)best_idx[q] * n_depth + z];
+                        column[z * plane] = acc / w_sum;
+                    }
+                }
+            }
+        }
+    }
+}
@@ -0,0 +1,411 @@
+# src\io\results_store.py
+"""
+Almacén persistente de resultados por columnas y sólo de anexado.
+
+Los resultados (espectros, impedancias, resistividades, trazas apiladas) viven
+en memoria hasta que se cierran los gráficos. ResultsStore los anexa a disco
+en formato largo, una fila por (estación, ventana de tiempo[, frecuencia]):
+
+    store = ResultsStore("results/store")
+    store.append_matrix("resistivity", stations, freqs, time="2024-03-01T12:00:00",
+                        rho=rho_matrix, phase=phase_matrix)   # (estaciones, frecuencias)
+    store.flush()
+
+    sel = store.query("resistivity", stations=["CH1", "CH3"], freq=(1, 100), columns=["rho"])
+    names, freqs, rho = store.matrix("resistivity", "rho", time=t)  # para render_3d
+
+Disposición en disco:
+
+    store.json                          índice: esquema y zonas de cada chunk
+    <tabla>/<chunk 000000>/<columna>.npy
+
+Cada chunk es inmutable: las filas se acumulan en memoria y se escriben al
+llegar a chunk_rows (o con flush()). El índice guarda por chunk las
+estaciones presentes y el rango de tiempo y frecuencia, así una consulta sólo
+abre los chunks que pueden tener filas y los lee con np.load(mmap_mode="r"):
+no se recarga ni se reprocesa el dato crudo. El índice se reescribe de forma
+atómica (tmp + os.replace) después de cada chunk.
+
+Varios procesos pueden anexar al mismo almacén (p. ej. corridas sucesivas de
+main_processor --store): cada escritura toma store.lock, relee store.json,
+asigna los códigos de estación y el id del chunk sobre el índice recién leído,
+crea la carpeta del chunk con os.mkdir exclusivo y recién entonces reescribe
+el índice. Las filas pendientes guardan los nombres de estación, no códigos.
+
+Columnas clave: station (nombre, codificado como int32 en el índice), time
+(datetime64[ns]) y, si la tabla la usa, freq (float64). El resto son columnas
+de valores con cualquier dtype de NumPy (complex64 para impedancias) y forma
+por fila fija (escalares o vectores, p. ej. una traza apilada por fila).
+"""
+
+import json
+import os
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+from src.processing.timebase import parse_time
+
+INDEX_NAME = "store.json"
+LOCK_NAME = "store.lock"
+LOCK_TIMEOUT_S = 30.0
+LOCK_STALE_S = 300.0 # Un lock más viejo que esto es de un proceso que murió
+KEY_COLUMNS = ("station", "time", "freq")
+
+
+class ResultsStore:
+    """
+    path: Carpeta del almacén (se crea si no existe)
+    chunk_rows: Filas por chunk; con menos, las filas esperan en memoria hasta flush()
+    """
+
+    def __init__(self, path, chunk_rows=65536):
+        self.path = path
+        self.chunk_rows = chunk_rows
+        os.makedirs(path, exist_ok=True)
+        self._index_mtime = None
+        self.index = {"version": 1, "stations": [], "tables": {}}
+        self._codes = {}
+        self._reload()
+        self._pending = {} # tabla → lista de dicts de columnas aún no escritos
+
+    def _reload(self):
+        """Relee store.json si cambió en disco (otro proceso pudo anexar chunks)."""
+        index_path = os.path.join(self.path, INDEX_NAME)
+        if not os.path.exists(index_path):
+            return
+        mtime = os.stat(index_path).st_mtime_ns
+        if mtime == self._index_mtime:
+            return
+        with open(index_path, "r", encoding="utf-8") as f:
+            self.index = json.load(f)
+        self._index_mtime = mtime
+        self._codes = {name: code for code, name in enumerate(self.index["stations"])}
+
+    @contextmanager
+    def _locked(self):
+        """Lock de escritura entre procesos: archivo creado con O_EXCL."""
+        lock_path = os.path.join(self.path, LOCK_NAME)
+        deadline = time.monotonic() + LOCK_TIMEOUT_S
+        while True:
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - os.stat(lock_path).st_mtime > LOCK_STALE_S:
+                        os.remove(lock_path)
+                        continue
+                except FileNotFoundError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"{lock_path}: otro proceso mantiene el lock del almacén")
+                time.sleep(0.01)
+        try:
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            self._index_mtime = None # Siempre releer bajo el lock
+            self._reload()
+            yield
+        finally:
+            os.remove(lock_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+
+    # --- Escritura --------------------------------------------------------------
+
+    def _station_codes(self, stations):
+        """Códigos de estación sobre el índice actual (llamar con el lock tomado)."""
+        codes = np.empty(len(stations), dtype=np.int32)
+        for i, name in enumerate(stations):
+            name = str(name)
+            if name not in self._codes:
+                self._codes[name] = len(self.index["stations"])
+                self.index["stations"].append(name)
+            codes[i] = self._codes[name]
+        return codes
+
+    def _check_schema(self, table, columns, create=False):
+        """
+        La primera escritura fija las columnas de la tabla; las siguientes deben coincidir.
+        create: registra la tabla en el índice si no existe (solo al escribir, con el lock).
+        """
+        schema = {name: {"dtype": arr.dtype.str, "shape": list(arr.shape[1:])}
+                  for name, arr in columns.items()}
+        schema["station"] = {"dtype": np.dtype(np.int32).str, "shape": []} # Se guarda codificada
+        meta = self.index["tables"].get(table)
+        if meta is None:
+            meta = {"columns": schema, "rows": 0, "chunks": []}
+            if create:
+                self.index["tables"][table] = meta
+        if meta["columns"] != schema:
+            diff = sorted(name for name in set(schema) | set(meta["columns"])
+                          if schema.get(name) != meta["columns"].get(name))
+            raise ValueError(f"{table}: las columnas {diff} no coinciden con el esquema de la tabla "
+                             f"(nombre, dtype y forma por fila)")
+        return meta
+
+    def append(self, table, station, time, freq=None, **values):
+        """
+        Anexa filas a 'table'. station / time / freq y cada columna de valores se
+        difunden (broadcast) a la misma cantidad de filas: una estación y un
+        tiempo con un vector de frecuencias dan una fila por frecuencia.
+        Las columnas de valores con forma por fila (vectores) llevan esa forma
+        en sus últimos ejes: (filas, ...).
+        """
+        if not values:
+            raise ValueError("append: se necesita al menos una columna de valores")
+        values = {name: np.asarray(v) for name, v in values.items()}
+        if any(name in KEY_COLUMNS for name in values):
+            raise ValueError(f"Las columnas {KEY_COLUMNS} son claves, no valores")
+        time = np.asarray(time)
+        if time.dtype.kind != "M": # Texto ISO, datetime o segundos GPS
+            time = np.array([parse_time(t) for t in time.reshape(-1)], dtype="datetime64[ns]")
+        keys = {"station": np.asarray(station), "time": time.astype("datetime64[ns]")}
+        if freq is not None:
+            keys["freq"] = np.asarray(freq, dtype=np.float64)
+
+        n = max([k.size for k in keys.values()] + [v.shape[0] if v.ndim else 1 for v in values.values()])
+        columns = {}
+        for name, key in keys.items():
+            if key.size not in (1, n):
+                raise ValueError(f"{name}: {key.size} valores para {n} filas")
+            columns[name] = np.broadcast_to(key.reshape(-1), (n,)) if key.size == 1 else key.reshape(-1)
+        columns["station"] = np.array([str(st) for st in columns["station"]], dtype=object)
+        for name, v in values.items():
+            columns[name] = np.broadcast_to(v, (n,) + v.shape[1:]) if v.ndim == 0 or v.shape[0] == 1 else v
+            if columns[name].shape[0] != n:
+                raise ValueError(f"{name}: {columns[name].shape[0]} filas, se esperaban {n}")
+        columns = {name: np.ascontiguousarray(col) for name, col in columns.items()}
+
+        self._check_schema(table, columns) # Error temprano contra el índice conocido
+        pending = self._pending.setdefault(table, [])
+        pending.append(columns)
+        if sum(len(c["station"]) for c in pending) >= self.chunk_rows:
+            self._flush_table(table, full_only=True)
+        return n
+
+    def append_matrix(self, table, stations, freqs, time, **matrices):
+        """
+        Anexa resultados (estaciones, frecuencias) de una ventana, como rho_matrix
+        o las magnitudes del espectro: una fila por estación y frecuencia.
+        """
+        stations = list(stations)
+        freqs = np.asarray(freqs, dtype=np.float64)
+        n_st, n_f = len(stations), len(freqs)
+        values = {}
+        for name, m in matrices.items():
+            m = np.asarray(m)
+            if m.shape[:2] != (n_st, n_f):
+                raise ValueError(f"{name}: se esperaba la forma ({n_st}, {n_f}), se recibió {m.shape}")
+            values[name] = m.reshape((n_st * n_f,) + m.shape[2:])
+        return self.append(table, np.repeat(np.array(stations, dtype=object), n_f), time,
+                           freq=np.tile(freqs, n_st), **values)
+
+    def _flush_table(self, table, full_only=False):
+        """Escribe las filas pendientes; con full_only, sólo chunks completos (el resto sigue en memoria)."""
+        pending = self._pending.pop(table, [])
+        if not pending:
+            return
+        columns = {name: np.concatenate([p[name] for p in pending]) for name in pending[0]}
+        n = len(columns["station"])
+        stop = n - n % self.chunk_rows if full_only else n
+        if stop < n:
+            self._pending[table] = [{name: col[stop:] for name, col in columns.items()}]
+        if stop == 0:
+            return
+        with self._locked():
+            # Esquema y códigos contra el índice recién leído (otro proceso pudo escribir)
+            meta = self._check_schema(table, columns, create=True)
+            codes = self._station_codes(columns["station"][:stop])
+            for start in range(0, stop, self.chunk_rows):
+                part = {name: col[start:min(start + self.chunk_rows, stop)]
+                        for name, col in columns.items()}
+                part["station"] = codes[start:start + len(part["station"])]
+                self._write_chunk(table, meta, part)
+            self._save_index()
+
+    def _write_chunk(self, table, meta, columns):
+        # Id nuevo y carpeta exclusiva: una carpeta huérfana (escritor que murió antes
+        # de actualizar el índice) nunca se reutiliza ni se mezcla con este chunk
+        chunk_id = max((entry["id"] for entry in meta["chunks"]), default=-1) + 1
+        os.makedirs(os.path.join(self.path, table), exist_ok=True)
+        while True:
+            chunk_dir = os.path.join(self.path, table, f"{chunk_id:06d}")
+            try:
+                os.mkdir(chunk_dir)
+                break
+            except FileExistsError:
+                chunk_id += 1
+        for name, col in columns.items():
+            np.save(os.path.join(chunk_dir, f"{name}.npy"), col)
+        times = columns["time"].astype(np.int64)
+        entry = {"id": chunk_id, "rows": len(times),
+                 "stations": sorted(int(c) for c in np.unique(columns["station"])),
+                 "time": [int(times.min()), int(times.max())]}
+        if "freq" in columns:
+            entry["freq"] = [float(columns["freq"].min()), float(columns["freq"].max())]
+        # El chunk queda completo en disco antes de que el índice lo nombre
+        meta["chunks"].append(entry)
+        meta["rows"] += entry["rows"]
+
+    def _save_index(self):
+        path = os.path.join(self.path, INDEX_NAME)
+        tmp = path + f".{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp, path)
+        self._index_mtime = os.stat(path).st_mtime_ns
+
+    def flush(self):
+        """Escribe las filas pendientes de todas las tablas."""
+        for table in list(self._pending):
+            self._flush_table(table)
+
+    # --- Lectura ----------------------------------------------------------------
+
+    def tables(self):
+        """{tabla: {"rows", "chunks", "columns"}} de lo ya escrito en disco."""
+        self._reload()
+        return {name: {"rows": meta["rows"], "chunks": len(meta["chunks"]),
+                       "columns": sorted(set(meta["columns"]) - set(KEY_COLUMNS))}
+                for name, meta in self.index["tables"].items()}
+
+    def stations(self):
+        self._reload()
+        return list(self.index["stations"])
+
+    def _chunk_candidates(self, meta, codes, t_range, f_range):
+        """Chunks cuyas zonas (estaciones, tiempo, frecuencia) se cruzan con el filtro."""
+        for entry in meta["chunks"]:
+            if codes is not None and not codes.intersection(entry["stations"]):
+                continue
+            if t_range is not None and (entry["time"][1] < t_range[0] or entry["time"][0] > t_range[1]):
+                continue
+            if f_range is not None and "freq" in entry and \
+                    (entry["freq"][1] < f_range[0] or entry["freq"][0] > f_range[1]):
+                continue
+            yield entry
+
+    @staticmethod
+    def _range(value, convert):
+        """Un valor exacto o una tupla (mín, máx) inclusiva; None en un extremo = abierto."""
+        if value is None:
+            return None
+        lo, hi = value if isinstance(value, (tuple, list)) else (value, value)
+        return convert(lo, lower=True), convert(hi, lower=False)
+
+    @staticmethod
+    def _time_ns(t, lower):
+        if t is None:
+            return np.iinfo(np.int64).min if lower else np.iinfo(np.int64).max
+        return int(parse_time(t).astype(np.int64))
+
+    @staticmethod
+    def _freq_hz(f, lower):
+        if f is None:
+            return -np.inf if lower else np.inf
+        return float(f)
+
+    def query(self, table, stations=None, time=None, freq=None, columns=None):
+        """
+        Filas de 'table' que cumplen los filtros, leídas por mmap de los chunks
+        que pueden contenerlas.
+        stations: Nombres de estación (None = todas)
+        time: Instante o (inicio, fin) inclusivo, en cualquier formato de parse_time
+        freq: Frecuencia o (mín, máx) inclusivo en Hz
+        columns: Columnas de valores a leer (None = todas)
+        Retorna {columna: arreglo}, con "station" (nombres), "time" y "freq" (si existe).
+        """
+        self._reload()
+        meta = self.index["tables"].get(table)
+        if meta is None:
+            raise KeyError(f"Tabla desconocida: {table!r} (tablas: {', '.join(self.index['tables'])})")
+        schema = meta["columns"]
+        if columns is None:
+            columns = [c for c in schema if c not in KEY_COLUMNS]
+        missing = set(columns) - set(schema)
+        if missing:
+            raise KeyError(f"{table}: columnas desconocidas {sorted(missing)}")
+
+        codes = None
+        if stations is not None:
+            codes = {self._codes[str(s)] for s in stations if str(s) in self._codes}
+        t_range = self._range(time, self._time_ns)
+        f_range = self._range(freq, self._freq_hz)
+        keys = [k for k in KEY_COLUMNS if k in schema]
+
+        parts = {name: [] for name in keys + list(columns)}
+        for entry in self._chunk_candidates(meta, codes, t_range, f_range):
+            chunk_dir = os.path.join(self.path, table, f"{entry['id']:06d}")
+            load = lambda name: np.load(os.path.join(chunk_dir, f"{name}.npy"), mmap_mode="r")
+            mask = np.ones(entry["rows"], dtype=bool)
+            if codes is not None:
+                mask &= np.isin(load("station"), list(codes))
+            if t_range is not None:
+                t = load("time").view(np.int64)
+                mask &= (t >= t_range[0]) & (t <= t_range[1])
+            if f_range is not None and "freq" in schema:
+                f = load("freq")
+                mask &= (f >= f_range[0]) & (f <= f_range[1])
+            rows = np.flatnonzero(mask)
+            if len(rows) == 0:
+                continue
+            for name in parts:
+                parts[name].append(load(name)[rows]) # Sólo las filas pedidas salen del mmap
+
+        result = {}
+        for name, chunks in parts.items():
+            info = schema[name]
+            empty = np.empty((0,) + tuple(info["shape"]), dtype=np.dtype(info["dtype"]))
+            result[name] = np.concatenate(chunks) if chunks else empty
+        result["station"] = np.array(self.index["stations"], dtype=object)[result["station"]]
+        return result
+
+    def matrix(self, table, column, stations=None, time=None, freq=None):
+        """
+        Reconstruye una matriz (estaciones, frecuencias) de 'column' para una
+        ventana (la forma que esperan plot_sounding_curve / render_3d). Si el
+        filtro deja varias ventanas por estación y frecuencia, se usa la más reciente.
+        Retorna (nombres de estación, frecuencias, matriz).
+        """
+        sel = self.query(table, stations=stations, time=time, freq=freq, columns=[column])
+        if "freq" not in sel:
+            raise ValueError(f"{table}: la tabla no tiene columna de frecuencia")
+        order = np.argsort(sel["time"], kind="stable") # La última escritura gana
+        names = list(stations) if stations is not None else \
+            [s for s in self.index["stations"] if s in set(sel["station"])]
+        freqs = np.unique(sel["freq"])
+        row_of = {name: i for i, name in enumerate(names)}
+        out = np.full((len(names), len(freqs)) + sel[column].shape[1:], np.nan,
+                      dtype=np.result_type(sel[column].dtype, np.float32))
+        r = np.array([row_of[s] for s in sel["station"][order]], dtype=np.int64)
+        c = np.searchsorted(freqs, sel["freq"][order])
+        out[r, c] = sel[column][order]
+        return names, freqs, out
+
+
+def store_workflow_results(store, results, time, station_names=None, freqs=None):
+    """
+    Anexa al almacén lo que produce run_master_workflow / process_out_of_core:
+    espectros ("spectra": mag), resistividad ("resistivity": rho) y trazas
+    apiladas ("traces": stacked, una fila por canal). time: instante de la ventana.
+    """
+    mags = results.get("mags")
+    rho = results.get("rho_matrix")
+    stacked = results.get("stacked")
+    freqs = results.get("freqs") if freqs is None else freqs
+    n_ch = next(a.shape[0] for a in (mags, rho, stacked) if a is not None)
+    names = station_names or [f"CH{ch + 1}" for ch in range(n_ch)]
+    if mags is not None:
+        store.append_matrix("spectra", names, freqs, time, mag=mags)
+    if rho is not None:
+        store.append_matrix("resistivity", names, freqs, time, rho=rho)
+    if stacked is not None:
+        store.append("traces", np.array(names, dtype=object), time, stacked=stacked)
+    store.flush()
@@ -0,0 +1,244 @@
+# src\processing\async_pipeline.py
+"""
+Runtime de streaming asíncrono: adquisición → filtro → stacking → espectro.
+
+Cada etapa es una corrutina conectada a la siguiente por una cola acotada
+(asyncio.Queue con maxsize). Si una etapa se atrasa, su cola se llena y el
+'await put' de la etapa anterior se bloquea: esa espera es la contrapresión y
+se mide. Las llamadas a los kernels corren en un ThreadPoolExecutor (ctypes y
+NumPy liberan el GIL), así el bucle de eventos sigue atendiendo la adquisición.
+
+Métricas: profundidad de colas, tiempo bloqueado por contrapresión, latencia
+extremo a extremo por bloque (adquisición → espectro) y utilización por etapa
+(la holgura respecto a tiempo real es 1 - utilización de la etapa más cargada).
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .backends import apply_filter, calculate_spectrum
+
+_END = None # Marca de fin de stream que recorre todas las colas
+
+
+class StageStats:
+    """Contadores de una etapa: tiempo ocupado, bloqueos por cola llena y profundidad."""
+
+    def __init__(self, name):
+        self.name = name
+        self.chunks = 0
+        self.busy = 0.0         # Segundos procesando (incluye el kernel)
+        self.blocked = 0.0      # Segundos esperando espacio en la cola de salida
+        self.blocked_puts = 0   # Veces que la cola de salida estaba llena
+        self.max_depth = 0      # Profundidad máxima observada en la cola de salida
+        self.depth_sum = 0
+
+    async def put(self, queue, item):
+        depth = queue.qsize()
+        self.max_depth = max(self.max_depth, depth)
+        self.depth_sum += depth
+        if queue.full():
+            self.blocked_puts += 1
+            start_t = time.perf_counter()
+            await queue.put(item)
+            self.blocked += time.perf_counter() - start_t
+        else:
+            queue.put_nowait(item)
+
+    def as_dict(self, wall):
+        return {"chunks": self.chunks, "busy_s": self.busy,
+                "utilization": self.busy / wall if wall > 0 else 0.0,
+                "blocked_s": self.blocked, "blocked_puts": self.blocked_puts,
+                "max_queue_depth": self.max_depth,
+                "mean_queue_depth": self.depth_sum / self.chunks if self.chunks else 0.0}
+
+
+async def acquisition_source(out_q, stats, fs, n_channels, chunk_size, n_chunks,
+                             realtime=True, seed=0):
+    """
+    Simula el digitalizador: un bloque (n_channels, chunk_size) cada chunk_size/fs
+    segundos. En modo realtime el ritmo es el del reloj; si la adquisición se
+    atrasa respecto a su calendario, el atraso se acumula en stats.lag.
+    """
+    rng = np.random.default_rng(seed)
+    chunk_sec = chunk_size / fs
+    base_t = np.arange(chunk_size) / fs
+    gains = rng.uniform(0.5, 1.5, (n_channels, 1))
+    stats.lag = 0.0
+    start_t = time.perf_counter()
+
+    for seq in range(n_chunks):
+        if realtime:
+            due = start_t + (seq + 1) * chunk_sec # El bloque existe cuando termina de adquirirse
+            delay = due - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            else:
+                stats.lag = max(stats.lag, -delay)
+
+        t0 = time.perf_counter()
+        t = base_t + seq * chunk_sec
+        data = (gains * np.sin(2 * np.pi * 2.0 * t)
+                + 1.5 * np.sin(2 * np.pi * 60.0 * t)
+                + rng.normal(0, 0.5, (n_channels, chunk_size))).astype(np.float32)
+        stats.busy += time.perf_counter() - t0
+        stats.chunks += 1
+        await stats.put(out_q, {"seq": seq, "t_acq": time.perf_counter(), "data": data})
+
+    await out_q.put(_END)
+
+
+async def filter_stage(in_q, out_q, stats, executor, sos, zi):
+    """Notch multicanal con estado continuo entre bloques (kernel en el executor)."""
+    loop = asyncio.get_running_loop()
+    while (item := await in_q.get()) is not _END:
+        t0 = time.perf_counter()
+        item["data"], zi = await loop.run_in_executor(
+            executor, apply_filter, item["data"], sos, zi)
+        stats.busy += time.perf_counter() - t0
+        stats.chunks += 1
+        await stats.put(out_q, item)
+    await out_q.put(_END)
+
+
+class RunningStack:
+    """
+    Promedio continuo de segmentos de segment_size muestras por canal (memoria
+    constante). Los segmentos siguen la grilla absoluta de la señal: el resto de
+    cada bloque que no completa un segmento se guarda y se antepone al siguiente,
+    así el resultado no depende de cómo llegan cortados los bloques.
+    """
+
+    def __init__(self, segment_size):
+        self.segment_size = segment_size
+        self.sum = None
+        self.count = 0
+        self._tail = None # Muestras del segmento en curso (n_channels, < segment_size)
+
+    def update(self, data):
+        """Acumula un bloque (n_channels, n); retorna el stack actual (None sin segmentos)."""
+        data = np.asarray(data, dtype=np.float32)
+        tail = self._tail
+        buf = np.concatenate((tail, data), axis=1) if tail is not None and tail.shape[1] else data
+        n_ch, n = buf.shape
+        n_seg = n // self.segment_size
+        used = n_seg * self.segment_size
+        if n_seg:
+            segs = buf[:, :used].reshape(n_ch, n_seg, self.segment_size)
+            if self.sum is None:
+                self.sum = np.zeros((n_ch, self.segment_size), dtype=np.float64)
+            self.sum += segs.sum(axis=1)
+            self.count += n_seg
+        self._tail = np.array(buf[:, used:], dtype=np.float32)
+        return self.result()
+
+    def result(self):
+        if self.count == 0:
+            return None
+        return (self.sum / self.count).astype(np.float32)
+
+
+async def stack_stage(in_q, out_q, stats, executor, segment_size):
+    """
+    Stacking continuo: cada bloque filtrado se parte en segmentos de segment_size
+    y se acumula en una suma por canal (RunningStack).
+    """
+    loop = asyncio.get_running_loop()
+    stacker = RunningStack(segment_size)
+
+    while (item := await in_q.get()) is not _END:
+        t0 = time.perf_counter()
+        item["stacked"] = await loop.run_in_executor(executor, stacker.update, item["data"])
+        stats.busy += time.perf_counter() - t0
+        stats.chunks += 1
+        await stats.put(out_q, item)
+    await out_q.put(_END)
+    return stacker
+
+
+async def spectrum_stage(in_q, stats, executor, fs, target_freqs, latencies, sink=None):
+    """Espectro del bloque filtrado y cierre de la latencia extremo a extremo."""
+    loop = asyncio.get_running_loop()
+    while (item := await in_q.get()) is not _END:
+        t0 = time.perf_counter()
+        item["mags"] = await loop.run_in_executor(
+            executor, calculate_spectrum, item["data"], float(fs), target_freqs)
+        stats.busy += time.perf_counter() - t0
+        stats.chunks += 1
+        latencies.append(time.perf_counter() - item["t_acq"])
+        if sink is not None:
+            sink(item)
+
+
+async def run_streaming_pipeline(fs=24000, n_channels=24, chunk_sec=0.1, duration=10.0,
+                                 segment_sec=0.1, target_freqs=None, notch_freq=60.0,
+                                 quality=100.0, queue_size=4, realtime=True, sink=None):
+    """
+    Ejecuta el pipeline asíncrono completo y retorna sus métricas.
+
+    queue_size: Capacidad de cada cola entre etapas (bloques)
+    realtime: True = la fuente entrega al ritmo del reloj; False = tan rápido como se pueda
+    sink: Callback opcional que recibe cada bloque terminado (datos, stacking y espectro)
+    """
+    if target_freqs is None:
+        target_freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+    target_freqs = np.ascontiguousarray(target_freqs, dtype=np.float32)
+    chunk_size = int(fs * chunk_sec)
+    n_chunks = int(round(duration / chunk_sec))
+
+    from scipy import signal # Diferido: solo se usa para diseñar el filtro
+
+    b, a = signal.iirnotch(notch_freq, quality, fs)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+    zi = np.zeros((n_channels, (len(sos)//6) * 2), dtype=np.float32)
+
+    queues = [asyncio.Queue(maxsize=queue_size) for _ in range(3)]
+    names = ("acquisition", "filter", "stack", "spectrum")
+    stats = {name: StageStats(name) for name in names}
+    latencies = []
+
+    start_t = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="gif-stream") as executor:
+        await asyncio.gather(
+            acquisition_source(queues[0], stats["acquisition"], fs, n_channels, chunk_size,
+                               n_chunks, realtime=realtime),
+            filter_stage(queues[0], queues[1], stats["filter"], executor, sos, zi),
+            stack_stage(queues[1], queues[2], stats["stack"], executor, int(fs * segment_sec)),
+            spectrum_stage(queues[2], stats["spectrum"], executor, fs, target_freqs,
+                           latencies, sink=sink),
+        )
+    wall = time.perf_counter() - start_t
+
+    lat = np.asarray(latencies) * 1000
+    stage_report = {name: s.as_dict(wall) for name, s in stats.items()}
+    busiest = max(s["utilization"] for name, s in stage_report.items() if name != "acquisition")
+    return {
+        "fs": fs, "n_channels": n_channels, "chunk_size": chunk_size, "chunks": len(latencies),
+        "stream_seconds": n_chunks * chunk_sec, "wall_seconds": wall,
+        "realtime_factor": n_chunks * chunk_sec / wall, # >1 = más rápido que la adquisición
+        "headroom": 1.0 - busiest,                      # Fracción libre de la etapa más cargada
+        "source_lag_ms": stats["acquisition"].lag * 1000,
+        "latency_ms": {"p50": float(np.percentile(lat, 50)), "p99": float(np.percentile(lat, 99)),
+                       "max": float(lat.max())},
+        "stages": stage_report,
+    }
+
+
+def print_streaming_report(report):
+    """Resumen en consola de las métricas del pipeline asíncrono."""
+    lat = report["latency_ms"]
+    print(f"Stream: {report['n_channels']} canales x {report['fs'] / 1000:g} kHz | "
+          f"{report['chunks']} bloques de {report['chunk_size']} muestras")
+    print(f"Factor tiempo real: {report['realtime_factor']:.2f}x | "
+          f"Holgura: {report['headroom'] * 100:.1f}% | "
+          f"Atraso máx. de la fuente: {report['source_lag_ms']:.2f} ms")
+    print(f"Latencia extremo a extremo: p50 {lat['p50']:.2f} ms | p99 {lat['p99']:.2f} ms | "
+          f"máx {lat['max']:.2f} ms")
+    print(f"{'ETAPA':<12} | {'UTIL.':>6} | {'BLOQ. (s)':>9} | {'PUTS BLOQ.':>10} | {'COLA MÁX':>8}")
+    print("-" * 58)
+    for name, s in report["stages"].items():
+        print(f"{name:<12} | {s['utilization'] * 100:5.1f}% | {s['blocked_s']:9.3f} | "
+              f"{s['blocked_puts']:>10} | {s['max_queue_depth']:>8}")
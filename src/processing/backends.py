@@ -0,0 +1,512 @@
+# src\processing\backends.py
+"""
+Registro de motores de cómputo por kernel con despacho según el tamaño.
+
+Cada kernel (filtro, espectro, stacking, interpolación) tiene varias
+implementaciones con la misma firma:
+
+    native  Motor C++ / OpenMP (cpp_bridge), si la DLL está compilada
+    numpy   NumPy vectorizado
+    scipy   Rutinas compiladas de SciPy (cuando existe una equivalente)
+
+Para bloques pequeños el costo fijo de ctypes + OpenMP puede superar al de
+NumPy; para bloques grandes gana OpenMP. autotune() mide cada motor en una
+escala de tamaños y guarda una tabla de despacho (JSON) que se usa en las
+siguientes ejecuciones. Sin tabla se usa el orden de preferencia por defecto,
+y sin DLL se usan solo NumPy/SciPy.
+
+    python -m src.processing.backends --autotune
+"""
+
+import bisect
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from . import cpp_bridge
+from .cpp_bridge import native_available
+from .tracing import maybe_traced
+
+KERNELS = ("filter", "spectrum", "stacking", "interpolation")
+
+# Orden de preferencia cuando no hay tabla de despacho
+DEFAULT_ORDER = {
+    "filter": ("native", "scipy", "numpy"),
+    "spectrum": ("native", "numpy", "scipy"),
+    "stacking": ("native", "numpy"),
+    "interpolation": ("native", "numpy", "scipy"),
+    "tem_stacking": ("native", "numpy"),
+    "resample": ("native", "numpy"),
+    "load": ("native", "numpy"),
+    "load_block": ("native", "numpy"),
+}
+
+DISPATCH_TABLE_PATH = os.environ.get(
+    "GIF_DISPATCH_TABLE", os.path.join(cpp_bridge.build_path, "dispatch_table.json"))
+
+_REGISTRY = {kernel: {} for kernel in DEFAULT_ORDER}
+_CHECKS = {kernel: {} for kernel in DEFAULT_ORDER}
+_usable = {}  # Motores disponibles por kernel (se resuelve en el primer despacho)
+_table = None # Tabla de despacho cargada: {kernel: ([tamaños], [motores])}
+
+
+def register(kernel, backend, available=None):
+    """
+    Decorador: registra func como implementación 'backend' del kernel.
+    available: Función sin argumentos que indica si el motor se puede usar; se
+               evalúa recién al despachar (así registrar no carga la DLL).
+    """
+    def decorator(func):
+        _REGISTRY[kernel][backend] = func
+        _CHECKS[kernel][backend] = available
+        _usable.pop(kernel, None)
+        return func
+    return decorator
+
+
+def usable_backends(kernel):
+    """{motor: función} de los motores registrados que se pueden usar en esta máquina."""
+    if kernel not in _usable:
+        _usable[kernel] = {name: func for name, func in _REGISTRY[kernel].items()
+                           if _CHECKS[kernel][name] is None or _CHECKS[kernel][name]()}
+    return _usable[kernel]
+
+
+def available_backends(kernel):
+    return tuple(usable_backends(kernel))
+
+
+# --- Tabla de despacho ------------------------------------------------------
+
+def load_dispatch_table(path=None):
+    """Carga (o recarga) la tabla de autotune. Retorna False si no existe."""
+    global _table
+    path = path or DISPATCH_TABLE_PATH
+    _table = {}
+    if not os.path.exists(path):
+        return False
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    for kernel, entries in data.get("kernels", {}).items():
+        entries = sorted(entries)
+        _table[kernel] = ([size for size, _ in entries], [name for _, name in entries])
+    return True
+
+
+def select_backend(kernel, size):
+    """Motor para un kernel y un tamaño de trabajo (tabla de autotune u orden por defecto)."""
+    if _table is None:
+        load_dispatch_table()
+    registered = usable_backends(kernel)
+    if kernel in _table:
+        sizes, names = _table[kernel]
+        # Entrada de mayor tamaño <= size (o la más pequeña si size es menor a todas)
+        name = names[max(bisect.bisect_right(sizes, size) - 1, 0)]
+        if name in registered:
+            return name
+    for name in DEFAULT_ORDER[kernel]:
+        if name in registered:
+            return name
+    raise RuntimeError(f"No hay motores disponibles para el kernel '{kernel}'")
+
+
+def dispatch_signature():
+    """
+    Motores usables por kernel y tabla de despacho cargada (serializable).
+    Con esto queda determinado qué motor resuelve cada llamada; Pipeline lo
+    usa en la clave de caché porque los motores difieren en el redondeo.
+    """
+    if _table is None:
+        load_dispatch_table()
+    return {"usable": {kernel: sorted(usable_backends(kernel)) for kernel in DEFAULT_ORDER},
+            "table": {kernel: [list(sizes), list(names)] for kernel, (sizes, names) in sorted(_table.items())}}
+
+
+def _dispatch(kernel, size, backend):
+    # Un motor pedido explícitamente se usa aunque no esté disponible (falla con su error)
+    name = backend or select_backend(kernel, size)
+    return maybe_traced(_REGISTRY[kernel][name], f"{kernel}:{name}", "backend", size=int(size))
+
+
+# --- Filtro SOS multicanal (zi se actualiza en su lugar) ---------------------
+# Los motores aceptan cualquier arreglo: la conversión a float32 contiguo se
+# pide explícitamente (copy=True) y no copia si la entrada ya cumple.
+
+@register("filter", "native", available=native_available)
+def _filter_native(data, sos, zi, out=None):
+    return cpp_bridge.c_apply_multichannel_filter(data, sos, zi, out=out, copy=True)
+
+
+def _into(out, result):
+    """Copia el resultado de un motor Python al buffer 'out' pedido (si lo hay)."""
+    if out is None:
+        return result
+    out[...] = result
+    return out
+
+
+@register("filter", "scipy")
+def _filter_scipy(data, sos, zi, out=None):
+    from scipy import signal
+    n_ch = data.shape[0]
+    sos2d = np.asarray(sos, dtype=np.float64).reshape(-1, 6)
+    # SciPy guarda zi como (secciones, canales, 2); el motor C++ como (canales, secciones*2)
+    zi_sp = zi.reshape(n_ch, len(sos2d), 2).transpose(1, 0, 2)
+    output, zf = signal.sosfilt(sos2d, data, axis=-1, zi=zi_sp)
+    zi[:] = zf.transpose(1, 0, 2).reshape(n_ch, -1)
+    return _into(out, output.astype(np.float32)), zi
+
+
+@register("filter", "numpy")
+def _filter_numpy(data, sos, zi, out=None):
+    # Último recurso (sin DLL ni SciPy): Forma Directa II Transpuesta vectorizada
+    # sobre canales, pero con un bucle de Python en el tiempo, órdenes de magnitud
+    # más lento que native / scipy. Va último en DEFAULT_ORDER y autotune lo
+    # descarta por presupuesto; se conserva como referencia legible del kernel C++.
+    x = np.asarray(data, dtype=np.float32)
+    for s, (b0, b1, b2, _, a1, a2) in enumerate(np.asarray(sos, dtype=np.float32).reshape(-1, 6)):
+        y = np.empty_like(x)
+        z0, z1 = zi[:, 2 * s].copy(), zi[:, 2 * s + 1].copy()
+        for i in range(x.shape[1]):
+            xi = x[:, i]
+            yi = b0 * xi + z0
+            z0 = b1 * xi - a1 * yi + z1
+            z1 = b2 * xi - a2 * yi
+            y[:, i] = yi
+        zi[:, 2 * s], zi[:, 2 * s + 1] = z0, z1
+        x = y # La salida de esta sección es la entrada de la siguiente
+    return _into(out, x), zi
+
+
+def apply_filter(data, sos, zi, out=None, backend=None):
+    """
+    Filtro SOS multicanal con estado continuo.
+    data: (n_channels, n_samples); sos: coeficientes aplanados; zi: (n_channels, secciones*2)
+    out: Buffer de salida reutilizable (puede ser el mismo 'data' para filtrar en su lugar)
+    """
+    return _dispatch("filter", data.size, backend)(data, sos, zi, out=out)
+
+
+# --- Espectro en frecuencias objetivo ----------------------------------------
+
+@register("spectrum", "native", available=native_available)
+def _spectrum_native(data, fs, target_freqs):
+    return cpp_bridge.c_calculate_spectrum(data, float(fs), target_freqs, copy=True)
+
+
+@register("spectrum", "numpy")
+def _spectrum_numpy(data, fs, target_freqs, block=65536):
+    # DFT enfocada como producto matricial (BLAS), por bloques de muestras
+    data = np.asarray(data, dtype=np.float32)
+    n_samples = data.shape[1]
+    omega = 2 * np.pi * np.asarray(target_freqs, dtype=np.float64) / fs
+    real = np.zeros((data.shape[0], len(omega)))
+    imag = np.zeros_like(real)
+    for start in range(0, n_samples, block):
+        stop = min(start + block, n_samples)
+        phase = np.outer(np.arange(start, stop), omega)
+        real += data[:, start:stop] @ np.cos(phase).astype(np.float32)
+        imag -= data[:, start:stop] @ np.sin(phase).astype(np.float32)
+    return (np.hypot(real, imag) / n_samples).astype(np.float32)
+
+
+@register("spectrum", "scipy")
+def _spectrum_scipy(data, fs, target_freqs):
+    # Goertzel: un filtro IIR de 2º orden por frecuencia (lfilter compilado)
+    from scipy import signal
+    data = np.asarray(data, dtype=np.float64)
+    n_samples = data.shape[1]
+    output = np.empty((data.shape[0], len(target_freqs)), dtype=np.float32)
+    for f, freq in enumerate(target_freqs):
+        omega = 2 * np.pi * float(freq) / fs
+        s = signal.lfilter([1.0], [1.0, -2 * np.cos(omega), 1.0], data, axis=-1)
+        y = s[:, -1] - np.exp(-1j * omega) * s[:, -2]
+        output[:, f] = np.abs(y) / n_samples
+    return output
+
+
+def calculate_spectrum(data, fs, target_freqs, backend=None):
+    """Magnitud |DFT| / N de cada canal en las frecuencias pedidas."""
+    target_freqs = np.ascontiguousarray(target_freqs, dtype=np.float32)
+    return _dispatch("spectrum", data.size * len(target_freqs), backend)(data, fs, target_freqs)
+
+
+# --- Stacking -----------------------------------------------------------------
+
+@register("stacking", "native", available=native_available)
+def _stacking_native(segments):
+    return cpp_bridge.c_compute_stacking(segments, copy=True)
+
+
+@register("stacking", "numpy")
+def _stacking_numpy(segments):
+    return np.mean(segments, axis=0, dtype=np.float64).astype(np.float32)
+
+
+def compute_stacking(segments, backend=None):
+    """Promedio de (n_segments, segment_size) → (segment_size,)."""
+    return _dispatch("stacking", segments.size, backend)(segments)
+
+
+# --- Stacking TEM con gates ---------------------------------------------------
+
+@register("tem_stacking", "native", available=native_available)
+def _tem_stacking_native(data, starts, polarity, record_len, gate_start, gate_stop, accs):
+    cpp_bridge.c_compute_tem_stacking(data, starts, polarity, record_len, gate_start, gate_stop,
+                                      *accs, copy=True)
+
+
+@register("tem_stacking", "numpy")
+def _tem_stacking_numpy(data, starts, polarity, record_len, gate_start, gate_stop, accs, max_cycles=256):
+    stack_sum, gate_sum, gate_sumsq = accs
+    offsets = np.arange(record_len)
+    polarity = np.asarray(polarity, dtype=np.float64)
+    # Por tandas de ciclos: (canales, ciclos, registro) no debe crecer con el sondeo
+    for k in range(0, len(starts), max_cycles):
+        idx = np.asarray(starts[k:k + max_cycles])[:, None] + offsets
+        records = data[:, idx] * polarity[k:k + max_cycles, None]            # (ch, ciclos, registro)
+        stack_sum += records.sum(axis=1)
+        prefix = np.concatenate((np.zeros(records.shape[:2] + (1,)), np.cumsum(records, axis=2)), axis=2)
+        gates = (prefix[:, :, gate_stop] - prefix[:, :, gate_start]) / (gate_stop - gate_start)
+        gate_sum += gates.sum(axis=1)
+        gate_sumsq += np.square(gates).sum(axis=1)
+
+
+def compute_tem_stacking(data, cycle_starts, polarity, record_len, gate_start, gate_stop, accs,
+                         backend=None):
+    """
+    Acumula en accs = (stack_sum, gate_sum, gate_sumsq) (float64, en su lugar) los
+    registros TEM de un bloque (n_channels, n_samples) con polaridad e integrados en gates.
+    """
+    _dispatch("tem_stacking", len(cycle_starts) * record_len * data.shape[0], backend)(
+        data, cycle_starts, polarity, record_len, gate_start, gate_stop, accs)
+    return accs
+
+
+# --- Remuestreo con retardo fraccional ---------------------------------------
+
+@register("resample", "native", available=native_available)
+def _resample_native(data, pos0, step, n_out, table, out=None):
+    return cpp_bridge.c_fractional_delay_resample(data, pos0, step, n_out, table, out=out, copy=True)
+
+
+@register("resample", "numpy")
+def _resample_numpy(data, pos0, step, n_out, table, out=None, block=4096):
+    data = np.asarray(data, dtype=np.float32)
+    n_ch, n_in = data.shape
+    n_phases, n_taps = table.shape[0] - 1, table.shape[1]
+    taps = np.arange(n_taps) - n_taps // 2 + 1
+    pos0 = np.asarray(pos0, dtype=np.float64)[:, None]
+    step = np.asarray(step, dtype=np.float64)[:, None]
+    output = np.empty((n_ch, n_out), dtype=np.float32) if out is None else out
+    rows = np.arange(n_ch)[:, None, None]
+    for j0 in range(0, n_out, block):
+        pos = pos0 + step * np.arange(j0, min(j0 + block, n_out))             # (ch, n)
+        base = np.floor(pos)
+        phase = (pos - base) * n_phases
+        p = np.minimum(phase.astype(np.int64), n_phases - 1)
+        w = (phase - p).astype(np.float32)[..., None]
+        h = table[p] + w * (table[p + 1] - table[p])                           # (ch, n, taps)
+        idx = base.astype(np.int64)[..., None] + taps
+        valid = (idx >= 0) & (idx < n_in)                                      # Fuera = cero
+        x = np.where(valid, data[rows, np.clip(idx, 0, n_in - 1)], 0.0)
+        output[:, j0:j0 + pos.shape[1]] = (x * h).sum(axis=2)
+    return output
+
+
+def resample_fractional(data, pos0, step, n_out, table, out=None, backend=None):
+    """
+    Interpola cada canal de (n_channels, n_in) en pos0[ch] + step[ch] * j,
+    j = 0..n_out-1, con el filtro polifásico 'table' (timebase.sinc_table).
+    """
+    return _dispatch("resample", data.shape[0] * n_out * table.shape[1], backend)(
+        data, pos0, step, n_out, table, out=out)
+
+
+# --- Interpolación con plan precalculado -------------------------------------
+
+@register("interpolation", "native", available=native_available)
+def _interpolation_native(batch, row_idx, row_w, col_idx, col_w):
+    return cpp_bridge.c_apply_interpolation_plan(batch, row_idx, row_w, col_idx, col_w, copy=True)
+
+
+@register("interpolation", "numpy")
+def _interpolation_numpy(batch, row_idx, row_w, col_idx, col_w):
+    batch = np.asarray(batch, dtype=np.float32)
+    rows = batch[:, row_idx[:, 0]] + row_w[:, None] * (batch[:, row_idx[:, 1]] - batch[:, row_idx[:, 0]])
+    c0, c1 = rows[..., col_idx[:, 0]], rows[..., col_idx[:, 1]]
+    return (c0 + col_w * (c1 - c0)).astype(np.float32)
+
+
+@register("interpolation", "scipy")
+def _interpolation_scipy(batch, row_idx, row_w, col_idx, col_w):
+    # Vecinos adyacentes: la posición fraccional i0 + w*(i1 - i0) equivale al plan
+    from scipy import ndimage
+    batch = np.asarray(batch, dtype=np.float32)
+    r = row_idx[:, 0] + row_w * (row_idx[:, 1] - row_idx[:, 0])
+    c = col_idx[:, 0] + col_w * (col_idx[:, 1] - col_idx[:, 0])
+    b, rr, cc = np.meshgrid(np.arange(batch.shape[0]), r, c, indexing="ij")
+    return ndimage.map_coordinates(batch, [b, rr, cc], order=1, mode="nearest").astype(np.float32)
+
+
+def apply_interpolation_plan(batch, row_idx, row_w, col_idx, col_w, backend=None):
+    """Aplica tablas (índices, pesos) de InterpolationPlan a un lote (n, in_rows, in_cols)."""
+    size = batch.shape[0] * len(row_w) * len(col_w)
+    return _dispatch("interpolation", size, backend)(batch, row_idx, row_w, col_idx, col_w)
+
+
+# --- Lectura de archivos .raw (sin autotune: solo respaldo sin DLL) ----------
+
+@register("load", "native", available=native_available)
+def _load_native(filename, n_samples):
+    return cpp_bridge.c_load_raw_data(filename, n_samples)
+
+
+@register("load", "numpy")
+def _load_numpy(filename, n_samples):
+    return np.fromfile(filename, dtype=np.float32, count=n_samples)
+
+
+def load_raw_data(filename, n_samples, backend=None):
+    return _dispatch("load", n_samples, backend)(filename, n_samples)
+
+
+@register("load_block", "native", available=native_available)
+def _load_block_native(filename, n_channels, samples_per_channel, start_sample, n_samples, out=None):
+    return cpp_bridge.c_load_raw_block(filename, n_channels, samples_per_channel,
+                                       start_sample, n_samples, out=out)
+
+
+@register("load_block", "numpy")
+def _load_block_numpy(filename, n_channels, samples_per_channel, start_sample, n_samples, out=None):
+    to_read = max(0, min(n_samples, samples_per_channel - start_sample))
+    if out is None:
+        out = np.empty((n_channels, n_samples), dtype=np.float32)
+    else:
+        out = out.reshape(-1)[:n_channels * n_samples].reshape(n_channels, n_samples)
+    with open(filename, "rb") as f:
+        for ch in range(n_channels):
+            f.seek((ch * samples_per_channel + start_sample) * 4)
+            got = f.readinto(memoryview(out[ch, :to_read]).cast("B"))
+            if got != to_read * 4:
+                # Archivo truncado o más corto que samples_per_channel: no devolver basura
+                raise OSError(f"{filename}: canal {ch} leyó {got} de {to_read * 4} bytes "
+                              f"(muestra {start_sample}, {samples_per_channel} por canal)")
+    return out[:, :to_read]
+
+
+def load_raw_block(filename, n_channels, samples_per_channel, start_sample, n_samples,
+                   out=None, backend=None):
+    """Bloque (n_channels, n_samples) de un archivo canal-tras-canal."""
+    return _dispatch("load_block", n_samples, backend)(
+        filename, n_channels, samples_per_channel, start_sample, n_samples, out=out)
+
+
+# --- Autotune -----------------------------------------------------------------
+
+def _autotune_inputs(kernel, size, rng):
+    """Entradas sintéticas de ~size unidades de trabajo para cada kernel."""
+    if kernel == "filter":
+        from scipy import signal
+        b, a = signal.iirnotch(60.0, 30.0, 24000)
+        sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+        n_ch = 24 if size >= 24 * 64 else 1
+        data = rng.standard_normal((n_ch, max(size // n_ch, 1))).astype(np.float32)
+        return lambda f: f(data, sos, np.zeros((n_ch, 2), dtype=np.float32))
+    if kernel == "spectrum":
+        freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+        n_ch = 24 if size >= 24 * 20 * 64 else 1
+        data = rng.standard_normal((n_ch, max(size // (n_ch * 20), 1))).astype(np.float32)
+        return lambda f: f(data, 24000.0, freqs)
+    if kernel == "stacking":
+        n_seg = 15
+        segments = rng.standard_normal((n_seg, max(size // n_seg, 1))).astype(np.float32)
+        return lambda f: f(segments)
+    if kernel == "interpolation":
+        from .interpolation import InterpolationPlan
+        side = max(int(np.sqrt(size)), 2)
+        plan = InterpolationPlan.from_shapes((24, 20), (side, side))
+        batch = rng.random((1, 24, 20)).astype(np.float32) * 100
+        return lambda f: f(batch, plan.row_idx, plan.row_w, plan.col_idx, plan.col_w)
+    raise ValueError(f"Kernel desconocido: {kernel}")
+
+
+def _time_call(call, func, repeats, budget_s):
+    call(func) # Calentamiento (primer toque de memoria, hilos OpenMP)
+    best = float("inf")
+    start_t = time.perf_counter()
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        call(func)
+        best = min(best, time.perf_counter() - t0)
+        if time.perf_counter() - start_t > budget_s:
+            break
+    return best
+
+
+def autotune(sizes=None, kernels=KERNELS, repeats=5, budget_s=2.0, path=None, verbose=True):
+    """
+    Mide cada motor disponible en una escala de tamaños y guarda la tabla de despacho.
+
+    sizes: Tamaños de trabajo a medir (unidades por kernel: muestras, muestras x
+           frecuencias o celdas de salida)
+    budget_s: Tiempo máximo por (kernel, motor, tamaño); los motores lentos se cortan antes
+    Retorna la tabla {kernel: [[tamaño, motor], ...]} y la escribe en 'path'.
+    """
+    if sizes is None:
+        sizes = [2 ** k for k in range(8, 24, 2)]
+    rng = np.random.default_rng(0)
+    kernels_table = {}
+    for kernel in kernels:
+        entries = []
+        candidates = dict(usable_backends(kernel))
+        for size in sizes:
+            call = _autotune_inputs(kernel, size, rng)
+            timings = {name: _time_call(call, func, repeats, budget_s)
+                       for name, func in candidates.items()}
+            # Un motor que ya agotó el presupuesto no se mide en tamaños mayores
+            candidates = {n: f for n, f in candidates.items()
+                          if timings[n] < budget_s or n == min(timings, key=timings.get)}
+            best = min(timings, key=timings.get)
+            entries.append([int(size), best])
+            if verbose:
+                detail = " | ".join(f"{n}: {t * 1e3:8.3f} ms" for n, t in timings.items())
+                print(f"    {kernel:<14} {size:>10,} -> {best:<7} ({detail})")
+        kernels_table[kernel] = entries
+
+    table = {
+        "native": native_available(),
+        "cpu_count": os.cpu_count(),
+        "machine": platform.node(),
+        "omp_num_threads": os.environ.get("OMP_NUM_THREADS"),
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "kernels": kernels_table,
+    }
+    path = path or DISPATCH_TABLE_PATH
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
+    load_dispatch_table(path)
+    if verbose:
+        print(f"[OK] Tabla de despacho guardada en {path}")
+    return kernels_table
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="GIF - Motores de cómputo por kernel")
+    parser.add_argument("--autotune", action="store_true",
+                        help="Mide los motores y guarda la tabla de despacho")
+    parser.add_argument("--table", default=None, help="Ruta de la tabla de despacho")
+    args = parser.parse_args()
+
+    if args.autotune:
+        print(f"[*] Autotune de motores (C++ disponible: {native_available()})...")
+        autotune(path=args.table)
+    else:
+        load_dispatch_table(args.table)
+        for kernel in KERNELS:
+            print(f"{kernel:<14} motores: {', '.join(available_backends(kernel))}")
@@ -0,0 +1,196 @@
+# src\processing\batch.py
+"""
+Procesamiento por lotes de levantamientos completos, reanudable.
+
+Cada levantamiento se procesa en un proceso del pool con el flujo out-of-core
+y su resultado se escribe en <output_dir>/<nombre>_<hash>.npz (el hash de la
+ruta absoluta evita que a/dia1.raw y b/dia1.raw se pisen). El manifiesto
+(batch_manifest.json) registra cada levantamiento terminado junto con la huella
+del archivo de entrada y un hash de los parámetros de procesamiento: si la
+corrida se interrumpe, la siguiente solo procesa lo que falta, lo que cambió en
+disco o lo que se pide con otros parámetros (--channels, --fs, ...).
+
+Los hilos OpenMP por proceso se limitan para no sobresuscribir la CPU:
+n_workers x omp_threads <= núcleos disponibles. Cada proceso fija además la
+política del motor C++ (set_num_threads) al arrancar.
+"""
+
+import glob
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from .pipeline import file_fingerprint
+
+MANIFEST_NAME = "batch_manifest.json"
+
+
+def discover_surveys(paths, pattern="*.raw"):
+    """Expande carpetas a sus archivos .raw; los archivos se aceptan tal cual."""
+    surveys = []
+    for path in paths:
+        if os.path.isdir(path):
+            surveys.extend(sorted(glob.glob(os.path.join(path, pattern))))
+        else:
+            surveys.append(path)
+    return list(dict.fromkeys(os.path.abspath(p) for p in surveys)) # Sin duplicados, en orden
+
+
+def survey_name(path):
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def result_name(path):
+    """Archivo de resultado único por levantamiento: nombre + hash corto de la ruta absoluta."""
+    digest = hashlib.sha1(os.path.abspath(path).encode("utf-8")).hexdigest()[:8]
+    return f"{survey_name(path)}_{digest}.npz"
+
+
+def params_key(params):
+    """Hash estable de los parámetros de process_survey_out_of_core."""
+    blob = json.dumps(params, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+
+def load_manifest(output_dir):
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(output_dir, manifest):
+    """Escritura atómica: una interrupción nunca deja el manifiesto a medias."""
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp, path)
+
+
+def is_done(entry, survey, output_dir, params):
+    """
+    Un levantamiento está hecho si su resultado existe, la entrada no cambió y
+    se procesó con los mismos parámetros.
+    """
+    if not entry or entry.get("status") != "done":
+        return False
+    if entry.get("params") != params_key(params):
+        return False
+    if not os.path.exists(os.path.join(output_dir, entry["result"])):
+        return False
+    return entry.get("fingerprint") == file_fingerprint(survey)
+
+
+def _init_worker(omp_threads):
+    """Inicializador de cada proceso del pool: limita los hilos de los kernels nativos."""
+    from .cpp_bridge import native_available, set_num_threads
+
+    if native_available():
+        set_num_threads(omp_threads)
+
+
+def _process_survey(survey, output_dir, result_file, params):
+    """Trabajo de un proceso del pool: procesa un levantamiento y guarda su .npz en 'result_file'."""
+    from .out_of_core import process_survey_out_of_core
+
+    start_t = time.perf_counter()
+    result = process_survey_out_of_core(survey, verbose=False, **params)
+    stats = result.pop("stats")
+
+    path = os.path.join(output_dir, result_file)
+    tmp = path[:-len(".npz")] + ".tmp.npz"
+    np.savez(tmp, **result)
+    os.replace(tmp, path)
+
+    return {"survey": survey, "result": result_file,
+            "seconds": time.perf_counter() - start_t,
+            "peak_rss_mb": stats["peak_rss_mb"], "n_segments": stats["n_segments"],
+            "pid": os.getpid()}
+
+
+def run_batch(surveys, output_dir, n_workers=None, omp_threads=None, resume=True,
+              verbose=True, **params):
+    """
+    Procesa una lista de levantamientos en un pool de procesos.
+
+    surveys: Rutas de archivos .raw
+    n_workers: Procesos simultáneos (por defecto, un levantamiento por núcleo)
+    omp_threads: Hilos OpenMP por proceso (por defecto, núcleos / n_workers)
+    resume: Omite los levantamientos ya registrados en el manifiesto
+    params: Parámetros de process_survey_out_of_core (n_channels, fs, memory_budget_mb...)
+    Retorna un resumen de la corrida (procesados, omitidos, fallidos, levantamientos/hora).
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    n_cpus = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers or n_cpus, len(surveys) or 1))
+    omp_threads = omp_threads or max(1, n_cpus // n_workers)
+
+    manifest = load_manifest(output_dir) if resume else {}
+    pending = [s for s in surveys if not is_done(manifest.get(s), s, output_dir, params)]
+    skipped = len(surveys) - len(pending)
+    if verbose:
+        print(f"[*] Lote: {len(surveys)} levantamientos | {skipped} ya procesados | "
+              f"{len(pending)} pendientes")
+        print(f"[*] {n_workers} procesos x {omp_threads} hilos OpenMP")
+
+    done, failed = [], []
+    start_t = time.perf_counter()
+
+    # OMP_NUM_THREADS lo leen otras librerías con OpenMP (BLAS): los procesos 'spawn'
+    # heredan el entorno del padre, así que se fija solo mientras se crea el pool.
+    previous = os.environ.get("OMP_NUM_THREADS")
+    os.environ["OMP_NUM_THREADS"] = str(omp_threads)
+    try:
+        ctx = mp.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=ctx,
+                                 initializer=_init_worker, initargs=(omp_threads,)) as pool:
+            futures = {pool.submit(_process_survey, s, output_dir, result_name(s), params): s
+                       for s in pending}
+            for future in as_completed(futures):
+                survey = futures[future]
+                try:
+                    rec = future.result()
+                except Exception as exc:
+                    manifest[survey] = {"status": "failed", "error": repr(exc)}
+                    failed.append(survey)
+                    if verbose:
+                        print(f"    [ERROR] {result_name(survey)}: {exc}")
+                else:
+                    manifest[survey] = {"status": "done", "result": rec["result"],
+                                        "fingerprint": file_fingerprint(survey),
+                                        "params": params_key(params),
+                                        "seconds": rec["seconds"],
+                                        "peak_rss_mb": rec["peak_rss_mb"]}
+                    done.append(rec)
+                    if verbose:
+                        print(f"    [OK] {rec['result']:<30} {rec['seconds']:.2f}s "
+                              f"| pico RSS {rec['peak_rss_mb']:.0f} MB "
+                              f"({len(done) + len(failed)}/{len(pending)})")
+                save_manifest(output_dir, manifest) # Checkpoint tras cada levantamiento
+    finally:
+        if previous is None:
+            os.environ.pop("OMP_NUM_THREADS", None)
+        else:
+            os.environ["OMP_NUM_THREADS"] = previous
+
+    elapsed = time.perf_counter() - start_t
+    summary = {
+        "processed": len(done),
+        "skipped": skipped,
+        "failed": len(failed),
+        "seconds": elapsed,
+        "surveys_per_hour": len(done) / elapsed * 3600 if done and elapsed > 0 else 0.0,
+        "n_workers": n_workers,
+        "omp_threads": omp_threads,
+    }
+    if verbose:
+        print(f"[OK] {len(done)} procesados, {skipped} omitidos, {len(failed)} fallidos "
+              f"en {elapsed:.2f}s | {summary['surveys_per_hour']:.1f} levantamientos/hora")
+    return summary
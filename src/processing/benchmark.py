@@ -0,0 +1,287 @@
+# src\processing\benchmark.py
+"""
+Suite de benchmarks de los kernels y del flujo completo, con línea base.
+
+Cada caso es (kernel, canales, muestras, hilos). Los kernels se llaman por
+src.processing.backends, así se mide el motor que realmente se usa en
+producción (el elegido por la tabla de despacho), y los hilos se fijan con
+cpp_bridge.parallel_policy.
+
+    load        Lectura del .raw de canales x muestras
+    filter      Notch SOS multicanal (canales, muestras)
+    spectrum    Magnitudes en 20 frecuencias (canales, muestras)
+    stacking    Promedio de 15 segmentos de 'muestras' por canal
+    interpolation  Malla (canales, 20) -> (8 x canales, muestras / 120); con 24 canales
+                   y 12000 muestras es la malla (200, 100) del flujo maestro
+    workflow    Pipeline maestro sin caché (carga → ... → interpolación), 15 segmentos
+    master      run_master_workflow() completo con reportes a archivo (solo si
+                existe data/raw/survey_24ch.raw; un solo tamaño)
+
+Los resultados se guardan en JSON. compare_results() los contrasta con una
+línea base y marca como regresión todo caso cuya mediana empeore más que el
+umbral (por defecto 15 %); los casos que faltan o son nuevos se listan aparte.
+compare_meta() avisa si la línea base se midió en otra máquina o configuración
+(ahí una "regresión" no dice nada del código).
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from . import backends
+from .cpp_bridge import base_path, git_commit, native_available, thread_scope
+
+BENCHMARKS = ("load", "filter", "spectrum", "stacking", "interpolation", "workflow", "master")
+MASTER_FILE = os.path.join(base_path, "data", "raw", "survey_24ch.raw")
+N_SEGMENTS = 15
+FS = 24000
+# Campos de meta que deben coincidir para que la comparación con la línea base sea válida
+COMPARABLE_META = ("machine", "cpu_count", "native")
+
+
+def case_key(case):
+    return f"{case['kernel']}|ch={case['channels']}|n={case['samples']}|t={case['threads']}"
+
+
+def _notch_sos(fs=FS):
+    from scipy import signal # Diferido: solo se usa para diseñar el filtro
+    b, a = signal.iirnotch(60.0, 100.0, fs)
+    return signal.tf2sos(b, a).flatten().astype(np.float32)
+
+
+def _write_raw(folder, n_values, rng):
+    """Archivo .raw sintético de n_values float32 (se reutiliza si ya existe)."""
+    path = os.path.join(folder, f"bench_{n_values}.raw")
+    if not os.path.exists(path):
+        rng.standard_normal(n_values, dtype=np.float32).tofile(path)
+    return path
+
+
+def _setup(kernel, n_channels, n_samples, workdir, rng):
+    """
+    Prepara las entradas de un caso y retorna (llamada sin argumentos, motor,
+    muestras procesadas por llamada) o None si el caso no aplica.
+    """
+    if kernel == "load":
+        n_values = n_channels * n_samples
+        path = _write_raw(workdir, n_values, rng)
+        return (lambda: backends.load_raw_data(path, n_values),
+                backends.select_backend("load", n_values), n_values)
+
+    if kernel == "filter":
+        data = rng.standard_normal((n_channels, n_samples)).astype(np.float32)
+        sos = _notch_sos()
+        zi = np.zeros((n_channels, (len(sos)//6) * 2), dtype=np.float32)
+        out = np.empty_like(data)
+        return (lambda: backends.apply_filter(data, sos, zi, out=out),
+                backends.select_backend("filter", data.size), data.size)
+
+    if kernel == "spectrum":
+        data = rng.standard_normal((n_channels, n_samples)).astype(np.float32)
+        freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+        return (lambda: backends.calculate_spectrum(data, float(FS), freqs),
+                backends.select_backend("spectrum", data.size * len(freqs)), data.size)
+
+    if kernel == "stacking":
+        cube = rng.standard_normal((n_channels, N_SEGMENTS, n_samples)).astype(np.float32)
+
+        def stack_all():
+            for ch in range(n_channels):
+                backends.compute_stacking(cube[ch])
+        return (stack_all, backends.select_backend("stacking", N_SEGMENTS * n_samples), cube.size)
+
+    if kernel == "interpolation":
+        from .interpolation import InterpolationPlan
+        rho = rng.uniform(1, 1000, (1, n_channels, 20)).astype(np.float32)
+        plan = InterpolationPlan.from_shapes((n_channels, 20),
+                                             (8 * n_channels, max(2, n_samples // 120)))
+        n_out = 8 * n_channels * max(2, n_samples // 120)
+        return (lambda: backends.apply_interpolation_plan(rho, plan.row_idx, plan.row_w,
+                                                          plan.col_idx, plan.col_w),
+                backends.select_backend("interpolation", n_out), n_out)
+
+    if kernel == "workflow":
+        from .workflow import build_master_pipeline
+        n_values = n_channels * N_SEGMENTS * n_samples
+        path = _write_raw(workdir, n_values, rng)
+        pipeline = build_master_pipeline(path, fs=FS, n_channels=n_channels, n_segments=N_SEGMENTS,
+                                         segment_sec=n_samples / FS, cache_dir=None)
+        targets = ["stack", "resistivity", "interpolate"]
+        return (lambda: pipeline.run(targets=targets, verbose=False), "auto", n_values)
+
+    if kernel == "master":
+        if not os.path.exists(MASTER_FILE):
+            return None
+        from main_processor import run_master_workflow # Script de la raíz del repositorio
+        report_dir = os.path.join(workdir, "reports")
+
+        def master():
+            # La salida por consola del flujo maestro no forma parte de la medición
+            with contextlib.redirect_stdout(io.StringIO()):
+                run_master_workflow(report_dir=report_dir, report_workers=1, cache_dir=None)
+        return (master, "auto", 24 * N_SEGMENTS * FS // 2)
+
+    raise ValueError(f"Benchmark desconocido: {kernel!r} (opciones: {', '.join(BENCHMARKS)})")
+
+
+def _time(call, repeats, budget_s):
+    """Una llamada de calentamiento y hasta 'repeats' medidas (mínimo 3) dentro del presupuesto."""
+    call()
+    times = []
+    start_t = time.perf_counter()
+    while len(times) < repeats:
+        t0 = time.perf_counter()
+        call()
+        times.append(time.perf_counter() - t0)
+        if len(times) >= 3 and time.perf_counter() - start_t > budget_s:
+            break
+    return np.asarray(times)
+
+
+def run_suite(kernels=BENCHMARKS, channels=(2, 24), samples=(12000, 120000), threads=None,
+              repeats=7, budget_s=3.0, verbose=True):
+    """
+    Ejecuta el barrido completo y retorna {"meta": ..., "results": [casos]}.
+
+    channels / samples / threads: Valores a barrer (threads None = 1 y todos los núcleos)
+    repeats: Medidas por caso (se corta antes si se agota budget_s, con un mínimo de 3)
+    """
+    n_cpus = os.cpu_count() or 1
+    if threads is None:
+        threads = sorted({1, n_cpus})
+    rng = np.random.default_rng(0)
+    results = []
+    workdir = tempfile.mkdtemp(prefix="gif_bench_")
+    try:
+        for kernel in kernels:
+            # El flujo maestro lee su archivo fijo: un solo tamaño
+            sizes = [(24, FS // 2)] if kernel == "master" else [(c, n) for c in channels for n in samples]
+            for n_channels, n_samples in sizes:
+                setup = _setup(kernel, n_channels, n_samples, workdir, rng)
+                if setup is None:
+                    if verbose:
+                        print(f"    {kernel:<13} omitido (falta {MASTER_FILE})")
+                    break
+                call, backend, n_values = setup
+                for n_threads in threads:
+                    with thread_scope(n_threads):
+                        times = _time(call, repeats, budget_s)
+                    case = {"kernel": kernel, "channels": n_channels, "samples": n_samples,
+                            "threads": n_threads, "backend": backend, "runs": len(times),
+                            "median_s": float(np.median(times)), "min_s": float(times.min()),
+                            "max_s": float(times.max()),
+                            "msamples_per_s": n_values / float(np.median(times)) / 1e6}
+                    results.append(case)
+                    if verbose:
+                        print(f"    {kernel:<13} {n_channels:>3} ch x {n_samples:>7,} | "
+                              f"{n_threads:>2} hilos | {backend:<6} | "
+                              f"mediana {case['median_s'] * 1e3:9.3f} ms | "
+                              f"{case['msamples_per_s']:8.1f} Mmuestras/s")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    meta = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "cpu_count": n_cpus,
+        "native": native_available(),
+        "commit": git_commit(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def save_results(report, path):
+    """Escritura atómica del JSON de resultados."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, path)
+
+
+def load_results(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def compare_meta(current, baseline):
+    """{campo: (línea base, actual)} de los campos de COMPARABLE_META que difieren."""
+    base, cur = baseline.get("meta", {}), current.get("meta", {})
+    return {k: (base.get(k), cur.get(k)) for k in COMPARABLE_META if base.get(k) != cur.get(k)}
+
+
+def compare_results(current, baseline, threshold=0.15, min_delta_s=0.5e-3):
+    """
+    Contrasta cada caso con el mismo caso de la línea base (por mediana).
+    Retorna una lista de {key, baseline_s, current_s, ratio, status} con status
+    'regression' (ratio > 1 + threshold), 'improvement' (< 1 - threshold) u 'ok'.
+    min_delta_s: Diferencia absoluta mínima para marcar un cambio; en casos de
+                 décimas de milisegundo el ruido del sistema supera al umbral relativo.
+    Los casos de un solo lado se agregan al final con status 'missing' (solo en
+    la línea base) o 'new' (solo en la corrida actual) y tiempos / ratio None.
+    """
+    base = {case_key(c): c for c in baseline["results"]}
+    seen = set()
+    rows = []
+    for case in current["results"]:
+        ref = base.get(case_key(case))
+        if ref is None:
+            rows.append({"key": case_key(case), "baseline_s": None, "current_s": case["median_s"],
+                         "ratio": None, "status": "new", "backend_changed": False})
+            continue
+        seen.add(case_key(case))
+        ratio = case["median_s"] / ref["median_s"] if ref["median_s"] > 0 else float("inf")
+        if abs(case["median_s"] - ref["median_s"]) < min_delta_s:
+            status = "ok"
+        elif ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 - threshold:
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append({"key": case_key(case), "baseline_s": ref["median_s"],
+                     "current_s": case["median_s"], "ratio": ratio, "status": status,
+                     "backend_changed": case.get("backend") != ref.get("backend")})
+    for key, ref in base.items():
+        if key not in seen:
+            rows.append({"key": key, "baseline_s": ref["median_s"], "current_s": None,
+                         "ratio": None, "status": "missing", "backend_changed": False})
+    return rows
+
+
+def print_comparison(rows, threshold=0.15, meta_diff=None):
+    """
+    Tabla de la comparación; retorna la cantidad de regresiones.
+    meta_diff: Resultado de compare_meta(); si no está vacío se avisa antes de la tabla.
+    """
+    if meta_diff:
+        print("[!] La línea base se midió en otra configuración; los ratios no son comparables:")
+        for field, (base, cur) in meta_diff.items():
+            print(f"    {field}: base {base} | actual {cur}")
+    labels = {"regression": "REGRESIÓN", "improvement": "MEJORA", "ok": "ok",
+              "missing": "FALTA", "new": "NUEVO"}
+    ms = lambda value, width: f"{value * 1e3:>{width}.3f}" if value is not None else f"{'-':>{width}}"
+    print(f"{'CASO':<42} | {'BASE (ms)':>10} | {'ACTUAL (ms)':>11} | {'RATIO':>6} | ESTADO")
+    print("-" * 90)
+    for row in rows:
+        note = " (cambió el motor)" if row["backend_changed"] else ""
+        ratio = f"{row['ratio']:>6.2f}" if row["ratio"] is not None else f"{'-':>6}"
+        print(f"{row['key']:<42} | {ms(row['baseline_s'], 10)} | {ms(row['current_s'], 11)} | "
+              f"{ratio} | {labels[row['status']]}{note}")
+    n_reg = sum(r["status"] == "regression" for r in rows)
+    n_missing = sum(r["status"] == "missing" for r in rows)
+    n_new = sum(r["status"] == "new" for r in rows)
+    print(f"{len(rows) - n_missing - n_new} casos comparados | {n_reg} regresiones "
+          f"(umbral {threshold * 100:.0f}%) | {sum(r['status'] == 'improvement' for r in rows)} mejoras | "
+          f"{n_missing} faltan | {n_new} nuevos")
+    return n_reg
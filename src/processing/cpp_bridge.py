@@ -1,9 +1,14 @@
 # src\processing\cpp_bridge.py
 import ctypes
+from contextlib import contextmanager, nullcontext
 from ctypes import POINTER, c_float, c_int, c_char_p
+import logging
 import sys
 import numpy as np
 import os
+import subprocess
+
+from .tracing import traced
 
 
 # Localizar la DLL
@@ -12,22 +17,35 @@ base_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__fi
 build_path = os.path.join(base_path, "build")
 lib_path = os.path.join(build_path, "libfiltros.dll")
 
-# 2. FIX para Windows y dependencias de MSYS2
-if sys.platform == "win32":
-    # Añadimos la carpeta build al buscador de DLLs
-    os.add_dll_directory(build_path)
-    # IMPORTANTE: También necesitamos las librerías de MSYS2 para que la DLL funcione
-    # Reemplaza esta ruta con la de tu instalación de MSYS2 si es diferente
-    msys_bin_path = r"D:\msys64\ucrt64\bin" 
-    if os.path.exists(msys_bin_path):
-        os.add_dll_directory(msys_bin_path)
-
-try:
-    lib = ctypes.CDLL(lib_path)
-    print(f"--- Librería C++ cargada exitosamente desde {lib_path} ---")
-    
-    lib = ctypes.CDLL(lib_path)
-    
+
+def git_commit():
+    """Commit corto del repositorio (para fechar benchmarks y replays); None fuera de git."""
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=base_path,
+                             capture_output=True, text=True, timeout=5)
+        return out.stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+class _MissingLibrary:
+    """Sustituto de la DLL cuando no se pudo cargar: falla recién al llamar un kernel."""
+
+    def __init__(self, reason):
+        self.reason = reason
+
+    def __getattr__(self, name):
+        raise RuntimeError(f"Motor C++ no disponible ({self.reason}). "
+                           f"Compila {lib_path} o usa src.processing.backends.")
+
+
+# La DLL se carga recién en la primera llamada a un kernel: importar este módulo
+# (o cualquiera que lo use) no toca el disco ni imprime nada.
+_lib = None
+
+
+def _configure(lib):
+    """Declara las firmas (argtypes/restype) de cada función exportada."""
     #--------------------------------------------------
     # Configurar apply_sos_filter_work
     # Argumentos: x (float*), y (float*), n_samples (int), n_sections (int), sos (float*), zi (float*)
@@ -48,6 +66,16 @@ try:
     ]
     lib.load_binary_data.restype = ctypes.c_int
     #--------------------------------------------------
+    lib.load_binary_block.argtypes = [
+        ctypes.c_char_p,                # filename
+        ctypes.POINTER(ctypes.c_float), # buffer
+        ctypes.c_int,                   # n_channels
+        ctypes.c_longlong,              # samples_per_channel
+        ctypes.c_longlong,              # start_sample
+        ctypes.c_int                    # n_samples
+    ]
+    lib.load_binary_block.restype = ctypes.c_int
+    #--------------------------------------------------
     lib.apply_sos_filter_multichannel.argtypes = [
         ctypes.POINTER(ctypes.c_float), # input
         ctypes.POINTER(ctypes.c_float), # output
@@ -77,6 +105,54 @@ try:
         ctypes.c_int                    # segment_size
     ]
     lib.compute_stacking.restype = None
+    #--------------------------------------------------
+    lib.tem_stack_gates.argtypes = [
+        POINTER(c_float),             # input
+        c_int,                        # n_channels
+        ctypes.c_longlong,            # n_samples
+        POINTER(ctypes.c_longlong),   # cycle_starts
+        POINTER(c_float),             # polarity
+        c_int,                        # n_cycles
+        c_int,                        # record_len
+        POINTER(c_int),               # gate_start
+        POINTER(c_int),               # gate_stop
+        c_int,                        # n_gates
+        POINTER(ctypes.c_double),     # stack_sum
+        POINTER(ctypes.c_double),     # gate_sum
+        POINTER(ctypes.c_double)      # gate_sumsq
+    ]
+    lib.tem_stack_gates.restype = None
+    #--------------------------------------------------
+    lib.sliding_dft_update.argtypes = [
+        POINTER(c_float),             # input
+        c_int,                        # n_channels
+        c_int,                        # n_samples
+        POINTER(ctypes.c_double),     # omega
+        c_int,                        # n_freqs
+        c_int,                        # window
+        POINTER(c_float),             # history
+        POINTER(ctypes.c_double),     # acc
+        POINTER(ctypes.c_longlong),   # state
+        c_int,                        # hop
+        c_int,                        # recompute_every
+        POINTER(c_float),             # out_mag
+        POINTER(c_float)              # out_phase
+    ]
+    lib.sliding_dft_update.restype = c_int
+    #--------------------------------------------------
+    lib.fractional_delay_resample.argtypes = [
+        POINTER(c_float),             # input
+        c_int,                        # n_channels
+        ctypes.c_longlong,            # n_in
+        POINTER(ctypes.c_double),     # pos0
+        POINTER(ctypes.c_double),     # step
+        ctypes.c_longlong,            # n_out
+        POINTER(c_float),             # table
+        c_int,                        # half_taps
+        c_int,                        # n_phases
+        POINTER(c_float)              # output
+    ]
+    lib.fractional_delay_resample.restype = None
 
     #--------------------------------------------------
     lib.c_interpolate_resistivity.argtypes = [
@@ -89,107 +165,548 @@ try:
     ]
     lib.c_interpolate_resistivity.restype = None
     #--------------------------------------------------
+    lib.apply_interpolation_plan.argtypes = [
+        POINTER(c_float), # input
+        c_int,            # n_batch
+        c_int,            # in_rows
+        c_int,            # in_cols
+        POINTER(c_int),   # row_idx
+        POINTER(c_float), # row_w
+        c_int,            # out_rows
+        POINTER(c_int),   # col_idx
+        POINTER(c_float), # col_w
+        c_int,            # out_cols
+        POINTER(c_float)  # output
+    ]
+    lib.apply_interpolation_plan.restype = None
+    #--------------------------------------------------
+    lib.idw_interpolate_volume.argtypes = [
+        POINTER(c_float), # station_xy
+        POINTER(c_float), # soundings
+        c_int,            # n_stations
+        c_int,            # n_depth
+        POINTER(c_float), # grid_x
+        c_int,            # nx
+        POINTER(c_float), # grid_y
+        c_int,            # ny
+        c_int,            # k_neighbors
+        c_float,          # power
+        POINTER(c_float)  # output
+    ]
+    lib.idw_interpolate_volume.restype = None
+    #--------------------------------------------------
+    # Política de paralelismo (hilos, schedule y eje por kernel)
+    lib.set_parallel_threads.argtypes = [c_int]
+    lib.set_parallel_threads.restype = None
+    lib.get_parallel_threads.argtypes = []
+    lib.get_parallel_threads.restype = c_int
+    lib.get_parallel_threads_setting.argtypes = []
+    lib.get_parallel_threads_setting.restype = c_int
+    lib.get_num_procs.argtypes = []
+    lib.get_num_procs.restype = c_int
+    lib.set_parallel_schedule.argtypes = [c_int, c_int] # kind, chunk
+    lib.set_parallel_schedule.restype = c_int
+    lib.get_parallel_schedule.argtypes = [POINTER(c_int), POINTER(c_int)]
+    lib.get_parallel_schedule.restype = None
+    lib.set_parallel_axis.argtypes = [c_int, c_int]     # kernel, axis
+    lib.set_parallel_axis.restype = c_int
+    lib.get_parallel_axis.argtypes = [c_int]
+    lib.get_parallel_axis.restype = c_int
+    #--------------------------------------------------
+    # Contadores por kernel
+    lib.get_kernel_counter_count.argtypes = []
+    lib.get_kernel_counter_count.restype = c_int
+    lib.get_kernel_counter_name.argtypes = [c_int]
+    lib.get_kernel_counter_name.restype = c_char_p
+    lib.get_kernel_counters.argtypes = [c_int, POINTER(ctypes.c_longlong)] # id, values[5]
+    lib.get_kernel_counters.restype = c_int
+    lib.reset_kernel_counters.argtypes = []
+    lib.reset_kernel_counters.restype = None
+    #--------------------------------------------------
 
-except OSError as e:
-    print(f"Error: No se pudo cargar la librería en {lib_path}. ¿Ejecutaste la compilación?")
-    raise e
+
+
+def get_library():
+    """Carga y configura la DLL la primera vez; luego retorna la misma instancia."""
+    global _lib
+    if _lib is not None:
+        return _lib
+
+    # FIX para Windows y dependencias de MSYS2
+    if sys.platform == "win32":
+        # Añadimos la carpeta build al buscador de DLLs
+        os.add_dll_directory(build_path)
+        # IMPORTANTE: También necesitamos las librerías de MSYS2 para que la DLL funcione
+        # Reemplaza esta ruta con la de tu instalación de MSYS2 si es diferente
+        msys_bin_path = r"D:\msys64\ucrt64\bin"
+        if os.path.exists(msys_bin_path):
+            os.add_dll_directory(msys_bin_path)
+
+    try:
+        lib = ctypes.CDLL(lib_path)
+        _configure(lib)
+        logging.info(f"Librería C++ cargada desde {lib_path}")
+    except (OSError, AttributeError) as e:
+        # Sin DLL (o una DLL desactualizada) el resto del framework sigue funcionando
+        # con los motores NumPy/SciPy de src.processing.backends
+        logging.warning(f"No se pudo cargar la librería en {lib_path}: {e}. ¿Ejecutaste la compilación?")
+        lib = _MissingLibrary(e)
+    _lib = lib
+    return _lib
+
+
+def native_available():
+    """True si la DLL se puede cargar (la carga en ese momento si aún no se hizo)."""
+    return not isinstance(get_library(), _MissingLibrary)
 
 # ------------------------------------------
+# Política de paralelismo del motor C++. Es global a la librería (vale para las
+# llamadas desde cualquier hilo de Python) y se consulta en cada llamada a un kernel.
+
+PARALLEL_KERNELS = {"filter": 0, "spectrum": 1, "stacking": 2}
+PARALLEL_AXES = {"auto": 0, "channels": 1, "frequencies": 2, "samples": 3}
+SCHEDULES = {"static": 1, "dynamic": 2, "guided": 3, "auto": 4}
+
+
+def _lookup(table, name, what):
+    if name not in table:
+        raise ValueError(f"{what} desconocido: {name!r} (opciones: {', '.join(table)})")
+    return table[name]
+
+
+def get_num_threads():
+    """Hilos que usará cada kernel en la próxima llamada."""
+    return get_library().get_parallel_threads()
+
+
+def set_num_threads(n):
+    """Fija los hilos por kernel; None o 0 vuelve al valor por defecto de OpenMP."""
+    get_library().set_parallel_threads(int(n or 0))
+
+
+def get_num_procs():
+    """Núcleos que ve el runtime de OpenMP."""
+    return get_library().get_num_procs()
+
+
+def get_schedule():
+    """Retorna (tipo, chunk) del schedule de los bucles paralelos (chunk 0 = por defecto)."""
+    kind, chunk = c_int(), c_int()
+    get_library().get_parallel_schedule(ctypes.byref(kind), ctypes.byref(chunk))
+    names = {v: k for k, v in SCHEDULES.items()}
+    return names.get(kind.value, str(kind.value)), chunk.value
+
+
+def set_schedule(kind, chunk=0):
+    """kind: 'static', 'dynamic', 'guided' o 'auto'; chunk: iteraciones por reparto (0 = por defecto)."""
+    get_library().set_parallel_schedule(_lookup(SCHEDULES, kind, "Schedule"), int(chunk))
+
+
+def get_parallel_axis(kernel):
+    axis = get_library().get_parallel_axis(_lookup(PARALLEL_KERNELS, kernel, "Kernel"))
+    return {v: k for k, v in PARALLEL_AXES.items()}[axis]
+
+
+def set_parallel_axis(kernel, axis):
+    """
+    Eje sobre el que se reparte un kernel entre hilos.
+    kernel: 'filter', 'spectrum' o 'stacking'
+    axis: 'auto', 'channels', 'frequencies' (solo espectro) o 'samples'
+          (el filtro reparte bloques de cada canal de forma exacta, solo a
+          pedido: con 'auto' reparte canales; el stacking siempre reparte
+          bloques de muestras)
+    """
+    get_library().set_parallel_axis(_lookup(PARALLEL_KERNELS, kernel, "Kernel"),
+                                    _lookup(PARALLEL_AXES, axis, "Eje"))
+
+
+@contextmanager
+def parallel_policy(threads=None, schedule=None, chunk=0, **axes):
+    """
+    Ajusta la política de paralelismo dentro de un bloque 'with' y la restaura al salir.
+
+        with parallel_policy(threads=8, spectrum="frequencies"):
+            mags = c_calculate_spectrum(data, fs, freqs)
+
+    threads: Hilos por kernel (None = no cambiar)
+    schedule / chunk: Schedule de los bucles paralelos (None = no cambiar)
+    axes: Eje por kernel, p. ej. filter="samples"
+    """
+    for kernel, axis in axes.items():
+        _lookup(PARALLEL_KERNELS, kernel, "Kernel")
+        _lookup(PARALLEL_AXES, axis, "Eje")
+    lib = get_library()
+    # El valor fijado (0 = sin fijar), no el resuelto: al salir se vuelve a seguir a OpenMP
+    previous = (lib.get_parallel_threads_setting(), get_schedule(),
+                {kernel: get_parallel_axis(kernel) for kernel in axes})
+    try:
+        if threads is not None:
+            set_num_threads(threads)
+        if schedule is not None:
+            set_schedule(schedule, chunk)
+        for kernel, axis in axes.items():
+            set_parallel_axis(kernel, axis)
+        yield
+    finally:
+        prev_threads, prev_schedule, prev_axes = previous
+        lib.set_parallel_threads(prev_threads)
+        set_schedule(*prev_schedule)
+        for kernel, axis in prev_axes.items():
+            set_parallel_axis(kernel, axis)
+
 
-def c_apply_sos_filter(data, sos_coeffs, zi_states):
+def thread_scope(threads):
+    """
+    parallel_policy(threads=threads) si se pide un número de hilos y la DLL está
+    disponible; si no, un contexto vacío (los barridos corren igual sin motor C++).
+    """
+    if threads and native_available():
+        return parallel_policy(threads=threads)
+    return nullcontext()
+
+# ------------------------------------------
+# Contadores del motor C++: cada kernel acumula llamadas, tiempo total y máximo,
+# bytes procesados (entrada + salida) e hilos usados en la última llamada.
+
+KERNEL_COUNTER_FIELDS = ("calls", "total_ns", "max_ns", "bytes", "threads")
+
+
+def kernel_counters():
+    """Retorna {kernel: {calls, total_ns, max_ns, bytes, threads}} desde el último reset."""
+    lib = get_library()
+    values = (ctypes.c_longlong * len(KERNEL_COUNTER_FIELDS))()
+    counters = {}
+    for i in range(lib.get_kernel_counter_count()):
+        lib.get_kernel_counters(i, values)
+        counters[lib.get_kernel_counter_name(i).decode()] = dict(zip(KERNEL_COUNTER_FIELDS, values))
+    return counters
+
+
+def reset_kernel_counters():
+    get_library().reset_kernel_counters()
+
+# ------------------------------------------
+# Validación de arreglos: el bridge nunca copia por su cuenta. Un arreglo con
+# otro dtype o sin contigüidad C es un error, salvo que se pida copy=True.
+
+def _check_array(name, arr, ndim=None, dtype=np.float32, copy=False):
+    """Retorna arr tal cual si ya es dtype C-contiguo; con copy=True lo convierte."""
+    if copy:
+        arr = np.ascontiguousarray(arr, dtype=dtype)
+    elif not (isinstance(arr, np.ndarray) and arr.dtype == dtype and arr.flags.c_contiguous):
+        if isinstance(arr, np.ndarray):
+            layout = "contiguo" if arr.flags.c_contiguous else "no contiguo"
+            got = f"{arr.dtype} {layout}"
+        else:
+            got = type(arr).__name__
+        raise TypeError(f"{name}: se esperaba un arreglo {np.dtype(dtype).name} C-contiguo "
+                        f"(se recibió {got}). Usa copy=True para convertirlo.")
+    if ndim is not None and arr.ndim != ndim:
+        raise ValueError(f"{name}: se esperaban {ndim} dimensiones, se recibió la forma {arr.shape}")
+    return arr
+
+
+def _check_state(name, zi, size, dtype=np.float32):
+    """
+    Estados zi: el motor los actualiza en su lugar, así que una copia perdería la
+    continuidad del filtro sin avisar. Nunca se convierten, ni con copy=True.
+    """
+    if not (isinstance(zi, np.ndarray) and zi.dtype == dtype
+            and zi.flags.c_contiguous and zi.flags.writeable):
+        raise TypeError(f"{name}: los estados deben ser {np.dtype(dtype).name} C-contiguos y escribibles "
+                        f"(se actualizan en su lugar, no se pueden copiar)")
+    if zi.size != size:
+        raise ValueError(f"{name}: se esperaban {size} estados, se recibieron {zi.size}")
+    return zi
+
+
+def _check_out(out, shape):
+    """Buffer de salida: se reutiliza tal cual (float32 C-contiguo, escribible, forma exacta)."""
+    if out is None:
+        return np.empty(shape, dtype=np.float32)
+    if not (isinstance(out, np.ndarray) and out.dtype == np.float32
+            and out.flags.c_contiguous and out.flags.writeable):
+        raise TypeError("out: se esperaba un arreglo float32 C-contiguo y escribible")
+    if out.shape != tuple(shape):
+        raise ValueError(f"out: se esperaba la forma {tuple(shape)}, se recibió {out.shape}")
+    return out
+
+
+def _ptr(arr, ctype=c_float):
+    return arr.ctypes.data_as(POINTER(ctype))
+
+
+@traced()
+def c_apply_sos_filter(data, sos_coeffs, zi_states, out=None, inplace=False, copy=False):
     """
     Interface de Python para el motor C++ SOS.
+    out: Buffer de salida reutilizable; inplace=True escribe sobre 'data'
+    copy: Convierte las entradas a float32 contiguo si hace falta (zi nunca se copia)
     """
-    # 1. Asegurar que los datos sean float32 (el float de C++) y contiguos en memoria
-    data = np.ascontiguousarray(data, dtype=np.float32)
-    sos_coeffs = np.ascontiguousarray(sos_coeffs, dtype=np.float32)
-    zi_states = np.ascontiguousarray(zi_states, dtype=np.float32)
-    
+    # 1. Validar que los datos sean float32 (el float de C++) y contiguos en memoria
+    data = _check_array("data", data, ndim=1, copy=copy)
+    sos_coeffs = _check_array("sos_coeffs", sos_coeffs, copy=copy)
     n_samples = len(data)
     n_sections = len(sos_coeffs) // 6
-    output = np.zeros(n_samples, dtype=np.float32)
-
-    # 2. Obtener punteros
-    x_ptr = data.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
-    y_ptr = output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
-    sos_ptr = sos_coeffs.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
-    zi_ptr = zi_states.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+    zi_states = _check_state("zi_states", zi_states, n_sections * 2)
+    # El kernel lee x[i] antes de escribir y[i]: puede trabajar en su lugar
+    output = _check_out(data if inplace else out, (n_samples,))
 
-    # 3. Llamada al motor C++
-    lib.apply_sos_filter_work(x_ptr, y_ptr, n_samples, n_sections, sos_ptr, zi_ptr)
+    # 2. Llamada al motor C++
+    get_library().apply_sos_filter_work(_ptr(data), _ptr(output), n_samples, n_sections,
+                                        _ptr(sos_coeffs), _ptr(zi_states))
 
     return output, zi_states
 
-def c_load_raw_data(filename, n_samples):
+@traced()
+def c_load_raw_data(filename, n_samples, out=None):
     """Carga datos binarios usando el motor C++"""
-    output = np.zeros(n_samples, dtype=np.float32)
-    output_ptr = output.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+    output = _check_out(out, (n_samples,))
     
     # El string debe convertirse a bytes para C++
-    result = lib.load_binary_data(filename.encode('utf-8'), output_ptr, n_samples)
+    result = get_library().load_binary_data(filename.encode('utf-8'), _ptr(output), n_samples)
     
     if result < 0:
         raise Exception(f"Error al leer el archivo. Código: {result}")
         
     return output[:result] # Retorna solo lo leído
 
-def c_apply_multichannel_filter(data_matrix, sos_coeffs, zi_matrix):
+@traced()
+def c_load_raw_block(filename, n_channels, samples_per_channel, start_sample, n_samples, out=None):
+    """
+    Carga el bloque [start_sample, start_sample + n_samples) de cada canal de un
+    archivo canal-tras-canal. Retorna una vista (n_channels, leídas) sobre 'out'.
+    out: Buffer float32 contiguo reutilizable entre bloques (al menos n_channels * n_samples)
+    """
+    if out is None:
+        out = np.empty((n_channels, n_samples), dtype=np.float32)
+    else:
+        if not (out.dtype == np.float32 and out.flags.c_contiguous and out.flags.writeable):
+            raise TypeError("out: se esperaba un arreglo float32 C-contiguo y escribible")
+        if out.size < n_channels * n_samples:
+            raise ValueError(f"out: se necesitan {n_channels * n_samples} muestras, hay {out.size}")
+        # El motor escribe filas de n_samples: usamos el inicio del buffer como matriz contigua
+        out = out.reshape(-1)[:n_channels * n_samples].reshape(n_channels, n_samples)
+    result = get_library().load_binary_block(filename.encode('utf-8'), _ptr(out),
+                                             n_channels, samples_per_channel, start_sample, n_samples)
+    if result < 0:
+        raise Exception(f"Error al leer el bloque del archivo. Código: {result}")
+    return out[:, :result]
+
+@traced()
+def c_apply_multichannel_filter(data_matrix, sos_coeffs, zi_matrix, out=None, inplace=False, copy=False):
+    """
+    Filtro SOS en paralelo por canal (OpenMP).
+    data_matrix: (n_channels, n_samples); zi_matrix: n_channels * n_sections * 2 estados
+    out: Buffer de salida reutilizable; inplace=True escribe sobre 'data_matrix'
+    """
+    data_matrix = _check_array("data_matrix", data_matrix, ndim=2, copy=copy)
+    sos_coeffs = _check_array("sos_coeffs", sos_coeffs, copy=copy)
     n_ch, n_samples = data_matrix.shape
     n_sections = len(sos_coeffs) // 6
-    output = np.zeros_like(data_matrix, dtype=np.float32)
+    zi_matrix = _check_state("zi_matrix", zi_matrix, n_ch * n_sections * 2)
+    output = _check_out(data_matrix if inplace else out, (n_ch, n_samples))
     
-    lib.apply_sos_filter_multichannel(
-        data_matrix.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        output.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
+    get_library().apply_sos_filter_multichannel(
+        _ptr(data_matrix), _ptr(output),
         n_ch, n_samples, n_sections,
-        sos_coeffs.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        zi_matrix.ctypes.data_as(ctypes.POINTER(ctypes.c_float))
+        _ptr(sos_coeffs), _ptr(zi_matrix)
     )
     return output, zi_matrix
 
-def c_calculate_spectrum(data_matrix, fs, target_freqs):
+@traced()
+def c_calculate_spectrum(data_matrix, fs, target_freqs, out=None, copy=False):
+    data_matrix = _check_array("data_matrix", data_matrix, ndim=2, copy=copy)
+    target_freqs = _check_array("target_freqs", target_freqs, ndim=1, copy=copy)
     n_ch, n_samples = data_matrix.shape
     n_freqs = len(target_freqs)
-    output_mag = np.zeros((n_ch, n_freqs), dtype=np.float32)
+    output_mag = _check_out(out, (n_ch, n_freqs))
     
-    freqs_ptr = np.ascontiguousarray(target_freqs, dtype=np.float32).ctypes.data_as(ctypes.POINTER(ctypes.c_float))
-    
-    lib.calculate_magnitude_spectrum(
-        data_matrix.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        output_mag.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        n_ch, n_samples, fs, freqs_ptr, n_freqs
+    get_library().calculate_magnitude_spectrum(
+        _ptr(data_matrix), _ptr(output_mag),
+        n_ch, n_samples, fs, _ptr(target_freqs), n_freqs
     )
     return output_mag
 
-def c_compute_stacking(data_segments):
+@traced()
+def c_compute_stacking(data_segments, out=None, copy=False):
     """
     Recibe una matriz de (n_segments, segment_size) y devuelve el promedio.
     """
+    data_segments = _check_array("data_segments", data_segments, ndim=2, copy=copy)
     n_seg, seg_size = data_segments.shape
-    output = np.zeros(seg_size, dtype=np.float32)
+    output = _check_out(out, (seg_size,))
     
-    lib.compute_stacking(
-        data_segments.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        output.ctypes.data_as(ctypes.POINTER(ctypes.c_float)),
-        n_seg, seg_size
-    )
+    get_library().compute_stacking(_ptr(data_segments), _ptr(output), n_seg, seg_size)
     return output
 
 
-def c_interpolate_data(rho_matrix, new_shape):
+@traced()
+def c_compute_tem_stacking(data_matrix, cycle_starts, polarity, record_len, gate_start, gate_stop,
+                           stack_sum=None, gate_sum=None, gate_sumsq=None, copy=False):
+    """
+    Stacking sincrónico TEM + integración en gates de un bloque (n_channels, n_samples).
+    cycle_starts: Muestra (en el bloque) del corte de corriente de cada ciclo (int64)
+    polarity: +1/-1 por ciclo (float32)
+    gate_start / gate_stop: Límites [g0, g1) de cada gate dentro del registro (int32)
+    stack_sum (n_channels, record_len), gate_sum y gate_sumsq (n_channels, n_gates):
+    acumuladores float64 que se actualizan en su lugar (None = empezar de cero).
+    Retorna (stack_sum, gate_sum, gate_sumsq).
+    """
+    data_matrix = _check_array("data_matrix", data_matrix, ndim=2, copy=copy)
+    cycle_starts = _check_array("cycle_starts", cycle_starts, ndim=1, dtype=np.int64, copy=copy)
+    polarity = _check_array("polarity", polarity, ndim=1, dtype=np.float32, copy=copy)
+    gate_start = _check_array("gate_start", gate_start, ndim=1, dtype=np.int32, copy=copy)
+    gate_stop = _check_array("gate_stop", gate_stop, ndim=1, dtype=np.int32, copy=copy)
+    n_ch, n_samples = data_matrix.shape
+    n_cycles, n_gates = len(cycle_starts), len(gate_start)
+    if len(polarity) != n_cycles or len(gate_stop) != n_gates:
+        raise ValueError("polarity / gate_stop: largo distinto al de cycle_starts / gate_start")
+    # El kernel no revisa límites: un registro fuera del bloque leería memoria ajena
+    if n_cycles and (cycle_starts.min() < 0 or cycle_starts.max() + record_len > n_samples):
+        raise ValueError(f"cycle_starts: cada registro de {record_len} muestras debe caber en el bloque")
+    if n_gates and (gate_start.min() < 0 or gate_stop.max() > record_len or np.any(gate_stop <= gate_start)):
+        raise ValueError(f"gates: se esperaban 0 <= g0 < g1 <= {record_len}")
+
+    accs = []
+    for name, arr, size in (("stack_sum", stack_sum, record_len), ("gate_sum", gate_sum, n_gates),
+                            ("gate_sumsq", gate_sumsq, n_gates)):
+        if arr is None:
+            arr = np.zeros((n_ch, size), dtype=np.float64)
+        accs.append(_check_state(name, arr, n_ch * size, dtype=np.float64))
+    stack_sum, gate_sum, gate_sumsq = accs
+
+    get_library().tem_stack_gates(
+        _ptr(data_matrix), n_ch, n_samples, _ptr(cycle_starts, ctypes.c_longlong), _ptr(polarity),
+        n_cycles, record_len, _ptr(gate_start, c_int), _ptr(gate_stop, c_int), n_gates,
+        _ptr(stack_sum, ctypes.c_double), _ptr(gate_sum, ctypes.c_double), _ptr(gate_sumsq, ctypes.c_double)
+    )
+    return stack_sum, gate_sum, gate_sumsq
+
+
+@traced()
+def c_sliding_dft_update(data_matrix, omega, history, acc, state, hop, recompute_every=0,
+                         out_mag=None, out_phase=None, copy=False):
+    """
+    Avanza la DFT deslizante con un bloque (n_channels, n_samples).
+    omega: rad/muestra por frecuencia (float64)
+    history: (n_channels, window) float32; acc: (n_channels, n_freqs, 2) float64;
+    state: [muestras procesadas, muestras desde el recálculo] int64. Los tres se
+    actualizan en su lugar (como zi en los filtros).
+    Retorna (mag, phase), cada uno (n_channels, frames, n_freqs): un frame cada
+    'hop' muestras absolutas.
+    """
+    data_matrix = _check_array("data_matrix", data_matrix, ndim=2, copy=copy)
+    omega = _check_array("omega", omega, ndim=1, dtype=np.float64, copy=copy)
+    n_ch, n_samples = data_matrix.shape
+    n_freqs = len(omega)
+    window = history.shape[-1]
+    history = _check_state("history", history, n_ch * window)
+    acc = _check_state("acc", acc, n_ch * n_freqs * 2, dtype=np.float64)
+    state = _check_state("state", state, 2, dtype=np.int64)
+    n0 = int(state[0])
+    n_frames = (n0 + n_samples) // hop - n0 // hop
+    mag = _check_out(out_mag, (n_ch, n_frames, n_freqs))
+    phase = _check_out(out_phase, (n_ch, n_frames, n_freqs))
+
+    get_library().sliding_dft_update(
+        _ptr(data_matrix), n_ch, n_samples, _ptr(omega, ctypes.c_double), n_freqs, window,
+        _ptr(history), _ptr(acc, ctypes.c_double), _ptr(state, ctypes.c_longlong),
+        hop, recompute_every, _ptr(mag), _ptr(phase)
+    )
+    return mag, phase
+
+
+@traced()
+def c_fractional_delay_resample(data_matrix, pos0, step, n_out, table, out=None, copy=False):
+    """
+    Remuestreo con retardo fraccional de (n_channels, n_in) a (n_channels, n_out).
+    La salida j del canal ch sale de la posición pos0[ch] + step[ch] * j de la entrada.
+    pos0 / step: Mapeo lineal por canal (float64)
+    table: Filtro polifásico (n_phases + 1, 2 * half_taps) de timebase.sinc_table()
+    """
+    data_matrix = _check_array("data_matrix", data_matrix, ndim=2, copy=copy)
+    pos0 = _check_array("pos0", pos0, ndim=1, dtype=np.float64, copy=copy)
+    step = _check_array("step", step, ndim=1, dtype=np.float64, copy=copy)
+    table = _check_array("table", table, ndim=2, copy=copy)
+    n_ch, n_in = data_matrix.shape
+    if len(pos0) != n_ch or len(step) != n_ch:
+        raise ValueError(f"pos0 / step: se esperaba un valor por canal ({n_ch})")
+    n_phases, n_taps = table.shape[0] - 1, table.shape[1]
+    if n_phases < 1 or n_taps % 2:
+        raise ValueError(f"table: se esperaba la forma (n_phases + 1, 2 * half_taps), se recibió {table.shape}")
+    output = _check_out(out, (n_ch, n_out))
+
+    get_library().fractional_delay_resample(
+        _ptr(data_matrix), n_ch, n_in, _ptr(pos0, ctypes.c_double), _ptr(step, ctypes.c_double),
+        n_out, _ptr(table), n_taps // 2, n_phases, _ptr(output)
+    )
+    return output
+
+@traced()
+def c_interpolate_data(rho_matrix, new_shape, out=None, copy=False):
+    rho_matrix = _check_array("rho_matrix", rho_matrix, ndim=2, copy=copy)
     in_rows, in_cols = rho_matrix.shape
     out_rows, out_cols = new_shape
+    output_rho = _check_out(out, (out_rows, out_cols))
     
-    # Usamos c_float y POINTER importados arriba
-    input_ptr = rho_matrix.astype(np.float32).ctypes.data_as(POINTER(c_float))
-    output_rho = np.zeros(new_shape, dtype=np.float32)
-    output_ptr = output_rho.ctypes.data_as(POINTER(c_float))
-    
-    # CAMBIO: Usamos 'lib' (definida arriba) no '_lib'
-    lib.c_interpolate_resistivity(
-        input_ptr, in_rows, in_cols,
-        output_ptr, out_rows, out_cols
+    get_library().c_interpolate_resistivity(
+        _ptr(rho_matrix), in_rows, in_cols,
+        _ptr(output_rho), out_rows, out_cols
     )
     return output_rho
 
+@traced()
+def c_apply_interpolation_plan(rho_batch, row_idx, row_w, col_idx, col_w, out=None, copy=False):
+    """
+    Aplica tablas de interpolación precalculadas a un lote (n_batch, in_rows, in_cols).
+    Ver src.processing.interpolation.InterpolationPlan.
+    """
+    rho_batch = _check_array("rho_batch", rho_batch, ndim=3, copy=copy)
+    row_idx = _check_array("row_idx", row_idx, ndim=2, dtype=np.int32)
+    col_idx = _check_array("col_idx", col_idx, ndim=2, dtype=np.int32)
+    row_w = _check_array("row_w", row_w, ndim=1)
+    col_w = _check_array("col_w", col_w, ndim=1)
+    n_batch, in_rows, in_cols = rho_batch.shape
+    out_rows, out_cols = len(row_w), len(col_w)
+    output = _check_out(out, (n_batch, out_rows, out_cols))
+
+    get_library().apply_interpolation_plan(
+        _ptr(rho_batch), n_batch, in_rows, in_cols,
+        _ptr(row_idx, c_int), _ptr(row_w), out_rows,
+        _ptr(col_idx, c_int), _ptr(col_w), out_cols,
+        _ptr(output)
+    )
+    return output
+
+@traced()
+def c_interpolate_volume(station_xy, soundings, grid_x, grid_y, k_neighbors=8, power=2.0,
+                         out=None, copy=False):
+    """
+    Construye un volumen 3D por IDW desde sondeos dispersos (OpenMP).
+    station_xy: (n_stations, 2) posiciones en planta
+    soundings: (n_stations, n_depth) resistividad por estación (profundidad o frecuencia)
+    Retorna (n_depth, ny, nx): su ravel() ya está en el orden de puntos de VTK.
+    """
+    station_xy = _check_array("station_xy", station_xy, ndim=2, copy=copy)
+    soundings = _check_array("soundings", soundings, ndim=2, copy=copy)
+    grid_x = _check_array("grid_x", grid_x, ndim=1, copy=copy)
+    grid_y = _check_array("grid_y", grid_y, ndim=1, copy=copy)
+    n_stations, n_depth = soundings.shape
+    if n_stations == 0:
+        raise ValueError("soundings: se necesita al menos una estación")
+    if station_xy.shape != (n_stations, 2):
+        raise ValueError(f"station_xy: se esperaba la forma ({n_stations}, 2), se recibió {station_xy.shape}")
+    if k_neighbors <= 0:
+        raise ValueError(f"k_neighbors: se esperaba un entero positivo, se recibió {k_neighbors}")
+    output = _check_out(out, (n_depth, len(grid_y), len(grid_x)))
 
+    get_library().idw_interpolate_volume(
+        _ptr(station_xy), _ptr(soundings),
+        n_stations, n_depth,
+        _ptr(grid_x), len(grid_x),
+        _ptr(grid_y), len(grid_y),
+        k_neighbors, power,
+        _ptr(output)
+    )
+    return output
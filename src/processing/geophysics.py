@@ -27,4 +27,258 @@ def compute_phase(data_E, data_H):
     La fase indica si hay cambios bruscos de conductores en profundidad.
     """
     # Por ahora retornamos ceros, pero es el siguiente nivel de realismo
-    return np.zeros_like(data_E)
\ No newline at end of file
+    return np.zeros_like(data_E)
+
+# ==========================================================
+# MODELADO DIRECTO E INVERSIÓN MT 1D (TIERRA ESTRATIFICADA)
+# ==========================================================
+
+MU0 = 4e-7 * np.pi  # Permeabilidad magnética del vacío (H/m)
+
+
+def build_layer_mesh(freqs, n_layers=30, rho_ref=100.0):
+    """
+    Genera espesores log-espaciados para la inversión 1D.
+    La malla cubre desde 1/4 del skin depth de la frecuencia más alta
+    hasta 2 skin depths de la frecuencia más baja.
+    Retorna los espesores (n_layers - 1,) en metros; la última capa es un semiespacio.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    skin_min = 503.0 * np.sqrt(rho_ref / freqs.max())
+    skin_max = 503.0 * np.sqrt(rho_ref / freqs.min())
+    interfaces = np.logspace(np.log10(skin_min / 4), np.log10(2 * skin_max), n_layers - 1)
+    return np.diff(np.concatenate(([0.0], interfaces)))
+
+
+def _layered_impedance(log_rho, thicknesses, omega, jacobian=False):
+    """
+    Recursión de impedancias de abajo hacia arriba, vectorizada sobre modelos y frecuencias.
+    log_rho: (n_models, n_layers) en ln(Ohm-m)
+    thicknesses: (n_models, n_layers - 1)
+    omega: (n_freqs,) frecuencia angular
+    Si jacobian=True también retorna dZ/d ln(rho) con forma (n_models, n_layers, n_freqs).
+    """
+    n_models, n_layers = log_rho.shape
+    iwm = 1j * omega * MU0
+    rho = np.exp(log_rho)[:, :, np.newaxis]
+    zeta = np.sqrt(iwm * rho)   # Impedancia intrínseca de cada capa
+    k = np.sqrt(iwm / rho)      # Número de onda de cada capa
+
+    Z = zeta[:, -1]
+    dZ = None
+    if jacobian:
+        dZ = np.zeros((n_models, n_layers, len(omega)), dtype=np.complex128)
+        dZ[:, -1] = zeta[:, -1] / 2
+
+    for j in range(n_layers - 2, -1, -1):
+        h = thicknesses[:, j, np.newaxis]
+        t = np.tanh(k[:, j] * h)
+        z_j = zeta[:, j]
+        num = Z + z_j * t
+        den = z_j + Z * t
+        Z_top = z_j * num / den
+
+        if jacobian:
+            # Derivadas parciales analíticas de la recursión
+            dZ_dbelow = z_j**2 * (1 - t**2) / den**2
+            dZ_dzeta = num / den + z_j * (t * den - num) / den**2
+            dZ_dt = z_j * (z_j * den - num * Z) / den**2
+            dt_dm = -(1 - t**2) * k[:, j] * h / 2
+            dZ[:, j + 1:] *= dZ_dbelow[:, np.newaxis, :]
+            dZ[:, j] = dZ_dzeta * z_j / 2 + dZ_dt * dt_dm
+        Z = Z_top
+
+    return Z, dZ
+
+
+def forward_mt_1d(resistivities, thicknesses, freqs):
+    """
+    Modelo directo MT 1D para muchos modelos y frecuencias a la vez.
+
+    resistivities: (n_layers,) o (n_models, n_layers) en Ohm-m
+    thicknesses: (n_layers - 1,) o (n_models, n_layers - 1) en metros
+    freqs: Array de frecuencias en Hz
+    Retorna (rho_a, fase_grados) con forma (n_models, n_freqs).
+    """
+    log_rho = np.log(np.atleast_2d(np.asarray(resistivities, dtype=np.float64)))
+    thick = np.broadcast_to(np.asarray(thicknesses, dtype=np.float64),
+                            (log_rho.shape[0], log_rho.shape[1] - 1))
+    omega = 2 * np.pi * np.asarray(freqs, dtype=np.float64)
+
+    Z, _ = _layered_impedance(log_rho, thick, omega)
+    rho_a = np.abs(Z)**2 / (omega * MU0)
+    phase = np.degrees(np.angle(Z))
+    return rho_a, phase
+
+
+def _predict_data(log_rho, thick, omega, use_phase, jacobian=False):
+    """Datos [log10(rho_a), fase(rad)] y su jacobiano respecto a ln(rho)."""
+    Z, dZ = _layered_impedance(log_rho, thick, omega, jacobian)
+    log_Z = np.log(Z)
+    pred = 2 * log_Z.real / np.log(10) - np.log10(omega * MU0)
+    if use_phase:
+        pred = np.concatenate((pred, log_Z.imag), axis=1)
+    if not jacobian:
+        return pred, None
+
+    dlogZ = dZ / Z[:, np.newaxis, :]
+    J = 2 * dlogZ.real / np.log(10)
+    if use_phase:
+        J = np.concatenate((J, dlogZ.imag), axis=2)
+    return pred, np.swapaxes(J, 1, 2)  # (n_models, n_datos, n_layers)
+
+
+def invert_mt_1d(freqs, rho_obs, phase_obs=None, thicknesses=None, n_layers=30,
+                 rel_error=0.05, n_iter=12, target_rms=1.0, lambdas=None):
+    """
+    Inversión Occam 1D (Gauss-Newton + regularización de suavidad) por lotes.
+    Todas las estaciones se invierten simultáneamente con jacobianos analíticos.
+
+    freqs: (n_freqs,) Hz
+    rho_obs: (n_freqs,) o (n_stations, n_freqs) resistividad aparente observada
+    phase_obs: Fase observada en grados (opcional, misma forma que rho_obs)
+    rel_error: Error relativo asumido en rho_a (la fase usa rel_error/2 radianes)
+    Retorna un diccionario con el modelo, la profundidad y el ajuste por estación.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    omega = 2 * np.pi * freqs
+    rho_obs = np.atleast_2d(np.asarray(rho_obs, dtype=np.float64))
+    n_st, n_freqs = rho_obs.shape
+    use_phase = phase_obs is not None
+
+    if thicknesses is None:
+        thicknesses = build_layer_mesh(freqs, n_layers, rho_ref=float(np.median(rho_obs)))
+    thicknesses = np.asarray(thicknesses, dtype=np.float64)
+    n_layers = len(thicknesses) + 1
+    thick = np.broadcast_to(thicknesses, (n_st, n_layers - 1))
+
+    if lambdas is None:
+        lambdas = np.logspace(3, -2, 8)  # Ordenados de más suave a más rugoso
+    lambdas = np.asarray(lambdas, dtype=np.float64)
+    n_lam = len(lambdas)
+
+    # Datos observados y pesos (1/sigma)
+    d_obs = np.log10(rho_obs)
+    weights = np.full((n_st, n_freqs), np.log(10) / rel_error)
+    if use_phase:
+        phase_rad = np.radians(np.atleast_2d(phase_obs))
+        d_obs = np.concatenate((d_obs, phase_rad), axis=1)
+        weights = np.concatenate((weights, np.full((n_st, n_freqs), 2.0 / rel_error)), axis=1)
+
+    # Operador de rugosidad (primera diferencia entre capas)
+    R = np.diff(np.eye(n_layers), axis=0)
+    RtR = R.T @ R
+
+    m = np.tile(np.log(np.median(rho_obs, axis=1))[:, np.newaxis], (1, n_layers))
+    pred, _ = _predict_data(m, thick, omega, use_phase)
+    rms = np.sqrt(np.mean((weights * (d_obs - pred))**2, axis=1))
+    m_min, m_max = np.log(0.1), np.log(1e5)
+
+    for _ in range(n_iter):
+        pred, J = _predict_data(m, thick, omega, use_phase, jacobian=True)
+        Jw = J * weights[:, :, np.newaxis]
+        rw = weights * (d_obs - pred)
+
+        # Sistema Occam: (Jw^T Jw + lambda R^T R) m_new = Jw^T (rw + Jw m)
+        JtJ = np.einsum('sdi,sdj->sij', Jw, Jw)
+        rhs = np.einsum('sdi,sd->si', Jw, rw + np.einsum('sdi,si->sd', Jw, m))
+        A = JtJ[np.newaxis] + lambdas[:, np.newaxis, np.newaxis, np.newaxis] * RtR
+        b = np.broadcast_to(rhs, (n_lam, n_st, n_layers))[..., np.newaxis]
+        trials = np.clip(np.linalg.solve(A, b)[..., 0], m_min, m_max)
+
+        # Evaluación de todos los lambdas en un solo lote
+        trial_pred, _ = _predict_data(trials.reshape(-1, n_layers),
+                                      np.broadcast_to(thicknesses, (n_lam * n_st, n_layers - 1)),
+                                      omega, use_phase)
+        trial_pred = trial_pred.reshape(n_lam, n_st, -1)
+        trial_rms = np.sqrt(np.mean((weights * (d_obs - trial_pred))**2, axis=2))
+
+        # Occam: el modelo más suave que alcanza el objetivo; si ninguno, el de menor RMS
+        feasible = trial_rms <= target_rms
+        best = np.where(feasible.any(axis=0), np.argmax(feasible, axis=0), np.argmin(trial_rms, axis=0))
+        new_rms = trial_rms[best, np.arange(n_st)]
+
+        converged = (rms <= target_rms) & (np.abs(rms - new_rms) < 0.01)
+        m = trials[best, np.arange(n_st)]
+        rms = new_rms
+        if converged.all():
+            break
+
+    rho_pred, phase_pred = forward_mt_1d(np.exp(m), thicknesses, freqs)
+    return {
+        "resistivities": np.exp(m),
+        "thicknesses": thicknesses,
+        "depths": np.concatenate(([0.0], np.cumsum(thicknesses))),
+        "rms": rms,
+        "rho_pred": rho_pred,
+        "phase_pred": phase_pred,
+    }
+
+
+def invert_mt_line(freqs, rho_matrix, phase_matrix=None, n_workers=None, batch_size=32, **kwargs):
+    """
+    Invierte todas las estaciones de una línea en paralelo con un pool de procesos.
+    Cada proceso recibe un lote de estaciones que invierte de forma vectorizada.
+
+    rho_matrix: (n_stations, n_freqs)
+    n_workers: Número de procesos (1 = ejecución en el proceso actual)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    rho_matrix = np.atleast_2d(np.asarray(rho_matrix, dtype=np.float64))
+    n_st = rho_matrix.shape[0]
+    if kwargs.get("thicknesses") is None:
+        # Malla común para toda la línea, así los modelos son comparables
+        kwargs["thicknesses"] = build_layer_mesh(freqs, kwargs.pop("n_layers", 30),
+                                                 rho_ref=float(np.median(rho_matrix)))
+
+    batches = [slice(s, min(s + batch_size, n_st)) for s in range(0, n_st, batch_size)]
+
+    def _phase(sl):
+        return None if phase_matrix is None else np.atleast_2d(phase_matrix)[sl]
+
+    if n_workers == 1:
+        parts = [invert_mt_1d(freqs, rho_matrix[sl], _phase(sl), **kwargs) for sl in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=n_workers) as pool:
+            futures = [pool.submit(invert_mt_1d, freqs, rho_matrix[sl], _phase(sl), **kwargs)
+                       for sl in batches]
+            parts = [f.result() for f in futures]
+
+    result = {key: np.concatenate([p[key] for p in parts]) for key in
+              ("resistivities", "rms", "rho_pred", "phase_pred")}
+    result["thicknesses"] = parts[0]["thicknesses"]
+    result["depths"] = parts[0]["depths"]
+    return result
+
+
+# ==========================================================
+# TEM (TRANSITORIO ELECTROMAGNÉTICO): LAZO CENTRAL
+# ==========================================================
+
+def tem_halfspace_dbdt(times, rho, loop_radius, current=1.0):
+    """
+    dBz/dt (T/s) en el centro de un lazo circular sobre un semiespacio, tras el
+    corte de corriente (escalón de apagado, Ward & Hohmann 1988, ec. 4.98).
+    El valor es negativo: el campo decae.
+    """
+    from scipy.special import erf
+
+    t = np.asarray(times, dtype=np.float64)
+    sigma = 1.0 / rho
+    theta_a = np.sqrt(MU0 * sigma / (4 * t)) * loop_radius
+    bracket = (3 * erf(theta_a) - 2 / np.sqrt(np.pi) * theta_a * (3 + 2 * theta_a**2)
+               * np.exp(-theta_a**2))
+    return -current / (sigma * loop_radius**3) * bracket
+
+
+def tem_late_time_resistivity(dbdt, times, loop_radius, current=1.0):
+    """
+    Resistividad aparente de tiempo tardío de un sondeo de lazo central:
+        rho_a = mu0 / (4 pi t) * (2 mu0 m / (5 t |dBz/dt|))^(2/3),  m = I pi a²
+    Tiende a la resistividad real en las ventanas tardías; en las tempranas la
+    sobreestima (la aproximación de tiempo tardío no vale ahí).
+    """
+    t = np.asarray(times, dtype=np.float64)
+    moment = current * np.pi * loop_radius**2
+    return MU0 / (4 * np.pi * t) * (2 * MU0 * moment / (5 * t * np.abs(dbdt)))**(2.0 / 3.0)
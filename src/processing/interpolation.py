@@ -0,0 +1,79 @@
+# src\processing\interpolation.py
+"""
+Planes de interpolación reutilizables.
+
+Las secciones time-lapse regridean la misma geometría miles de veces: los índices
+y pesos de cada celda de salida solo dependen de los ejes, así que se calculan
+una vez y el motor de cómputo queda reducido a gather + FMA.
+"""
+
+import numpy as np
+from .backends import apply_interpolation_plan
+
+
+def _axis_table(src_axis, dst_axis, log=False):
+    """
+    Tabla de interpolación lineal para un eje.
+    Retorna (idx, w): idx (n_dst, 2) int32 con los vecinos [i0, i1] y
+    w (n_dst,) float32 con el peso de i1. Fuera del rango se sujeta al borde.
+    """
+    src = np.asarray(src_axis, dtype=np.float64)
+    dst = np.asarray(dst_axis, dtype=np.float64)
+    if log:
+        # Eje de frecuencias: interpolamos en log10(f), que es como se grafica
+        src, dst = np.log10(src), np.log10(dst)
+
+    n = len(src)
+    if n == 1:
+        return np.zeros((len(dst), 2), dtype=np.int32), np.zeros(len(dst), dtype=np.float32)
+
+    # Ejes decrecientes (ej. frecuencias de alta a baja) se invierten para searchsorted
+    descending = src[0] > src[-1]
+    if descending:
+        src = src[::-1]
+
+    i0 = np.clip(np.searchsorted(src, dst, side='right') - 1, 0, n - 2)
+    i1 = i0 + 1
+    w = np.clip((dst - src[i0]) / (src[i1] - src[i0]), 0.0, 1.0)
+
+    if descending:
+        i0, i1 = n - 1 - i0, n - 1 - i1
+
+    return np.ascontiguousarray(np.stack((i0, i1), axis=1), dtype=np.int32), w.astype(np.float32)
+
+
+class InterpolationPlan:
+    """
+    Plan bilineal precalculado para un par (ejes de entrada, ejes de salida).
+
+    in_rows/in_cols: Coordenadas reales de la malla de entrada (ej. posición de
+                     estaciones en metros y frecuencias en Hz)
+    out_rows/out_cols: Coordenadas de la malla de salida
+    log_rows/log_cols: Interpolar ese eje en escala log10 (ejes de frecuencia)
+    """
+
+    def __init__(self, in_rows, in_cols, out_rows, out_cols, log_rows=False, log_cols=False):
+        self.in_shape = (len(in_rows), len(in_cols))
+        self.out_shape = (len(out_rows), len(out_cols))
+        self.row_idx, self.row_w = _axis_table(in_rows, out_rows, log_rows)
+        self.col_idx, self.col_w = _axis_table(in_cols, out_cols, log_cols)
+
+    @classmethod
+    def from_shapes(cls, in_shape, out_shape):
+        """Plan en espacio de índices, equivalente a c_interpolate_data."""
+        in_rows, in_cols = in_shape
+        out_rows, out_cols = out_shape
+        return cls(np.arange(in_rows), np.arange(in_cols),
+                   np.linspace(0, in_rows - 1, out_rows), np.linspace(0, in_cols - 1, out_cols))
+
+    def apply(self, rho):
+        """
+        Interpola una matriz (in_rows, in_cols) o un lote (n, in_rows, in_cols).
+        """
+        rho = np.asarray(rho)
+        if rho.shape[-2:] != self.in_shape:
+            raise ValueError(f"Se esperaba una malla {self.in_shape}, se recibió {rho.shape[-2:]}")
+
+        batch = rho.reshape((-1,) + self.in_shape)
+        output = apply_interpolation_plan(batch, self.row_idx, self.row_w, self.col_idx, self.col_w)
+        return output.reshape(rho.shape[:-2] + self.out_shape)
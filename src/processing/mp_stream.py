@@ -0,0 +1,196 @@
+# src\processing\mp_stream.py
+"""
+Adquisición y procesamiento en procesos separados, unidos por un SharedRingBuffer.
+
+    adquisición (proceso) ──► anillo en memoria compartida ──► filtros (N procesos)
+
+Cada proceso de filtrado atiende un grupo fijo de canales, así el estado zi de
+cada canal vive en un solo proceso y el filtro sigue siendo continuo. Las filas
+de un grupo son contiguas dentro de la ranura, por lo que la vista se entrega
+directamente a c_apply_multichannel_filter sin copiar.
+"""
+
+import multiprocessing as mp
+import queue
+import time
+
+import numpy as np
+
+from .shm_ring import SharedRingBuffer
+
+
+def acquisition_process(spec, fs, n_blocks, realtime, seed, stats_q):
+    """Genera bloques al ritmo del reloj y los publica; nunca espera a los lectores."""
+    ring = SharedRingBuffer.attach(spec)
+    block_size, n_channels = spec["block_size"], spec["n_channels"]
+    rng = np.random.default_rng(seed)
+    base_t = np.arange(block_size) / fs
+    gains = rng.uniform(0.5, 1.5, (n_channels, 1)).astype(np.float32)
+    block_sec = block_size / fs
+    max_late = 0.0
+
+    start_t = time.perf_counter()
+    for seq in range(n_blocks):
+        if realtime:
+            delay = start_t + (seq + 1) * block_sec - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                max_late = max(max_late, -delay)
+
+        # Generación in situ en la ranura compartida (sin buffer intermedio)
+        slot = ring.begin_write(seq)
+        t = base_t + seq * block_sec
+        np.multiply(gains, np.sin(2 * np.pi * 2.0 * t), out=slot)
+        slot += 1.5 * np.sin(2 * np.pi * 60.0 * t).astype(np.float32)
+        slot += rng.normal(0, 0.5, slot.shape).astype(np.float32)
+        ring.publish(seq)
+
+    ring.close_stream()
+    stats_q.put({"role": "acquisition", "blocks": n_blocks,
+                 "seconds": time.perf_counter() - start_t, "max_late_ms": max_late * 1000})
+    ring.close()
+
+
+def filter_worker(spec, worker_id, channels, sos, stall_every, stall_s, stats_q, omp_threads=1):
+    """Filtra los canales [channels.start, channels.stop) de cada bloque publicado."""
+    from .cpp_bridge import c_apply_multichannel_filter, set_num_threads
+
+    set_num_threads(omp_threads) # Los procesos de filtrado se reparten los núcleos
+    ring = SharedRingBuffer.attach(spec)
+    n_ch = channels.stop - channels.start
+    zi = np.zeros((n_ch, (len(sos)//6) * 2), dtype=np.float32)
+    zi_next = np.empty_like(zi) # El estado avanza aquí y solo se adopta si el bloque era válido
+    rms_sum = np.zeros(n_ch, dtype=np.float64)
+    filtered = np.empty((n_ch, spec["block_size"]), dtype=np.float32) # Salida reutilizada
+    processed = dropped = max_lag = 0
+    busy = 0.0
+
+    seq = 0
+    while ring.wait_for(seq):
+        lag = ring.write_seq - seq
+        if lag > ring.n_slots:
+            # El escritor dio la vuelta: saltamos a lo más antiguo que sigue en el anillo
+            skip = lag - ring.n_slots + 1
+            dropped += skip
+            seq += skip
+            continue
+        max_lag = max(max_lag, lag)
+
+        t0 = time.perf_counter()
+        view = ring.view(seq, channels)
+        if view is not None:
+            np.copyto(zi_next, zi)
+            filtered, _ = c_apply_multichannel_filter(view, sos, zi_next, out=filtered)
+        if view is None or not ring.still_valid(seq):
+            dropped += 1 # Sobrescrito mientras se leía: zi no avanza con datos mezclados
+        else:
+            zi, zi_next = zi_next, zi
+            rms_sum += np.sqrt(np.mean(filtered ** 2, axis=1))
+            processed += 1
+        busy += time.perf_counter() - t0
+        del view
+
+        if stall_every and seq % stall_every == stall_every - 1:
+            time.sleep(stall_s) # Pausa simulada del lado de procesamiento (gráficos, GC)
+        seq += 1
+
+    stats_q.put({"role": "filter", "worker": worker_id,
+                 "channels": (channels.start, channels.stop), "processed": processed,
+                 "dropped": dropped, "max_lag_blocks": max_lag, "busy_s": busy,
+                 "mean_rms": (rms_sum / max(processed, 1)).tolist()})
+    ring.close()
+
+
+def _collect_stats(stats_q, processes, poll_s=1.0):
+    """
+    Una estadística por proceso. La cola se consulta con timeout y entre
+    consultas se revisa p.exitcode: un proceso que murió sin reportar
+    (excepción, señal) corta la espera en lugar de colgarla para siempre.
+    """
+    results = []
+    while len(results) < len(processes):
+        try:
+            results.append(stats_q.get(timeout=poll_s))
+            continue
+        except queue.Empty:
+            pass
+        failed = [p for p in processes if p.exitcode not in (None, 0)]
+        if failed:
+            raise RuntimeError("Procesos terminados con error: " +
+                               ", ".join(f"{p.name} (exitcode {p.exitcode})" for p in failed))
+        if all(p.exitcode is not None for p in processes):
+            try: # Terminaron todos: lo que falte ya está en la cola o no llegará
+                results.append(stats_q.get(timeout=poll_s))
+            except queue.Empty:
+                raise RuntimeError(f"Solo {len(results)} de {len(processes)} procesos reportaron estadísticas")
+    return results
+
+
+def run_shared_memory_stream(fs=24000, n_channels=24, block_sec=0.1, duration=10.0,
+                             n_workers=2, n_slots=32, notch_freq=60.0, quality=100.0,
+                             realtime=True, stall_every=0, stall_s=0.0, seed=0):
+    """
+    Lanza la adquisición y n_workers procesos de filtrado sobre un anillo compartido.
+
+    n_slots: Ranuras del anillo; un lector puede atrasarse hasta n_slots bloques sin perder datos
+    stall_every / stall_s: Pausa simulada de stall_s segundos cada stall_every bloques
+                           en los lectores (para comprobar que la adquisición no se entera)
+    Retorna las estadísticas de la adquisición y de cada proceso de filtrado.
+    Si un proceso muere, se terminan los demás y se lanza RuntimeError.
+    """
+    block_size = int(fs * block_sec)
+    n_blocks = int(round(duration / block_sec))
+    from scipy import signal # Diferido: solo se usa para diseñar el filtro
+    b, a = signal.iirnotch(notch_freq, quality, fs)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+
+    ring = SharedRingBuffer(n_channels, block_size, n_slots)
+    spec = ring.spec()
+    stats_q = mp.Queue()
+    groups = np.array_split(np.arange(n_channels), n_workers)
+    omp_threads = max(1, (mp.cpu_count() - 1) // n_workers) # Un núcleo para la adquisición
+
+    workers = [mp.Process(target=filter_worker,
+                          args=(spec, i, slice(int(g[0]), int(g[-1]) + 1), sos,
+                                stall_every, stall_s, stats_q, omp_threads))
+               for i, g in enumerate(groups) if len(g)]
+    acq = mp.Process(target=acquisition_process, args=(spec, fs, n_blocks, realtime, seed, stats_q))
+
+    start_t = time.perf_counter()
+    try:
+        for p in workers:
+            p.start()
+        acq.start()
+        results = _collect_stats(stats_q, workers + [acq])
+        for p in workers + [acq]:
+            p.join()
+    finally:
+        for p in workers + [acq]:
+            if p.is_alive(): # Solo tras un error: los lectores esperarían un escritor muerto
+                p.terminate()
+                p.join()
+        ring.close()
+    wall = time.perf_counter() - start_t
+
+    acquisition = next(r for r in results if r["role"] == "acquisition")
+    filters = sorted((r for r in results if r["role"] == "filter"), key=lambda r: r["worker"])
+    return {"fs": fs, "n_channels": n_channels, "block_size": block_size, "n_blocks": n_blocks,
+            "wall_seconds": wall, "acquisition": acquisition, "workers": filters,
+            "dropped": sum(r["dropped"] for r in filters)}
+
+
+def print_shared_memory_report(report):
+    """Resumen en consola de la adquisición y de cada proceso de filtrado."""
+    acq = report["acquisition"]
+    print(f"Adquisición: {report['n_blocks']} bloques de {report['n_channels']}x"
+          f"{report['block_size']} en {acq['seconds']:.2f}s | "
+          f"atraso máx. respecto al reloj: {acq['max_late_ms']:.2f} ms")
+    print(f"{'PROCESO':<8} | {'CANALES':<8} | {'PROCESADOS':>10} | {'PERDIDOS':>8} | "
+          f"{'ATRASO MÁX':>10} | {'OCUPADO (s)':>11}")
+    print("-" * 70)
+    for w in report["workers"]:
+        ch = f"{w['channels'][0]}-{w['channels'][1] - 1}"
+        print(f"{w['worker']:<8} | {ch:<8} | {w['processed']:>10} | {w['dropped']:>8} | "
+              f"{w['max_lag_blocks']:>10} | {w['busy_s']:>11.3f}")
+    print(f"Bloques perdidos en total: {report['dropped']}")
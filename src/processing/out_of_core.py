@@ -0,0 +1,145 @@
+# src\processing\out_of_core.py
+"""
+Procesamiento out-of-core de levantamientos de varias horas con memoria acotada.
+
+El archivo se recorre en bloques de tiempo que caben en el presupuesto de memoria.
+Cada bloque pasa por el filtro Notch (con zi continuo entre bloques), se acumula
+en el stacking y en el espectro promedio por segmento, y se descarta. El filtro
+trabaja en su lugar sobre el buffer del bloque: nunca hay en RAM más de un bloque.
+"""
+
+import os
+import sys
+import time
+import numpy as np
+
+from .backends import load_raw_block, apply_filter, calculate_spectrum
+from .geophysics import compute_apparent_resistivity
+
+
+def peak_rss_bytes():
+    """Pico de memoria residente del proceso (RSS máximo), en bytes."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t), ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        handle = ctypes.windll.kernel32.GetCurrentProcess()
+        ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb)
+        return counters.PeakWorkingSetSize
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024 # Linux reporta KiB
+
+
+def plan_chunk_segments(n_channels, samples_per_seg, memory_budget_mb):
+    """
+    Segmentos por bloque que caben en el presupuesto.
+    Por bloque vive un solo buffer float32 (el filtro escribe sobre el bloque crudo).
+    """
+    bytes_per_segment = n_channels * samples_per_seg * 4
+    return max(1, int(memory_budget_mb * 1024**2) // bytes_per_segment)
+
+
+def process_survey_out_of_core(filename, n_channels=24, fs=24000, segment_sec=0.5,
+                               target_freqs=None, notch_freq=60.0, quality=100.0,
+                               memory_budget_mb=512, h_ref_channel=1, verbose=True):
+    """
+    Filtra, apila y acumula espectros de un levantamiento completo por bloques.
+
+    filename: Archivo .raw float32, canal tras canal
+    memory_budget_mb: Memoria de trabajo para el buffer de bloques
+    Retorna un dict con el stacking, los espectros, la resistividad y las estadísticas
+    de la ejecución (bloques, tiempo y pico de RSS).
+    """
+    if target_freqs is None:
+        target_freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+    target_freqs = np.ascontiguousarray(target_freqs, dtype=np.float32)
+
+    samples_per_channel = os.path.getsize(filename) // (4 * n_channels)
+    samples_per_seg = int(fs * segment_sec)
+    n_segments = samples_per_channel // samples_per_seg
+    if n_segments == 0:
+        raise ValueError(f"El archivo tiene menos de un segmento ({samples_per_seg} muestras) por canal")
+
+    chunk_segments = min(plan_chunk_segments(n_channels, samples_per_seg, memory_budget_mb), n_segments)
+    chunk_samples = chunk_segments * samples_per_seg
+    n_chunks = -(-n_segments // chunk_segments)
+
+    if verbose:
+        hours = samples_per_channel / fs / 3600
+        print(f"[*] Out-of-core: {n_channels} canales x {hours:.2f} h | "
+              f"{n_chunks} bloques de {chunk_segments} segmentos "
+              f"(presupuesto {memory_budget_mb} MB)")
+
+    # Filtro con estado continuo por canal (sin transitorios entre bloques)
+    from scipy import signal # Diferido: solo se usa para diseñar el filtro
+    b, a = signal.iirnotch(notch_freq, quality, fs)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+    zi = np.zeros((n_channels, (len(sos)//6) * 2), dtype=np.float32)
+
+    # Buffers y acumuladores reutilizados en todos los bloques
+    raw_buffer = np.empty((n_channels, chunk_samples), dtype=np.float32)
+    stack_sum = np.zeros((n_channels, samples_per_seg), dtype=np.float64)
+    mag_sum = np.zeros((n_channels, len(target_freqs)), dtype=np.float64)
+
+    start_t = time.perf_counter()
+    for k in range(n_chunks):
+        seg0 = k * chunk_segments
+        seg_count = min(chunk_segments, n_segments - seg0)
+        n_read = seg_count * samples_per_seg
+
+        block = load_raw_block(filename, n_channels, samples_per_channel,
+                               seg0 * samples_per_seg, n_read, out=raw_buffer)
+        filtered, zi = apply_filter(block, sos, zi, out=block) # En su lugar
+
+        # Acumulación: stacking por segmento y espectro promedio de los segmentos
+        segments = filtered.reshape(n_channels, seg_count, samples_per_seg)
+        stack_sum += segments.sum(axis=1)
+        seg_mags = calculate_spectrum(filtered.reshape(n_channels * seg_count, samples_per_seg),
+                                      float(fs), target_freqs)
+        mag_sum += seg_mags.reshape(n_channels, seg_count, -1).sum(axis=1)
+        del filtered, segments
+
+        if verbose:
+            print(f"    Bloque {k+1}/{n_chunks} [OK]", end="\r")
+
+    elapsed = time.perf_counter() - start_t
+    stacked = (stack_sum / n_segments).astype(np.float32)
+    mean_segment_mags = (mag_sum / n_segments).astype(np.float32)
+    mags = calculate_spectrum(stacked, float(fs), target_freqs)
+
+    rho_matrix = np.zeros(mags.shape, dtype=np.float32)
+    for ch in range(n_channels):
+        rho_matrix[ch] = compute_apparent_resistivity(mags[ch], mags[h_ref_channel], target_freqs)
+
+    stats = {
+        "n_chunks": n_chunks,
+        "chunk_segments": chunk_segments,
+        "n_segments": n_segments,
+        "seconds": elapsed,
+        "samples_per_second": n_channels * n_segments * samples_per_seg / elapsed,
+        "peak_rss_mb": peak_rss_bytes() / 1024**2,
+    }
+    if verbose:
+        print(f"\n[OK] {n_segments} segmentos en {elapsed:.2f}s "
+              f"({stats['samples_per_second'] / 1e6:.1f} M muestras/s) | "
+              f"pico RSS: {stats['peak_rss_mb']:.1f} MB")
+
+    return {
+        "stacked": stacked,
+        "mags": mags,
+        "mean_segment_mags": mean_segment_mags,
+        "rho_matrix": rho_matrix,
+        "freqs": target_freqs,
+        "stats": stats,
+    }
@@ -0,0 +1,223 @@
+# src\processing\pipeline.py
+"""
+Motor de pipeline declarativo con caché por contenido.
+
+Cada etapa declara su función, sus parámetros y las etapas de las que depende.
+La clave de caché de una etapa es un hash de (nombre, código de la función,
+versión, parámetros, claves de sus entradas, huella de archivos, motores de
+cómputo), así que se puede calcular sin ejecutar nada: si la última etapa ya
+está en disco, las anteriores ni siquiera se cargan. Editar el cuerpo de una
+etapa o cambiar de motor (otra DLL, otra tabla de autotune) invalida su caché;
+version= permite invalidarla a mano cuando cambia algo que la función llama.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+import numpy as np
+
+from . import backends
+from .tracing import span
+
+
+def _normalize(value):
+    """Convierte parámetros a algo serializable y estable para el hash."""
+    if isinstance(value, np.ndarray):
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return {"__ndarray__": digest, "dtype": str(value.dtype), "shape": list(value.shape)}
+    if isinstance(value, (np.integer, np.floating)):
+        return value.item()
+    if isinstance(value, dict):
+        return {str(k): _normalize(v) for k, v in sorted(value.items())}
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    return value
+
+
+def code_fingerprint(func):
+    """
+    Hash del bytecode y las constantes de func (incluye funciones anidadas).
+    None si func no tiene código Python (builtins, partial, objetos invocables).
+    """
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return None
+    digest = hashlib.sha256()
+
+    def feed(code):
+        digest.update(code.co_code)
+        for const in code.co_consts:
+            # El repr de un code object anidado lleva su dirección: se recorre
+            if hasattr(const, "co_code"):
+                feed(const)
+            else:
+                digest.update(repr(const).encode("utf-8"))
+        digest.update(repr(code.co_names).encode("utf-8"))
+
+    feed(code)
+    return digest.hexdigest()[:16]
+
+
+def file_fingerprint(path):
+    """Huella barata de un archivo de entrada (ruta, tamaño y fecha de modificación)."""
+    st = os.stat(path)
+    return {"path": os.path.abspath(path), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+class Stage:
+    """
+    name: Nombre único de la etapa
+    func: func(*resultados_de_entradas, **params) -> dict de arreglos NumPy
+    params: Parámetros declarados (forman parte de la clave de caché)
+    inputs: Nombres de las etapas de las que depende, en el orden de los argumentos
+    files: Archivos leídos por la etapa; su huella invalida la caché si cambian
+    cache: False para etapas que no vale la pena guardar (ej. la carga de un .raw)
+    version: Se suma a la clave; subirla invalida la caché cuando cambia algo que
+             el hash del código de func no ve (p. ej. una función que func llama)
+    """
+
+    def __init__(self, name, func, params=None, inputs=(), files=(), cache=True, version=None):
+        self.name = name
+        self.func = func
+        self.params = params or {}
+        self.inputs = tuple(inputs)
+        self.files = tuple(files)
+        self.cache = cache
+        self.version = version
+
+
+class StageCache:
+    """
+    Caché en disco (un .npz por clave) con expulsión LRU por tamaño total.
+    La fecha de modificación de cada archivo se renueva en cada acierto.
+    """
+
+    def __init__(self, cache_dir, max_bytes):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+        self.evict() # El límite pudo cambiar desde la última ejecución
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.npz")
+
+    def get(self, key):
+        path = self._path(key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path) # Marca de uso reciente para el LRU
+        with np.load(path, allow_pickle=False) as data:
+            return {k: data[k] for k in data.files}
+
+    def put(self, key, result):
+        path = self._path(key)
+        # Temporal propio de este proceso e hilo: dos corridas que comparten la caché
+        # y escriben la misma etapa no se mezclan; la última en publicar gana entera
+        tmp = f"{path[:-len('.npz')]}.{os.getpid()}.{threading.get_ident()}.tmp.npz"
+        try:
+            np.savez(tmp, **result)
+            os.replace(tmp, path) # Escritura atómica: nunca queda un .npz a medias
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+
+    def evict(self):
+        """Elimina las entradas usadas hace más tiempo hasta respetar max_bytes."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(".npz") and ".tmp" not in name:
+                st = os.stat(os.path.join(self.cache_dir, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.cache_dir, name))
+            total -= size
+
+
+class Pipeline:
+    """
+    Ejecuta un grafo de etapas reutilizando resultados cacheados.
+
+    stages: Lista de Stage (el orden no importa, se resuelve por dependencias)
+    cache_dir: Carpeta de la caché (None = sin caché en disco)
+    max_cache_mb: Tamaño máximo de la caché antes de expulsar por LRU
+    """
+
+    def __init__(self, stages, cache_dir=".gif_cache", max_cache_mb=2048):
+        self.stages = {s.name: s for s in stages}
+        self.cache = StageCache(cache_dir, int(max_cache_mb * 1024**2)) if cache_dir else None
+        self.report = []
+        self._keys = {}
+        self._backends = None
+
+    def key(self, name):
+        """Clave de caché de una etapa (depende solo de declaraciones, no de datos)."""
+        if name not in self._keys:
+            stage = self.stages[name]
+            if self._backends is None:
+                self._backends = backends.dispatch_signature()
+            payload = {
+                "stage": name,
+                "func": f"{stage.func.__module__}.{stage.func.__qualname__}",
+                "code": code_fingerprint(stage.func),
+                "version": stage.version,
+                "backends": self._backends,
+                "params": _normalize(stage.params),
+                "inputs": [self.key(dep) for dep in stage.inputs],
+                "files": [file_fingerprint(f) for f in stage.files],
+            }
+            blob = json.dumps(payload, sort_keys=True).encode("utf-8")
+            self._keys[name] = hashlib.sha256(blob).hexdigest()[:32]
+        return self._keys[name]
+
+    def run(self, targets=None, verbose=True):
+        """
+        Evalúa las etapas pedidas y retorna {nombre: resultado}.
+        Por defecto se piden las etapas finales (las que nadie usa como entrada).
+        Solo se ejecutan las etapas sin caché cuyo resultado realmente se necesita.
+        """
+        if targets is None:
+            used = {dep for s in self.stages.values() for dep in s.inputs}
+            targets = [name for name in self.stages if name not in used]
+        self._keys = {}
+        self._backends = None # La DLL o la tabla de autotune pudieron cambiar
+        self.report = []
+        results = {}
+        for name in targets:
+            self._evaluate(name, results, verbose)
+        return results
+
+    def _evaluate(self, name, results, verbose):
+        if name in results:
+            return results[name]
+        stage = self.stages[name]
+        key = self.key(name)
+        start_t = time.perf_counter()
+
+        use_cache = self.cache is not None and stage.cache
+        result = None
+        if use_cache:
+            with span(f"cache.get:{name}", cat="cache"):
+                result = self.cache.get(key)
+        status = "cache"
+        if result is None:
+            args = [self._evaluate(dep, results, verbose) for dep in stage.inputs]
+            start_t = time.perf_counter()
+            with span(name, cat="stage", key=key):
+                result = stage.func(*args, **stage.params)
+            status = "run"
+            if use_cache:
+                with span(f"cache.put:{name}", cat="cache"):
+                    self.cache.put(key, result)
+
+        elapsed = time.perf_counter() - start_t
+        self.report.append({"stage": name, "status": status, "seconds": elapsed, "key": key})
+        if verbose:
+            print(f"    [{status:>5}] {name:<14} {elapsed:.4f}s")
+        results[name] = result
+        return result
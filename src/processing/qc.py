@@ -0,0 +1,274 @@
+# src\processing\qc.py
+"""
+Control de calidad (QC) por canal: una tabla de métricas en una sola pasada.
+
+    from src.processing.qc import compute_qc, ChannelQC
+
+    tabla = compute_qc(datos, fs, filtered=filtrados, ref_channel=1)  # lote
+    qc = ChannelQC(n_canales, fs)                                       # streaming
+    for bloque, bloque_filtrado in stream:
+        qc.update(bloque, bloque_filtrado)
+    tabla = qc.table()
+
+Las métricas espectrales salen de un Welch sin solapamiento (ventana de Hann,
+segmentos de segment_sec): todos los canales y segmentos van en una sola FFT
+vectorizada, y los segmentos se completan entre bloques, así el resultado en
+streaming es el mismo que en lote. Columnas de la tabla (un renglón por canal):
+
+    rms, peak           Nivel de la señal cruda
+    clip_ratio          Fracción de muestras saturadas: |x| >= clip_level, o sin
+                        clip_level, las de tramos de al menos _CLIP_MIN_RUN muestras
+                        idénticas en el pico del canal (conversor pegado al riel; un
+                        dato entero repite valores, pero no largos tramos en su máximo).
+                        En streaming "el pico" es el máximo visto hasta ese bloque
+    snr_<banda>_db      Densidad media en la banda / piso de ruido. El piso es la
+                        mediana de la PSD fuera de las bandas de señal y de la red
+    line_excess_db      Pico de la red (fundamental) sobre la mediana de su entorno
+    notch_rejection_db  Potencia de la fundamental antes / después del filtro
+                        (solo si se entregan los datos filtrados)
+    coherence_ref       Coherencia cuadrática media con ref_channel en las bandas de
+                        señal (solo con ref_channel)
+    status              ok / muerto / saturado / ruidoso, según QC_LIMITS
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import fft as sp_fft
+
+DEFAULT_BANDS = ((1.0, 10.0), (10.0, 50.0))
+QC_LIMITS = {
+    "dead_rms_ratio": 1e-3, # RMS menor a esta fracción de la mediana de RMS: canal muerto
+    "clip_ratio": 1e-4,     # Fracción de muestras saturadas tolerada
+    "min_snr_db": 6.0,      # SNR mínimo en alguna banda de señal
+}
+_LINE_HALF_BINS = 1   # Bins a cada lado de un armónico que cuentan como red
+_LINE_GUARD_BINS = 3  # Bins excluidos del piso de ruido alrededor de cada armónico
+_LOCAL_BINS = 12      # Entorno para la mediana local de line_excess_db
+_CLIP_MIN_RUN = 8     # Sin clip_level: largo mínimo de un tramo de muestras idénticas saturado
+_CLIP_NEAR_PEAK = 0.99 # ... y su valor absoluto, como fracción del pico del canal
+
+
+def band_label(band):
+    return f"snr_{band[0]:g}-{band[1]:g}Hz_db"
+
+
+class ChannelQC:
+    """
+    Acumulador de QC para n_channels canales.
+    update() acepta bloques (n_channels, n) de cualquier largo; table() puede
+    llamarse en cualquier momento y refleja todo lo recibido hasta ese punto.
+
+    signal_bands: Bandas (f_min, f_max) en Hz donde se mide el SNR
+    line_freq / harmonics: Red eléctrica y cantidad de armónicos a excluir del piso
+    segment_sec: Largo del segmento de Welch (resolución = 1 / segment_sec Hz)
+    ref_channel: Canal de referencia para la coherencia (ej. el H de una estación MT)
+    pairwise: Acumula además los espectros cruzados de todos los pares en las
+              bandas de señal para coherence_matrix() (memoria ~ canales² x bins)
+    """
+
+    def __init__(self, n_channels, fs, signal_bands=DEFAULT_BANDS, line_freq=60.0, harmonics=3,
+                 segment_sec=0.5, clip_level=None, ref_channel=None, pairwise=False,
+                 channel_names=None, limits=None):
+        self.n_channels = n_channels
+        self.fs = fs
+        self.signal_bands = tuple(tuple(b) for b in signal_bands)
+        self.clip_level = clip_level
+        self.ref_channel = ref_channel
+        self.channel_names = list(channel_names) if channel_names is not None else list(range(n_channels))
+        self.limits = dict(QC_LIMITS, **(limits or {}))
+
+        self.nperseg = int(round(segment_sec * fs))
+        self.freqs = np.fft.rfftfreq(self.nperseg, 1.0 / fs)
+        self.window = np.hanning(self.nperseg).astype(np.float32)
+        df = self.freqs[1]
+
+        # Bins de cada banda, de la fundamental de red y del piso de ruido
+        self.band_masks = [(self.freqs >= lo) & (self.freqs <= hi) for lo, hi in self.signal_bands]
+        self.signal_mask = np.logical_or.reduce(self.band_masks) if self.band_masks else \
+            np.zeros(len(self.freqs), dtype=bool)
+        line_bins = [int(round(h * line_freq / df)) for h in range(1, harmonics + 1)
+                     if h * line_freq < fs / 2]
+        self.line_bin = line_bins[0] if line_bins else None
+        noise_mask = ~self.signal_mask
+        noise_mask[0] = False # DC
+        for k in line_bins:
+            noise_mask[max(k - _LINE_GUARD_BINS, 0):k + _LINE_GUARD_BINS + 1] = False
+        self.noise_mask = noise_mask
+
+        # La potencia de la fundamental tras el filtro solo necesita esos bins: DFT directa
+        if self.line_bin is not None:
+            k = np.arange(self.line_bin - _LINE_HALF_BINS, self.line_bin + _LINE_HALF_BINS + 1)
+            n = np.arange(self.nperseg)
+            self._line_bins = k
+            self._line_basis = (self.window[:, None] *
+                                np.exp(-2j * np.pi * n[:, None] * k[None, :] / self.nperseg)
+                                ).astype(np.complex64)
+        self.reset(pairwise)
+
+    def reset(self, pairwise=None):
+        """Vacía los acumuladores (nuevo tramo de QC con la misma configuración)."""
+        if pairwise is not None:
+            self.pairwise = pairwise
+        ch, nf = self.n_channels, len(self.freqs)
+        self.n_samples = 0
+        self.n_segments = 0
+        self.n_segments_post = 0
+        self.sum_sq = np.zeros(ch)
+        self.peak = np.zeros(ch)
+        self.clipped = np.zeros(ch, dtype=np.int64)
+        self.psd_sum = np.zeros((ch, nf))
+        self.line_post_sum = np.zeros(ch)
+        self.cross_ref_sum = np.zeros((ch, nf), dtype=np.complex128) if self.ref_channel is not None else None
+        n_sig = int(self.signal_mask.sum())
+        self.cross_sum = np.zeros((n_sig, ch, ch), dtype=np.complex128) if self.pairwise else None
+        self._last = None     # Última muestra del bloque anterior (detección de repeticiones)
+        self._run = np.zeros(ch, dtype=np.int64) # Largo del tramo de repeticiones en curso
+        self._tail = np.empty((ch, 0), dtype=np.float32)
+        self._tail_post = np.empty((ch, 0), dtype=np.float32)
+
+    def _segments(self, tail, chunk):
+        """Une el resto del bloque anterior con el nuevo; retorna (segmentos, nuevo resto)."""
+        buf = np.concatenate((tail, chunk), axis=1) if tail.shape[1] else chunk
+        n_seg = buf.shape[1] // self.nperseg
+        used = n_seg * self.nperseg
+        segments = buf[:, :used].reshape(self.n_channels, n_seg, self.nperseg)
+        return segments, np.array(buf[:, used:], dtype=np.float32)
+
+    def update(self, chunk, filtered=None):
+        """Acumula un bloque crudo (n_channels, n) y, opcionalmente, el mismo bloque filtrado."""
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim != 2 or chunk.shape[0] != self.n_channels:
+            raise ValueError(f"chunk: se esperaba ({self.n_channels}, n), llegó {chunk.shape}")
+
+        # 1. Nivel y saturación
+        self.n_samples += chunk.shape[1]
+        self.sum_sq += np.sum(np.square(chunk), axis=1, dtype=np.float64)
+        self.peak = np.maximum(self.peak, np.abs(chunk).max(axis=1))
+        if self.clip_level is not None:
+            self.clipped += np.count_nonzero(np.abs(chunk) >= self.clip_level, axis=1)
+        elif chunk.shape[1]:
+            self.clipped += self._clipped_runs(chunk)
+
+        # 2. Welch: todos los segmentos completos de todos los canales en una FFT
+        segments, self._tail = self._segments(self._tail, chunk)
+        if segments.shape[1]:
+            spec = sp_fft.rfft(segments * self.window, axis=-1, workers=-1)
+            self.psd_sum += np.sum(spec.real**2 + spec.imag**2, axis=1)
+            self.n_segments += segments.shape[1]
+            if self.cross_ref_sum is not None:
+                self.cross_ref_sum += np.sum(spec * np.conj(spec[self.ref_channel]), axis=1)
+            if self.cross_sum is not None:
+                sig = spec[:, :, self.signal_mask]                    # (ch, seg, bins)
+                self.cross_sum += np.einsum("isb,jsb->bij", sig, np.conj(sig))
+
+        # 3. Fundamental de red tras el filtro
+        if filtered is not None and self.line_bin is not None:
+            filtered = np.asarray(filtered, dtype=np.float32)
+            segments, self._tail_post = self._segments(self._tail_post, filtered)
+            if segments.shape[1]:
+                line = segments @ self._line_basis                    # (ch, seg, bins)
+                self.line_post_sum += np.sum(np.abs(line)**2, axis=(1, 2))
+                self.n_segments_post += segments.shape[1]
+        return self
+
+    def _clipped_runs(self, chunk):
+        """
+        Muestras en tramos de >= _CLIP_MIN_RUN valores idénticos cerca del pico.
+        Los tramos continúan entre bloques: cada muestra conoce su posición en el
+        tramo, y al llegar a _CLIP_MIN_RUN se cuentan también las anteriores.
+        """
+        n = chunk.shape[1]
+        prev = np.full((self.n_channels, 1), np.nan, np.float32) if self._last is None else self._last
+        starts = np.diff(chunk, axis=1, prepend=prev) != 0 # Primera muestra de cada tramo
+        idx = np.arange(n)
+        last_start = np.maximum.accumulate(np.where(starts, idx, -1), axis=1)
+        run = np.where(last_start >= 0, idx - last_start, idx + self._run[:, None]) + 1
+        near = (np.abs(chunk) >= _CLIP_NEAR_PEAK * self.peak[:, None]) & (chunk != 0)
+        counted = np.count_nonzero(near & (run >= _CLIP_MIN_RUN), axis=1) + \
+            (_CLIP_MIN_RUN - 1) * np.count_nonzero(near & (run == _CLIP_MIN_RUN), axis=1)
+        self._run = run[:, -1].copy()
+        self._last = chunk[:, -1:].copy()
+        return counted
+
+    def psd(self):
+        """PSD promedio (n_channels, bins) en unidades²/Hz."""
+        scale = 1.0 / (self.fs * np.sum(self.window.astype(np.float64)**2))
+        psd = self.psd_sum / max(self.n_segments, 1) * scale
+        psd[:, 1:-1] *= 2 # Espectro de un lado
+        return psd
+
+    def coherence_matrix(self):
+        """Coherencia cuadrática media (n_channels, n_channels) en las bandas de señal."""
+        if self.cross_sum is None:
+            raise RuntimeError("coherence_matrix() requiere ChannelQC(..., pairwise=True)")
+        auto = np.real(np.einsum("bii->bi", self.cross_sum))
+        denom = auto[:, :, None] * auto[:, None, :]
+        coh = np.abs(self.cross_sum)**2 / np.where(denom > 0, denom, np.inf)
+        return coh.mean(axis=0)
+
+    def table(self):
+        """DataFrame con una fila por canal (ver columnas en el docstring del módulo)."""
+        n = max(self.n_samples, 1)
+        rms = np.sqrt(self.sum_sq / n)
+        columns = {"rms": rms, "peak": self.peak, "clip_ratio": self.clipped / n}
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if self.n_segments:
+                psd = self.psd_sum / self.n_segments
+                floor = np.median(psd[:, self.noise_mask], axis=1)
+                for band, mask in zip(self.signal_bands, self.band_masks):
+                    columns[band_label(band)] = 10 * np.log10(psd[:, mask].mean(axis=1) / floor)
+                if self.line_bin is not None:
+                    k = self.line_bin
+                    lo, hi = max(k - _LOCAL_BINS, 1), k + _LOCAL_BINS + 1
+                    local = np.concatenate((psd[:, lo:k - _LINE_GUARD_BINS],
+                                            psd[:, k + _LINE_GUARD_BINS + 1:hi]), axis=1)
+                    line_pre = psd[:, self._line_bins].sum(axis=1)
+                    columns["line_excess_db"] = 10 * np.log10(psd[:, self._line_bins].max(axis=1) /
+                                                              np.median(local, axis=1))
+                    if self.n_segments_post:
+                        line_post = self.line_post_sum / self.n_segments_post
+                        columns["notch_rejection_db"] = 10 * np.log10(line_pre / line_post)
+                if self.cross_ref_sum is not None:
+                    ref = psd[self.ref_channel]
+                    sig = self.signal_mask
+                    coh = (np.abs(self.cross_ref_sum[:, sig] / self.n_segments)**2 /
+                           (psd[:, sig] * ref[sig]))
+                    columns["coherence_ref"] = coh.mean(axis=1)
+
+        table = pd.DataFrame(columns, index=pd.Index(self.channel_names, name="channel"))
+        table["status"] = self._status(table)
+        return table
+
+    def _status(self, table):
+        limits = self.limits
+        status = np.full(len(table), "ok", dtype=object)
+        snr_cols = [band_label(b) for b in self.signal_bands if band_label(b) in table]
+        if snr_cols:
+            status[(table[snr_cols].max(axis=1) < limits["min_snr_db"]).to_numpy()] = "ruidoso"
+        status[(table["clip_ratio"] > limits["clip_ratio"]).to_numpy()] = "saturado"
+        median_rms = np.median(table["rms"])
+        status[(table["rms"] <= limits["dead_rms_ratio"] * median_rms).to_numpy()] = "muerto"
+        return status
+
+
+def compute_qc(data, fs, filtered=None, **kwargs):
+    """
+    Tabla de QC en lote de una matriz (n_channels, n_samples).
+    filtered: La misma matriz tras el filtro Notch (agrega notch_rejection_db)
+    kwargs: Configuración de ChannelQC (signal_bands, ref_channel, clip_level, ...)
+    """
+    data = np.asarray(data, dtype=np.float32)
+    return ChannelQC(data.shape[0], fs, **kwargs).update(data, filtered).table()
+
+
+def print_qc_summary(table):
+    """Resumen en consola: canales por estado y promedios de las métricas numéricas."""
+    counts = table["status"].value_counts()
+    print(f"QC de {len(table)} canales | " +
+          " | ".join(f"{name}: {count}" for name, count in counts.items()))
+    means = table.drop(columns="status").mean(numeric_only=True)
+    print("Promedios: " + " | ".join(f"{col} {value:.3g}" for col, value in means.items()))
+    bad = table[table["status"] != "ok"]
+    if len(bad):
+        print("Canales con problemas:")
+        print(bad.to_string(float_format=lambda v: f"{v:.3g}"))
@@ -0,0 +1,220 @@
+# src\processing\replay.py
+"""
+Reproducción en tiempo real de un levantamiento grabado, con latencia por bloque.
+
+Un .raw existente se entrega bloque a bloque al ritmo real del muestreo (o a
+N veces ese ritmo con 'speed') y cada bloque pasa por la ruta de streaming:
+
+    multichannel  Filtro Notch SOS multicanal de src.processing.backends (zi continuo)
+    stream        Un GeophysicalStreamFilter por canal, como en la adquisición en vivo
+
+El bloque k "llega" cuando el conversor terminaría de adquirirlo:
+t0 + (k + 1) * duración_bloque / speed. Su latencia es fin del proceso - llegada,
+así que incluye la espera si el bloque anterior se atrasó. El plazo de cada
+bloque es la duración del bloque / speed (antes de que llegue el siguiente):
+superarlo es un deadline perdido. Con speed=0 los bloques se procesan sin
+esperar y el plazo es la duración real del bloque.
+
+La lectura del archivo (una copia al buffer del bloque) ocurre antes de la
+llegada y no cuenta en la latencia: emula el DMA del conversor.
+"""
+
+import contextlib
+import io
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+from .backends import apply_filter, select_backend
+from .cpp_bridge import git_commit, native_available, thread_scope
+
+REPLAY_PATHS = ("multichannel", "stream")
+# Histograma de latencia: bins logarítmicos de 1 µs a 10 s (6 por década), en ms
+HIST_EDGES_MS = np.geomspace(1e-3, 1e4, 43)
+_SPIN_S = 0.002 # Los últimos ms de espera se hacen activos (sleep del SO es grueso en Windows)
+
+
+def open_survey(filename, n_channels=None, fs=None):
+    """
+    Abre un .raw canal-tras-canal como memmap (n_channels, muestras).
+    Si existe el .raw.json de tools/generate_survey.py, de ahí salen n_channels y fs.
+    Retorna (memmap, fs).
+    """
+    sidecar = filename + ".json"
+    if os.path.exists(sidecar):
+        with open(sidecar, "r", encoding="utf-8") as f:
+            spec = json.load(f)
+        n_channels = n_channels or spec["n_channels"]
+        fs = fs or spec["fs"]
+    if n_channels is None or fs is None:
+        raise ValueError(f"{filename}: sin {sidecar}; indique n_channels y fs")
+    samples_per_channel = os.path.getsize(filename) // (4 * n_channels)
+    data = np.memmap(filename, dtype=np.float32, mode="r", shape=(n_channels, samples_per_channel))
+    return data, fs
+
+
+def _make_processor(path, fs, n_channels, chunk_samples, notch_freq, quality):
+    """Función f(bloque) con el estado del filtro continuo entre llamadas."""
+    if path == "multichannel":
+        from scipy import signal # Diferido: solo se usa para diseñar el filtro
+        b, a = signal.iirnotch(notch_freq, quality, fs)
+        sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+        state = {"zi": np.zeros((n_channels, (len(sos)//6) * 2), dtype=np.float32)}
+        out = np.empty((n_channels, chunk_samples), dtype=np.float32)
+
+        def process(chunk):
+            filtered, state["zi"] = apply_filter(chunk, sos, state["zi"], out=out)
+            return filtered
+        return process, select_backend("filter", n_channels * chunk_samples)
+
+    if path == "stream":
+        from .stream_filters import GeophysicalStreamFilter
+        # Cada filtro anuncia su motor por consola: no interesa una línea por canal
+        with contextlib.redirect_stdout(io.StringIO()):
+            filters = [GeophysicalStreamFilter(fs, notch_freq=notch_freq) for _ in range(n_channels)]
+
+        def process(chunk):
+            return [f.process_chunk(chunk[ch]) for ch, f in enumerate(filters)]
+        return process, "native" if filters[0].use_cpp else "scipy"
+
+    raise ValueError(f"Ruta desconocida: {path!r} (opciones: {', '.join(REPLAY_PATHS)})")
+
+
+def _wait_until(t):
+    remaining = t - time.perf_counter()
+    if remaining > _SPIN_S:
+        time.sleep(remaining - _SPIN_S)
+    while time.perf_counter() < t:
+        pass
+
+
+def _percentiles(values_ms):
+    return {"p50": float(np.percentile(values_ms, 50)), "p90": float(np.percentile(values_ms, 90)),
+            "p99": float(np.percentile(values_ms, 99)), "max": float(values_ms.max()),
+            "mean": float(values_ms.mean())}
+
+
+def replay_survey(filename, path="multichannel", chunk_samples=2400, speed=1.0, duration=None,
+                  start_sec=0.0, n_channels=None, fs=None, notch_freq=60.0, quality=30.0,
+                  warmup_chunks=3):
+    """
+    Reproduce 'duration' segundos del levantamiento por la ruta indicada.
+
+    chunk_samples: Muestras por canal de cada bloque
+    speed: 1 = tiempo real, N = N veces más rápido, 0 = sin ritmo de reloj
+    warmup_chunks: Bloques procesados antes de medir (carga de la DLL, cachés)
+    Retorna un dict con percentiles de latencia y de servicio, deadlines
+    perdidos e histograma de latencia (bins de HIST_EDGES_MS).
+    """
+    data, fs = open_survey(filename, n_channels, fs)
+    n_channels, total = data.shape
+    start = int(start_sec * fs)
+    available = total - start if duration is None else min(total - start, int(duration * fs))
+    n_chunks = available // chunk_samples
+    if n_chunks < 1:
+        raise ValueError(f"El tramo pedido no alcanza un bloque de {chunk_samples} muestras")
+
+    process, backend = _make_processor(path, fs, n_channels, chunk_samples, notch_freq, quality)
+    chunk_s = chunk_samples / fs
+    period = chunk_s / speed if speed > 0 else 0.0
+    budget = period if speed > 0 else chunk_s
+    buf = np.empty((n_channels, chunk_samples), dtype=np.float32)
+
+    np.copyto(buf, data[:, start:start + chunk_samples])
+    for _ in range(warmup_chunks):
+        process(buf)
+
+    latency = np.empty(n_chunks)
+    service = np.empty(n_chunks)
+    t0 = time.perf_counter()
+    for k in range(n_chunks):
+        s = start + k * chunk_samples
+        np.copyto(buf, data[:, s:s + chunk_samples])
+        arrival = t0 + (k + 1) * period
+        if speed > 0:
+            _wait_until(arrival)
+        t_start = time.perf_counter()
+        process(buf)
+        t_end = time.perf_counter()
+        service[k] = t_end - t_start
+        latency[k] = t_end - arrival if speed > 0 else service[k]
+    wall = time.perf_counter() - t0
+
+    latency_ms = latency * 1000
+    misses = int(np.count_nonzero(latency > budget))
+    counts, _ = np.histogram(np.clip(latency_ms, HIST_EDGES_MS[0], HIST_EDGES_MS[-1]), HIST_EDGES_MS)
+    return {
+        "path": path, "backend": backend, "n_channels": n_channels, "fs": fs,
+        "chunk_samples": chunk_samples, "chunk_ms": chunk_s * 1000, "speed": speed,
+        "chunks": n_chunks, "stream_seconds": n_chunks * chunk_s, "wall_seconds": wall,
+        "budget_ms": budget * 1000,
+        "latency_ms": _percentiles(latency_ms),
+        "service_ms": _percentiles(service * 1000),
+        "deadline_misses": misses,
+        "miss_rate": misses / n_chunks,
+        # Fracción libre del plazo en el percentil 99 del tiempo de servicio
+        "headroom": 1.0 - float(np.percentile(service, 99)) / budget,
+        "realtime_factor": chunk_s / float(service.mean()), # Velocidad máxima sostenible
+        "histogram": {"edges_ms": HIST_EDGES_MS.tolist(), "counts": counts.tolist()},
+    }
+
+
+def run_replay_sweep(filename, paths=REPLAY_PATHS, chunk_samples=(240, 1200, 2400, 12000),
+                     threads=None, speed=1.0, duration=10.0, verbose=True, **kwargs):
+    """
+    Barre rutas x tamaños de bloque x hilos OpenMP con replay_survey().
+    threads None = 1 y todos los núcleos. Retorna {"meta": ..., "results": [casos]}.
+    """
+    n_cpus = os.cpu_count() or 1
+    if threads is None:
+        threads = sorted({1, n_cpus})
+    results = []
+    for path in paths:
+        for n in chunk_samples:
+            for n_threads in threads:
+                with thread_scope(n_threads):
+                    case = replay_survey(filename, path=path, chunk_samples=n, speed=speed,
+                                         duration=duration, **kwargs)
+                case["threads"] = n_threads
+                results.append(case)
+                if verbose:
+                    print_replay_case(case)
+
+    meta = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "file": os.path.abspath(filename),
+        "machine": platform.node(),
+        "platform": platform.platform(),
+        "cpu_count": n_cpus,
+        "native": native_available(),
+        "commit": git_commit(),
+    }
+    return {"meta": meta, "results": results}
+
+
+def print_replay_case(case):
+    lat = case["latency_ms"]
+    print(f"    {case['path']:<12} {case['chunk_samples']:>6} muestras ({case['chunk_ms']:7.1f} ms) | "
+          f"{case.get('threads', '-'):>2} hilos | p50 {lat['p50']:8.3f} | p99 {lat['p99']:8.3f} | "
+          f"máx {lat['max']:8.3f} ms | perdidos {case['deadline_misses']:>4}/{case['chunks']:<5} | "
+          f"holgura {case['headroom'] * 100:5.1f}%")
+
+
+def print_replay_report(report):
+    """Tabla resumen del barrido (un renglón por caso)."""
+    results = report["results"]
+    if results:
+        first = results[0]
+        print(f"Levantamiento: {first['n_channels']} canales x {first['fs'] / 1000:g} kHz | "
+              f"velocidad {first['speed']:g}x | {first['stream_seconds']:.1f} s por caso")
+    print(f"{'RUTA':<12} | {'BLOQUE':>6} | {'HILOS':>5} | {'PLAZO (ms)':>10} | {'P50':>8} | "
+          f"{'P99':>8} | {'MÁX':>8} | {'PERDIDOS':>8} | {'HOLGURA':>7}")
+    print("-" * 98)
+    for case in results:
+        lat = case["latency_ms"]
+        print(f"{case['path']:<12} | {case['chunk_samples']:>6} | {case['threads']:>5} | "
+              f"{case['budget_ms']:>10.2f} | {lat['p50']:>8.3f} | {lat['p99']:>8.3f} | "
+              f"{lat['max']:>8.3f} | {case['deadline_misses']:>8} | {case['headroom'] * 100:>6.1f}%")
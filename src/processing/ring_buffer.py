@@ -0,0 +1,53 @@
+# src\processing\ring_buffer.py
+import numpy as np
+
+
+class RingBuffer:
+    """
+    Buffer circular de tamaño fijo por canal (memoria constante sin importar
+    cuánto tiempo lleve la adquisición).
+
+    n_channels: Número de canales
+    capacity: Muestras que se conservan por canal
+    """
+
+    def __init__(self, n_channels, capacity, dtype=np.float32):
+        self.n_channels = n_channels
+        self.capacity = capacity
+        self.data = np.zeros((n_channels, capacity), dtype=dtype)
+        self.head = 0           # Próxima posición de escritura
+        self.total_written = 0  # Muestras recibidas desde el inicio
+
+    def __len__(self):
+        return min(self.total_written, self.capacity)
+
+    def write(self, chunk):
+        """Agrega un bloque (n_samples,) o (n_channels, n_samples)."""
+        chunk = np.asarray(chunk, dtype=self.data.dtype)
+        if chunk.ndim == 1:
+            chunk = chunk[np.newaxis, :]
+        n = chunk.shape[1]
+        if n >= self.capacity:
+            # El bloque llena el buffer completo: solo sobreviven las últimas muestras
+            self.data[:] = chunk[:, n - self.capacity:]
+            self.head = 0
+        else:
+            first = min(n, self.capacity - self.head)
+            self.data[:, self.head:self.head + first] = chunk[:, :first]
+            self.data[:, :n - first] = chunk[:, first:]
+            self.head = (self.head + n) % self.capacity
+        self.total_written += n
+
+    def latest(self, n=None, out=None):
+        """
+        Las últimas n muestras en orden temporal, forma (n_channels, n).
+        out: Buffer de salida reutilizable para evitar asignaciones por frame.
+        """
+        n = len(self) if n is None else min(n, len(self))
+        if out is None:
+            out = np.empty((self.n_channels, n), dtype=self.data.dtype)
+        start = (self.head - n) % self.capacity
+        first = min(n, self.capacity - start)
+        out[:, :first] = self.data[:, start:start + first]
+        out[:, first:n] = self.data[:, :n - first]
+        return out[:, :n]
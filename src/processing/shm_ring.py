@@ -0,0 +1,135 @@
+# src\processing\shm_ring.py
+"""
+Buffer circular en memoria compartida entre procesos (adquisición ↔ procesamiento).
+
+El proceso de adquisición escribe bloques (n_channels, block_size) en ranuras de
+un segmento multiprocessing.shared_memory y nunca espera a los lectores: su
+ritmo queda aislado de cualquier pausa del lado de procesamiento (gráficos, GC).
+Los lectores obtienen vistas NumPy directamente sobre la memoria compartida
+(sin copias ni pickling) y las pasan tal cual al motor C++.
+
+Protocolo de secuencias (tipo seqlock):
+    1. El escritor invalida la ranura seq % n_slots (slot_seq = -1) y escribe el bloque.
+    2. Publica slot_seq[ranura] = seq y luego write_seq = seq + 1.
+    3. El lector procesa la vista y vuelve a comprobar slot_seq[ranura]: si el
+       escritor ya dio la vuelta y la sobrescribió, el bloque se cuenta como perdido.
+"""
+
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+_HEADER_FIELDS = 2 # [write_seq, closed]
+
+
+class SharedRingBuffer:
+    """
+    n_channels: Canales por bloque
+    block_size: Muestras por canal en cada bloque
+    n_slots: Bloques que caben en el anillo (margen de atraso de los lectores)
+    name: Nombre del segmento compartido (None = crear uno nuevo)
+    """
+
+    def __init__(self, n_channels, block_size, n_slots=32, name=None):
+        self.n_channels = n_channels
+        self.block_size = block_size
+        self.n_slots = n_slots
+        self._owner = name is None
+
+        header_bytes = (_HEADER_FIELDS + n_slots) * 8
+        data_bytes = n_slots * n_channels * block_size * 4
+        if self._owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=header_bytes + data_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+        buf = self.shm.buf
+        self._header = np.ndarray((_HEADER_FIELDS,), dtype=np.int64, buffer=buf)
+        self.slot_seq = np.ndarray((n_slots,), dtype=np.int64, buffer=buf, offset=_HEADER_FIELDS * 8)
+        self.data = np.ndarray((n_slots, n_channels, block_size), dtype=np.float32,
+                               buffer=buf, offset=header_bytes)
+        if self._owner:
+            self._header[:] = 0
+            self.slot_seq[:] = -1
+
+    @classmethod
+    def attach(cls, spec):
+        """Se conecta a un anillo existente a partir de su spec() (desde otro proceso)."""
+        return cls(spec["n_channels"], spec["block_size"], spec["n_slots"], name=spec["name"])
+
+    def spec(self):
+        """Descripción mínima (y serializable) para conectarse desde otro proceso."""
+        return {"name": self.shm.name, "n_channels": self.n_channels,
+                "block_size": self.block_size, "n_slots": self.n_slots}
+
+    @property
+    def write_seq(self):
+        return int(self._header[0])
+
+    @property
+    def closed(self):
+        return bool(self._header[1])
+
+    # --- Escritor -------------------------------------------------------
+    def begin_write(self, seq):
+        """
+        Ranura donde el escritor deja el bloque 'seq' (para generarlo in situ).
+        La ranura se invalida antes de escribir: un lector que aún la esté usando
+        detectará la sobrescritura en still_valid().
+        """
+        slot = seq % self.n_slots
+        self.slot_seq[slot] = -1
+        return self.data[slot]
+
+    def publish(self, seq):
+        """Marca el bloque 'seq' como completo y visible para los lectores."""
+        self.slot_seq[seq % self.n_slots] = seq
+        self._header[0] = seq + 1
+
+    def write(self, block):
+        """Copia un bloque (n_channels, block_size) en la siguiente ranura y lo publica."""
+        seq = self.write_seq
+        self.begin_write(seq)[:] = block
+        self.publish(seq)
+        return seq
+
+    def close_stream(self):
+        """Avisa a los lectores que no habrá más bloques."""
+        self._header[1] = 1
+
+    # --- Lectores -------------------------------------------------------
+    def view(self, seq, channels=slice(None)):
+        """
+        Vista sin copia del bloque 'seq' (filas 'channels', contiguas en memoria).
+        Retorna None si el bloque ya fue sobrescrito.
+        """
+        slot = seq % self.n_slots
+        if self.slot_seq[slot] != seq:
+            return None
+        return self.data[slot, channels]
+
+    def still_valid(self, seq):
+        """True si el escritor no sobrescribió el bloque mientras se leía."""
+        return self.slot_seq[seq % self.n_slots] == seq
+
+    def wait_for(self, seq, timeout=None, poll=0.0005):
+        """
+        Espera a que el bloque 'seq' esté publicado. Retorna False si el stream
+        se cerró (o venció el timeout) antes de que llegara.
+        """
+        start_t = time.perf_counter()
+        while self.write_seq <= seq:
+            if self.closed and self.write_seq <= seq:
+                return False
+            if timeout is not None and time.perf_counter() - start_t > timeout:
+                return False
+            time.sleep(poll)
+        return True
+
+    def close(self):
+        # Las vistas deben soltarse antes de cerrar el segmento
+        self._header = self.slot_seq = self.data = None
+        self.shm.close()
+        if self._owner:
+            self.shm.unlink()
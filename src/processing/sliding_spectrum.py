@@ -0,0 +1,147 @@
+# src\processing\sliding_spectrum.py
+"""
+Espectrograma en streaming por DFT deslizante (SDFT) en frecuencias objetivo.
+
+El DFT enfocado (calculate_spectrum) recalcula cada frecuencia sobre toda la
+ventana: con una ventana de 1 s a 24 kHz son 24000 términos por bin y por
+frame, aunque entre dos frames la ventana solo avanzó un bloque. La SDFT
+mantiene por canal y frecuencia la suma de la ventana y, por cada muestra que
+entra, suma su término y resta el de la que sale: O(1) por bin y muestra, sin
+importar el largo de la ventana.
+
+    spec = SlidingSpectrum(fs=24000, n_channels=24, target_freqs=freqs, window_sec=1.0)
+    for bloque in stream:
+        times, mag, phase = spec.update(bloque) # (canales, frames, frecuencias)
+
+Cada 'hop' muestras sale un frame con la magnitud (misma escala que
+calculate_spectrum sobre la ventana) y la fase referida al inicio de la ventana.
+Estabilidad: el rotador de fase se resincroniza con la fase exacta en cada
+bloque y las sumas se recalculan desde la historia cada 'recompute_windows'
+ventanas (costo amortizado 1/recompute_windows de un DFT directo).
+
+Motor C++ (sliding_dft_update, en paralelo por canal) o NumPy (sumas
+acumuladas por bloque) con el mismo estado, como GeophysicalStreamFilter.
+"""
+
+import logging
+
+import numpy as np
+
+from .cpp_bridge import c_sliding_dft_update, native_available
+
+
+class SlidingSpectrum:
+    """
+    fs: Frecuencia de muestreo
+    target_freqs: Frecuencias a seguir (Hz); no necesitan caer en bins de la ventana
+    window_sec: Largo de la ventana del DFT
+    hop: Muestras entre frames de salida (por defecto, una décima de la ventana)
+    recompute_windows: Cada cuántas ventanas se recalculan las sumas (0 = nunca)
+    """
+
+    def __init__(self, fs, n_channels, target_freqs, window_sec=1.0, hop=None,
+                 recompute_windows=16, use_cpp=True):
+        self.fs = fs
+        self.n_channels = n_channels
+        self.target_freqs = np.ascontiguousarray(target_freqs, dtype=np.float64)
+        self.window = int(round(window_sec * fs))
+        self.hop = hop or max(1, self.window // 10)
+        self.recompute_every = recompute_windows * self.window
+        self.omega = 2.0 * np.pi * self.target_freqs / fs
+        self.use_cpp = use_cpp and native_available()
+        if use_cpp and not self.use_cpp:
+            logging.warning("Motor C++ no disponible. SlidingSpectrum usa NumPy.")
+
+        n_freqs = len(self.target_freqs)
+        self.history = np.zeros((n_channels, self.window), dtype=np.float32) # Buffer circular
+        self.acc = np.zeros((n_channels, n_freqs, 2), dtype=np.float64)
+        self.state = np.zeros(2, dtype=np.int64) # [muestras procesadas, desde el recálculo]
+        self.last_mag = np.zeros((n_channels, n_freqs), dtype=np.float32)
+        self.last_phase = np.zeros((n_channels, n_freqs), dtype=np.float32)
+
+    @property
+    def samples(self):
+        return int(self.state[0])
+
+    def update(self, chunk):
+        """
+        Consume un bloque (n_samples,) o (n_channels, n_samples).
+        Retorna (times, mag, phase): tiempo del fin de la ventana de cada frame (s)
+        y magnitud / fase de forma (n_channels, frames, n_freqs).
+        """
+        chunk = np.asarray(chunk, dtype=np.float32)
+        if chunk.ndim == 1:
+            chunk = chunk[np.newaxis, :]
+        n0 = self.samples
+        if self.use_cpp:
+            mag, phase = c_sliding_dft_update(chunk, self.omega, self.history, self.acc, self.state,
+                                              self.hop, self.recompute_every, copy=True)
+        else:
+            mag, phase = self._update_numpy(chunk)
+        ends = np.arange((n0 // self.hop + 1) * self.hop, self.samples + 1, self.hop)
+        if mag.shape[1]:
+            self.last_mag = mag[:, -1]
+            self.last_phase = phase[:, -1]
+        return ends / self.fs, mag, phase
+
+    def _window_sums(self, end):
+        """Sumas exactas de la ventana que termina en la muestra 'end' (desde la historia)."""
+        m = np.arange(max(0, end - self.window + 1), end + 1)
+        x = self.history[:, m % self.window].astype(np.float64)
+        phase = np.outer(m, self.omega) % (2 * np.pi)
+        return x @ np.exp(-1j * phase)
+
+    def _update_numpy(self, chunk):
+        # Las muestras que salen de la ventana: historia en orden temporal + bloque nuevo
+        n0, n, N = self.samples, chunk.shape[1], self.window
+        ordered = np.roll(self.history, -(n0 % N), axis=1)
+        leaving = np.concatenate((ordered, chunk), axis=1)[:, :n].astype(np.float64)
+
+        m = n0 + np.arange(n)
+        c = np.exp(1j * ((self.omega * N) % (2 * np.pi)))
+        rot = np.exp(-1j * (np.outer(m, self.omega) % (2 * np.pi)))          # (n, freqs)
+        terms = (chunk[:, :, None] - leaving[:, :, None] * c) * rot            # (ch, n, freqs)
+        acc = self.acc[..., 0] + 1j * self.acc[..., 1]
+        sums = acc[:, None, :] + np.cumsum(terms, axis=1)
+
+        # Historia circular y contadores
+        keep = min(n, N)
+        self.history[:, m[-keep:] % N] = chunk[:, -keep:]
+        self.state[0] = n0 + n
+        acc = sums[:, -1]
+        if self.recompute_every:
+            self.state[1] += n
+            if self.state[1] >= self.recompute_every:
+                acc = self._window_sums(n0 + n - 1)
+                self.state[1] %= self.recompute_every
+        self.acc[..., 0], self.acc[..., 1] = acc.real, acc.imag
+
+        # Frames: X = A e^{j omega (m - N + 1)} en cada múltiplo de hop
+        idx = np.nonzero((m + 1) % self.hop == 0)[0]
+        start = np.outer(m[idx] - N + 1, self.omega) % (2 * np.pi)
+        frames = sums[:, idx, :] * np.exp(1j * start)
+        mag = (np.abs(frames) / N).astype(np.float32)
+        phase = np.angle(frames).astype(np.float32)
+        return mag, phase
+
+    def latest(self):
+        """Magnitud y fase del último frame emitido, (n_channels, n_freqs) cada una."""
+        return self.last_mag, self.last_phase
+
+
+def peak_frequency(mag, freqs):
+    """
+    Frecuencia del máximo de cada espectro (último eje) con interpolación
+    parabólica entre bins vecinos. Con una grilla fina alrededor de 50/60 Hz
+    sigue la deriva de la red frame a frame.
+    """
+    freqs = np.asarray(freqs, dtype=np.float64)
+    mag = np.asarray(mag, dtype=np.float64)
+    k = np.clip(np.argmax(mag, axis=-1), 1, len(freqs) - 2)
+    y0 = np.take_along_axis(mag, (k - 1)[..., None], -1)[..., 0]
+    y1 = np.take_along_axis(mag, k[..., None], -1)[..., 0]
+    y2 = np.take_along_axis(mag, (k + 1)[..., None], -1)[..., 0]
+    denom = y0 - 2 * y1 + y2
+    delta = np.where(denom != 0, 0.5 * (y0 - y2) / np.where(denom != 0, denom, 1), 0.0)
+    step = freqs[k + 1] - freqs[k] # Grilla uniforme
+    return freqs[k] + delta * step
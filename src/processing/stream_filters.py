@@ -3,18 +3,15 @@ import numpy as np
 from scipy import signal
 
 
-# Intentamos importar el bridge de C++
-try:
-    from .cpp_bridge import c_apply_sos_filter
-    CPP_AVAILABLE = True
-except Exception as e:
-    logging.warning(f"Motor C++ no disponible: {e}. Usando motor SciPy (Lento).")
-    CPP_AVAILABLE = False
+# El bridge de C++ carga la DLL recién al consultar su disponibilidad
+from .cpp_bridge import c_apply_sos_filter, native_available
 
 class GeophysicalStreamFilter:
     def __init__(self, fs, notch_freq=60.0, lowpass_cutoff=10.0, use_cpp=True):
         self.fs = fs
-        self.use_cpp = use_cpp and CPP_AVAILABLE # Solo usa C++ si el usuario quiere Y está disponible
+        self.use_cpp = use_cpp and native_available() # Solo usa C++ si el usuario quiere Y está disponible
+        if use_cpp and not self.use_cpp:
+            logging.warning("Motor C++ no disponible. Usando motor SciPy (Lento).")
         
         # 1. Diseño de coeficientes (Se hace igual para ambos motores)
         b_notch, a_notch = signal.iirnotch(notch_freq, 30.0, fs)
@@ -37,7 +34,8 @@ class GeophysicalStreamFilter:
             filtered, self.notch_zi_flat = c_apply_sos_filter(
                 chunk_data, 
                 self.notch_sos_flat, 
-                self.notch_zi_flat
+                self.notch_zi_flat,
+                copy=True # El bloque puede llegar en float64 desde el sensor
             )
             return filtered
         else:
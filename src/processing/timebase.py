@@ -0,0 +1,272 @@
+# src\processing\timebase.py
+"""
+Base de tiempo común para registradores independientes (referencia remota y arreglos).
+
+Los cargadores suponen que la muestra 0 de cada archivo es el instante 0 y que
+todos muestrean exactamente a FS. Con varios registradores eso no se cumple:
+cada uno arranca en su propio tiempo GPS y su reloj deriva unas ppm. El modelo
+de reloj de cada registrador es lineal:
+
+    t(n) = start + n / (fs * (1 + drift_ppm * 1e-6))
+
+(drift_ppm > 0: el reloj adelanta y toma más muestras por segundo real). Con
+ese modelo, la muestra k de la grilla común cae en una posición fraccional de
+cada registrador, pos = pos0 + step * k, y todos los canales se interpolan en
+una pasada con un filtro sinc con ventana de Kaiser (tabla polifásica, kernel
+C++ fractional_delay_resample o NumPy).
+
+    tb = Timebase(fs=24000)
+    tb.add_logger("base", "2024-03-01T12:00:00", 24000, n_base, filename="base.raw", n_channels=4)
+    tb.add_logger("remota", "2024-03-01T12:00:00.000413", 24000, n_rem, drift_ppm=2.5,
+                  filename="remota.raw", n_channels=2)
+    align_recordings(tb, "alineado.raw")   # (6 canales, muestras comunes) + .raw.json
+
+Los tiempos se guardan como datetime64[ns] (un float de segundos GPS no
+alcanza para resolver fracciones de muestra). Todos los registradores deben
+usar la misma escala (GPS o UTC): aquí no se corrigen segundos intercalares.
+"""
+
+import json
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from .backends import resample_fractional
+
+GPS_EPOCH = np.datetime64("1980-01-06T00:00:00", "ns")
+
+
+def parse_time(value):
+    """
+    Instante absoluto como datetime64[ns]. Acepta datetime64, datetime, texto
+    ISO 8601 o un número de segundos GPS (desde GPS_EPOCH, como los registra el receptor).
+    """
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        whole = np.floor(value)
+        return GPS_EPOCH + np.timedelta64(int(whole), "s") + \
+            np.timedelta64(int(round((value - whole) * 1e9)), "ns")
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.replace(tzinfo=None) - value.utcoffset()
+    return np.datetime64(value, "ns")
+
+
+def _seconds(delta):
+    """timedelta64 → segundos float (sin pasar por el instante absoluto)."""
+    return delta / np.timedelta64(1, "ns") * 1e-9
+
+
+def fit_clock(sample_index, times, fs):
+    """
+    Ajusta el modelo de reloj a pares (muestra, tiempo GPS) medidos, p. ej. los
+    pulsos PPS marcados en el registro. Mínimos cuadrados de t = a + b * n.
+    Retorna (start datetime64[ns], drift_ppm).
+    """
+    n = np.asarray(sample_index, dtype=np.float64)
+    stamps = np.array([parse_time(t) for t in times])
+    ref = stamps[0]
+    t = np.array([_seconds(s - ref) for s in stamps])
+    b, a = np.polyfit(n - n[0], t, 1)
+    a -= b * n[0]
+    drift_ppm = (1.0 / (b * fs) - 1.0) * 1e6
+    return ref + np.timedelta64(int(round(a * 1e9)), "ns"), drift_ppm
+
+
+def sinc_table(half_taps=16, n_phases=512, cutoff=0.95, beta=8.0):
+    """
+    Filtro de retardo fraccional: sinc de corte 'cutoff' (fracción de Nyquist)
+    con ventana de Kaiser, evaluado en n_phases + 1 fracciones de muestra.
+    La fila p corresponde a la fracción p / n_phases y el tap t a la muestra
+    floor(pos) - half_taps + 1 + t. Cada fila se normaliza a ganancia 1 en DC.
+    Retorna float32 (n_phases + 1, 2 * half_taps).
+    """
+    frac = np.arange(n_phases + 1)[:, None] / n_phases
+    x = np.arange(-half_taps + 1, half_taps + 1)[None, :] - frac
+    window = np.i0(beta * np.sqrt(np.clip(1.0 - (x / half_taps) ** 2, 0.0, None))) / np.i0(beta)
+    table = cutoff * np.sinc(cutoff * x) * window
+    table /= table.sum(axis=1, keepdims=True)
+    return table.astype(np.float32)
+
+
+class Timebase:
+    """
+    Grilla común de muestreo y mapeo de cada registrador sobre ella.
+
+    fs: Frecuencia de la grilla común
+    start: Instante de la muestra 0 común (None = el arranque más tardío, donde
+           todos los registradores ya tienen datos)
+    """
+
+    def __init__(self, fs, start=None):
+        self.fs = fs
+        self._start = None if start is None else parse_time(start)
+        self.loggers = {}
+
+    def add_logger(self, name, start, fs, n_samples, drift_ppm=0.0, filename=None, n_channels=1,
+                   channel_names=None):
+        """
+        Registra un registrador: tiempo GPS de su muestra 0, frecuencia nominal,
+        muestras por canal y deriva de reloj. filename / n_channels: su .raw
+        canal-tras-canal (para align_recordings).
+        """
+        if name in self.loggers:
+            raise ValueError(f"Registrador repetido: {name!r}")
+        self.loggers[name] = {
+            "start": parse_time(start), "fs": fs, "n_samples": int(n_samples),
+            "drift_ppm": float(drift_ppm), "filename": filename, "n_channels": n_channels,
+            "channel_names": channel_names or [f"{name}_{ch + 1}" for ch in range(n_channels)],
+        }
+        return self.loggers[name]
+
+    def add_recording(self, name, filename, start=None, drift_ppm=None, n_channels=None, fs=None):
+        """
+        add_logger() desde un .raw: n_channels, fs, start_time y drift_ppm se leen
+        del .raw.json (si existe) y los argumentos explícitos tienen prioridad.
+        """
+        spec = {}
+        sidecar = filename + ".json"
+        if os.path.exists(sidecar):
+            with open(sidecar, "r", encoding="utf-8") as f:
+                spec = json.load(f)
+        n_channels = n_channels or spec.get("n_channels")
+        fs = fs or spec.get("fs")
+        start = start if start is not None else spec.get("start_time")
+        drift_ppm = drift_ppm if drift_ppm is not None else spec.get("drift_ppm", 0.0)
+        if n_channels is None or fs is None or start is None:
+            raise ValueError(f"{filename}: indique n_channels, fs y start (o un {sidecar} con ellos)")
+        n_samples = os.path.getsize(filename) // (4 * n_channels)
+        return self.add_logger(name, start, fs, n_samples, drift_ppm, filename=filename,
+                               n_channels=n_channels, channel_names=spec.get("channel_names"))
+
+    def rate(self, name):
+        """Muestras por segundo real del registrador (nominal corregida por la deriva)."""
+        logger = self.loggers[name]
+        return logger["fs"] * (1.0 + logger["drift_ppm"] * 1e-6)
+
+    @property
+    def start(self):
+        if self._start is not None:
+            return self._start
+        if not self.loggers:
+            raise ValueError("Timebase sin registradores")
+        return max(logger["start"] for logger in self.loggers.values())
+
+    @property
+    def n_samples(self):
+        """Muestras comunes hasta el primer registrador que termina."""
+        ends = [_seconds(logger["start"] - self.start) + logger["n_samples"] / self.rate(name)
+                for name, logger in self.loggers.items()]
+        return max(int(np.floor(min(ends) * self.fs)), 0)
+
+    def mapping(self, name, k0=0):
+        """(pos0, step): la muestra común k0 + j cae en pos0 + step * j del registrador."""
+        logger = self.loggers[name]
+        rate = self.rate(name)
+        offset = _seconds(self.start - logger["start"]) # Segundos desde la muestra 0 del registrador
+        return offset * rate + k0 * (rate / self.fs), rate / self.fs
+
+    def position(self, name, k):
+        """Posición fraccional (muestras del registrador) de la muestra común k."""
+        pos0, step = self.mapping(name)
+        return pos0 + step * np.asarray(k, dtype=np.float64)
+
+    def channel_names(self):
+        return [c for logger in self.loggers.values() for c in logger["channel_names"]]
+
+    def to_dict(self):
+        """Especificación JSON (la base de tiempo del archivo alineado)."""
+        return {
+            "fs": self.fs, "start_time": str(self.start), "n_samples": self.n_samples,
+            "n_channels": sum(logger["n_channels"] for logger in self.loggers.values()),
+            "channel_names": self.channel_names(),
+            "loggers": {name: {"start_time": str(logger["start"]), "fs": logger["fs"],
+                               "drift_ppm": logger["drift_ppm"], "n_channels": logger["n_channels"],
+                               "filename": logger["filename"]}
+                        for name, logger in self.loggers.items()},
+        }
+
+
+def align_recordings(timebase, out_filename, block_sec=10.0, half_taps=16, n_phases=512, cutoff=0.95,
+                     backend=None, verbose=True):
+    """
+    Alinea todos los registradores de 'timebase' a su grilla común por bloques
+    (memoria acotada, sirve para registros de horas) y escribe un .raw
+    canal-tras-canal (canales en el orden de registro) más su .raw.json.
+    Por bloque, cada registrador aporta solo el tramo de entrada que necesitan
+    sus taps y los canales se remuestrean en una llamada al kernel por tabla.
+    Un registrador que se decima (step > 1) usa un corte cutoff / step: si no,
+    lo que supera la nueva Nyquist se pliega dentro de la banda.
+    Retorna {"n_channels", "n_samples", "seconds", "mb_per_s"}.
+    """
+    n_common = timebase.n_samples
+    names = list(timebase.loggers)
+    n_total = sum(timebase.loggers[n]["n_channels"] for n in names)
+    if n_common < 1:
+        raise ValueError("Los registradores no tienen un tramo común")
+    inputs = {}
+    for name in names:
+        logger = timebase.loggers[name]
+        if logger["filename"] is None:
+            raise ValueError(f"{name}: sin archivo (use add_recording o filename=)")
+        inputs[name] = np.memmap(logger["filename"], dtype=np.float32, mode="r",
+                                 shape=(logger["n_channels"], logger["n_samples"]))
+
+    # Tabla por registrador (compartida entre los que no deciman) y tramos de
+    # registradores consecutivos con la misma tabla: una llamada al kernel cada uno
+    tables = {}
+    groups = []
+    row = 0
+    for name in names:
+        scale = min(1.0, 1.0 / timebase.mapping(name)[1])
+        if scale not in tables:
+            tables[scale] = sinc_table(half_taps, n_phases, cutoff * scale)
+        n_ch = timebase.loggers[name]["n_channels"]
+        if groups and groups[-1][0] == scale:
+            groups[-1][2] += n_ch
+        else:
+            groups.append([scale, row, row + n_ch])
+        row += n_ch
+
+    block = int(block_sec * timebase.fs)
+    max_step = max(timebase.mapping(name)[1] for name in names)
+    span = int(np.ceil(block * max_step)) + 2 * half_taps + 1 # Entrada máxima por bloque
+    buf = np.zeros((n_total, span), dtype=np.float32)
+    pos0 = np.empty(n_total)
+    step = np.empty(n_total)
+    output = np.memmap(out_filename, dtype=np.float32, mode="w+", shape=(n_total, n_common))
+    out = np.empty((n_total, block), dtype=np.float32)
+
+    start_t = time.perf_counter()
+    for k0 in range(0, n_common, block):
+        n = min(block, n_common - k0)
+        row = 0
+        for name in names:
+            data = inputs[name]
+            p0, s = timebase.mapping(name, k0)
+            lo = int(np.floor(p0)) - half_taps + 1
+            hi = min(lo + span, data.shape[1])
+            rows = slice(row, row + data.shape[0])
+            # Fuera del archivo (bordes del tramo común) se completa con ceros
+            buf[rows] = 0.0
+            if hi > max(lo, 0):
+                buf[rows, max(lo, 0) - lo:hi - lo] = data[:, max(lo, 0):hi]
+            pos0[rows], step[rows] = p0 - lo, s
+            row += data.shape[0]
+        out_block = out if n == block else np.empty((n_total, n), dtype=np.float32) # Último bloque
+        for scale, first, last in groups:
+            resample_fractional(buf[first:last], pos0[first:last], step[first:last], n, tables[scale],
+                                out=out_block[first:last], backend=backend)
+        output[:, k0:k0 + n] = out_block
+    output.flush()
+    elapsed = time.perf_counter() - start_t
+    del output
+
+    with open(out_filename + ".json", "w", encoding="utf-8") as f:
+        json.dump(timebase.to_dict(), f, indent=2)
+    stats = {"n_channels": n_total, "n_samples": n_common, "seconds": elapsed,
+             "mb_per_s": n_total * n_common * 4 / 1e6 / elapsed}
+    if verbose:
+        print(f"[OK] Alineados {n_total} canales de {len(names)} registradores: "
+              f"{n_common / timebase.fs:.1f}s comunes en {elapsed:.2f}s ({stats['mb_per_s']:.0f} MB/s)")
+    return stats
@@ -0,0 +1,186 @@
+# src\processing\tracing.py
+"""
+Trazas de ejecución en formato Chrome Trace Event (JSON), legibles en
+chrome://tracing o en https://ui.perfetto.dev.
+
+    from src.processing.tracing import start_trace, stop_trace, span
+
+    start_trace()
+    with span("mi_etapa", cat="stage", canales=24):
+        ...
+    stop_trace("build/trace.json")
+
+Se registran eventos completos ("ph": "X") por hilo: etapas del pipeline,
+llamadas al bridge C++ y despachos de src.processing.backends. Al guardar, la
+traza incluye además los contadores nativos por kernel (llamadas, tiempo,
+bytes, hilos) en "otherData". Sin una traza activa, span() y traced() no
+registran nada y solo cuestan una comparación.
+"""
+
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+_tracer = None # Traza activa del proceso (None = sin trazar)
+
+
+class Tracer:
+    """Acumula eventos en memoria; los tiempos se expresan en µs desde start_trace()."""
+
+    def __init__(self, process_name="gif"):
+        self.pid = os.getpid()
+        self.events = [{"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+                        "args": {"name": process_name}}]
+        self._threads = set()
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter_ns()
+
+    def _append(self, event):
+        tid = threading.get_native_id()
+        event["pid"], event["tid"] = self.pid, tid
+        with self._lock:
+            if tid not in self._threads:
+                self._threads.add(tid)
+                self.events.append({"name": "thread_name", "ph": "M", "pid": self.pid,
+                                    "tid": tid, "args": {"name": threading.current_thread().name}})
+            self.events.append(event)
+
+    def complete(self, name, cat, start_ns, end_ns, args=None):
+        """Evento con duración (un bloque en la línea de tiempo del hilo que llama)."""
+        event = {"name": name, "cat": cat, "ph": "X",
+                 "ts": (start_ns - self._t0) / 1000, "dur": (end_ns - start_ns) / 1000}
+        if args:
+            event["args"] = args
+        self._append(event)
+
+    def instant(self, name, cat="mark", args=None):
+        event = {"name": name, "cat": cat, "ph": "i", "s": "t",
+                 "ts": (time.perf_counter_ns() - self._t0) / 1000}
+        if args:
+            event["args"] = args
+        self._append(event)
+
+    def counter(self, name, values):
+        """Serie numérica (ej. profundidad de una cola) dibujada como gráfico."""
+        self._append({"name": name, "ph": "C",
+                      "ts": (time.perf_counter_ns() - self._t0) / 1000, "args": dict(values)})
+
+    def to_dict(self, other_data=None):
+        with self._lock:
+            events = list(self.events)
+        return {"traceEvents": events, "displayTimeUnit": "ms", "otherData": other_data or {}}
+
+    def save(self, path, other_data=None):
+        """Escritura atómica del JSON de la traza."""
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(other_data), f)
+        os.replace(tmp, path)
+
+
+def start_trace(process_name="gif", reset_counters=True):
+    """Activa una traza nueva para este proceso (y pone en cero los contadores nativos)."""
+    global _tracer
+    if reset_counters:
+        from .cpp_bridge import native_available, reset_kernel_counters
+        if native_available():
+            reset_kernel_counters()
+    _tracer = Tracer(process_name)
+    return _tracer
+
+
+def stop_trace(path=None):
+    """
+    Desactiva la traza y, con path, la guarda junto con los contadores nativos.
+    Retorna el Tracer (sus eventos siguen disponibles en memoria).
+    """
+    global _tracer
+    tracer, _tracer = _tracer, None
+    if tracer is not None and path is not None:
+        from .cpp_bridge import kernel_counters, native_available
+        counters = kernel_counters() if native_available() else {}
+        tracer.save(path, other_data={"kernel_counters": counters})
+    return tracer
+
+
+def active_tracer():
+    return _tracer
+
+
+@contextmanager
+def span(name, cat="stage", **args):
+    """Registra el bloque 'with' como un evento con duración (si hay traza activa)."""
+    tracer = _tracer
+    if tracer is None:
+        yield
+        return
+    start_ns = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        tracer.complete(name, cat, start_ns, time.perf_counter_ns(), args)
+
+
+def _shape_of(args):
+    for arg in args:
+        shape = getattr(arg, "shape", None)
+        if shape is not None:
+            return list(shape)
+    return None
+
+
+def traced(name=None, cat="bridge"):
+    """Decorador: cada llamada queda en la traza con la forma de su primer arreglo."""
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            tracer = _tracer
+            if tracer is None:
+                return func(*args, **kwargs)
+            start_ns = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                shape = _shape_of(args)
+                tracer.complete(label, cat, start_ns, time.perf_counter_ns(),
+                                {"shape": shape} if shape else None)
+        return wrapper
+    return decorator
+
+
+def maybe_traced(func, name, cat="call", **args):
+    """Retorna func tal cual sin traza activa; con traza, una versión que la registra."""
+    tracer = _tracer
+    if tracer is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*a, **kw):
+        start_ns = time.perf_counter_ns()
+        try:
+            return func(*a, **kw)
+        finally:
+            tracer.complete(name, cat, start_ns, time.perf_counter_ns(), args)
+    return wrapper
+
+
+def print_counter_report(counters):
+    """Tabla en consola de los contadores nativos (solo kernels con llamadas)."""
+    print(f"{'KERNEL':<30} | {'LLAMADAS':>8} | {'TOTAL (ms)':>10} | {'MEDIA (ms)':>10} | "
+          f"{'MÁX (ms)':>9} | {'GB/s':>6} | {'HILOS':>5}")
+    print("-" * 96)
+    for name, c in counters.items():
+        if not c["calls"]:
+            continue
+        gbps = c["bytes"] / c["total_ns"] if c["total_ns"] else 0.0 # bytes/ns == GB/s
+        print(f"{name:<30} | {c['calls']:>8} | {c['total_ns'] / 1e6:>10.3f} | "
+              f"{c['total_ns'] / c['calls'] / 1e6:>10.3f} | {c['max_ns'] / 1e6:>9.3f} | "
+              f"{gbps:>6.2f} | {c['threads']:>5}")
@@ -0,0 +1,93 @@
+# src\processing\workflow.py
+"""
+Etapas del flujo maestro: carga → filtrado → stacking → espectro → resistividad → interpolación.
+Cada etapa recibe los resultados de sus entradas y retorna un dict de arreglos.
+"""
+
+import numpy as np
+
+from .backends import load_raw_data, apply_filter, compute_stacking, calculate_spectrum
+from .geophysics import compute_apparent_resistivity
+from .interpolation import InterpolationPlan
+from .pipeline import Pipeline, Stage
+
+
+def load_stage(filename, n_channels, n_segments, samples_per_seg):
+    """Carga masiva y reshape a (Canales, Segmentos, Muestras)."""
+    total_samples = n_channels * n_segments * samples_per_seg
+    raw_flat = load_raw_data(filename, total_samples)
+    return {"data_cube": raw_flat.reshape((n_channels, n_segments, samples_per_seg))}
+
+
+def filter_stage(load, fs, notch_freq=60.0, quality=100.0):
+    """Notch en paralelo sobre todos los segmentos de todos los canales."""
+    data_cube = load["data_cube"]
+    n_ch, n_seg, n_samples = data_cube.shape
+    from scipy import signal # Diferido: solo se usa para diseñar el filtro
+    b, a = signal.iirnotch(notch_freq, quality, fs)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+
+    flat_segments = np.ascontiguousarray(data_cube.reshape((n_ch * n_seg, n_samples)))
+    zi = np.zeros((n_ch * n_seg, (len(sos)//6) * 2), dtype=np.float32)
+    filtered_flat, _ = apply_filter(flat_segments, sos, zi)
+    return {"filtered_cube": filtered_flat.reshape(data_cube.shape)}
+
+
+def stack_stage(filtered):
+    """Stacking estadístico por canal."""
+    cube = filtered["filtered_cube"]
+    stacked = np.zeros((cube.shape[0], cube.shape[2]), dtype=np.float32)
+    for ch in range(cube.shape[0]):
+        stacked[ch] = compute_stacking(np.ascontiguousarray(cube[ch]))
+    return {"stacked": stacked}
+
+
+def spectrum_stage(stacked, fs, target_freqs):
+    """Magnitudes en las frecuencias del sondeo para todos los canales."""
+    mags = calculate_spectrum(stacked["stacked"], float(fs), target_freqs)
+    return {"mags": mags, "freqs": np.asarray(target_freqs, dtype=np.float32)}
+
+
+def resistivity_stage(spectrum, h_ref_channel=1):
+    """Cagniard de cada canal contra una referencia magnética fija."""
+    mags, freqs = spectrum["mags"], spectrum["freqs"]
+    rho_matrix = np.zeros(mags.shape, dtype=np.float32)
+    for ch in range(mags.shape[0]):
+        rho_matrix[ch] = compute_apparent_resistivity(mags[ch], mags[h_ref_channel], freqs)
+    return {"rho_matrix": rho_matrix}
+
+
+def interpolate_stage(resistivity, spectrum, out_shape=(200, 100)):
+    """Malla suavizada: estaciones equiespaciadas y frecuencias log-espaciadas."""
+    rho_matrix, freqs = resistivity["rho_matrix"], spectrum["freqs"]
+    n_st = rho_matrix.shape[0]
+    stations_smooth = np.linspace(0, n_st - 1, out_shape[0])
+    freqs_smooth = np.logspace(np.log10(freqs[0]), np.log10(freqs[-1]), out_shape[1])
+
+    # El plan interpola en log10(f), coherente con el eje log-espaciado de salida
+    plan = InterpolationPlan(np.arange(n_st), freqs, stations_smooth, freqs_smooth, log_cols=True)
+    return {"rho_smooth": plan.apply(rho_matrix), "freqs_smooth": freqs_smooth}
+
+
+def build_master_pipeline(filename, fs=24000, n_channels=24, n_segments=15, segment_sec=0.5,
+                          target_freqs=None, notch_freq=60.0, quality=100.0,
+                          out_shape=(200, 100), cache_dir=".gif_cache", max_cache_mb=2048):
+    """Declara el flujo maestro completo como un Pipeline con caché."""
+    if target_freqs is None:
+        target_freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+    samples_per_seg = int(fs * segment_sec)
+
+    stages = [
+        Stage("load", load_stage, {"filename": filename, "n_channels": n_channels,
+                                   "n_segments": n_segments, "samples_per_seg": samples_per_seg},
+              files=[filename], cache=False),
+        Stage("filter", filter_stage, {"fs": fs, "notch_freq": notch_freq, "quality": quality},
+              inputs=["load"]),
+        Stage("stack", stack_stage, inputs=["filter"]),
+        Stage("spectrum", spectrum_stage, {"fs": fs, "target_freqs": np.asarray(target_freqs, dtype=np.float32)},
+              inputs=["stack"]),
+        Stage("resistivity", resistivity_stage, {"h_ref_channel": 1}, inputs=["spectrum"]),
+        Stage("interpolate", interpolate_stage, {"out_shape": tuple(out_shape)},
+              inputs=["resistivity", "spectrum"]),
+    ]
+    return Pipeline(stages, cache_dir=cache_dir, max_cache_mb=max_cache_mb)
@@ -0,0 +1,59 @@
+# src\visualization\decimation.py
+"""
+Decimación por envolvente min/max para graficar trazas largas.
+
+Una pantalla de 1200 píxeles no puede mostrar millones de vértices: basta con
+conservar el mínimo y el máximo de cada columna de píxeles para que el trazo
+se vea idéntico (picos y spikes incluidos) con ~2x el ancho en puntos.
+"""
+
+import numpy as np
+
+
+def minmax_envelope(data, n_points, t=None):
+    """
+    Reduce cada canal a ~n_points muestras conservando min y max por bloque.
+
+    data: (n_samples,) o (n_channels, n_samples)
+    n_points: Puntos de salida por canal (usualmente 2 x ancho en píxeles)
+    t: Eje de tiempo (n_samples,); si es None se usan índices de muestra
+    Retorna (t_env, env) con forma (n_channels, ~n_points). Los dos extremos de
+    cada bloque se emiten en su orden temporal para no cruzar el trazo.
+    """
+    data = np.atleast_2d(np.asarray(data))
+    n_ch, n_samples = data.shape
+    if t is None:
+        t = np.arange(n_samples)
+    t = np.asarray(t)
+
+    n_bins = max(1, n_points // 2)
+    if n_samples <= 2 * n_bins:
+        return np.broadcast_to(t, data.shape), data
+
+    # Bloques de igual tamaño como vista (sin copiar); el resto forma un bloque corto
+    bin_size = -(-n_samples // n_bins)
+    n_full = n_samples // bin_size
+    parts = [data[:, :n_full * bin_size].reshape(n_ch, n_full, bin_size)]
+    if n_full * bin_size < n_samples:
+        parts.append(data[:, n_full * bin_size:][:, np.newaxis, :])
+
+    idx = []
+    for k, blocks in enumerate(parts):
+        i_min = blocks.argmin(axis=2)
+        i_max = blocks.argmax(axis=2)
+        starts = (np.arange(blocks.shape[1]) + k * n_full) * bin_size
+        pair = np.stack((starts + np.minimum(i_min, i_max), starts + np.maximum(i_min, i_max)), axis=2)
+        idx.append(pair.reshape(n_ch, -1))
+    idx = np.concatenate(idx, axis=1)
+
+    env = np.take_along_axis(data, idx, axis=1)
+    t_env = t[idx]
+    return t_env, env
+
+
+def pixel_budget(fig, ax=None, factor=2):
+    """Puntos por traza para el ancho en píxeles del eje (o de la figura)."""
+    width_in = fig.get_figwidth()
+    if ax is not None:
+        width_in *= ax.get_position().width
+    return int(factor * width_in * fig.dpi)
@@ -0,0 +1,156 @@
+# src\visualization\live_monitor.py
+"""
+Monitor de QC en tiempo real para la cuadrilla de campo.
+
+Los bloques filtrados se guardan en un RingBuffer de tamaño fijo y la figura
+se redibuja con blitting: el fondo (ejes, grilla, etiquetas) se rasteriza una
+vez y en cada frame solo se pintan las líneas que cambiaron. El costo por frame
+es constante, sin importar cuántas horas lleve la adquisición. El espectro
+móvil lo mantiene una DFT deslizante que avanza con cada bloque filtrado: el
+frame solo lee el último resultado en lugar de recalcular la ventana completa.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+from src.processing.sliding_spectrum import SlidingSpectrum
+from src.processing.ring_buffer import RingBuffer
+from src.visualization.decimation import minmax_envelope, pixel_budget
+
+
+class LiveStreamMonitor:
+    """
+    fs: Frecuencia de muestreo
+    window_sec: Segundos visibles en la traza
+    spectrum_freqs: Frecuencias del DFT enfocado (espectro móvil)
+    spectrum_sec: Ventana usada para el espectro móvil
+    fps: Frecuencia máxima de refresco
+    """
+
+    def __init__(self, fs, n_channels=1, window_sec=5.0, spectrum_freqs=None,
+                 spectrum_sec=1.0, fps=10.0, title="QC en Tiempo Real"):
+        self.fs = fs
+        self.n_channels = n_channels
+        self.frame_interval = 1.0 / fps
+        self.spectrum_freqs = np.ascontiguousarray(
+            spectrum_freqs if spectrum_freqs is not None else np.logspace(0, np.log10(fs / 2.5), 40),
+            dtype=np.float32)
+
+        capacity = int(window_sec * fs)
+        self.raw = RingBuffer(n_channels, capacity)
+        self.filtered = RingBuffer(n_channels, capacity)
+        # Espectro móvil: un frame por intervalo de refresco
+        self.spectrum = SlidingSpectrum(fs, n_channels, self.spectrum_freqs, window_sec=spectrum_sec,
+                                        hop=max(1, int(fs * self.frame_interval)))
+
+        self.frames = 0
+        self.frame_time = 0.0
+        self._last_draw = 0.0
+
+        # 1. Figura: traza (arriba) y espectro móvil (abajo)
+        self.fig, (self.ax_t, self.ax_f) = plt.subplots(2, 1, figsize=(12, 7))
+        self.fig.suptitle(title, fontsize=14)
+        self.n_points = pixel_budget(self.fig, self.ax_t)
+
+        self.ax_t.set_xlim(-window_sec, 0)
+        self.ax_t.set_xlabel("Tiempo relativo (s)")
+        self.ax_t.set_ylabel("Amplitud")
+        self.ax_t.grid(True, alpha=0.2)
+        self.ax_f.set_xscale('log')
+        self.ax_f.set_yscale('log')
+        self.ax_f.set_xlim(self.spectrum_freqs[0], self.spectrum_freqs[-1])
+        self.ax_f.set_xlabel("Frecuencia (Hz)")
+        self.ax_f.set_ylabel("Magnitud")
+        self.ax_f.grid(True, which="both", alpha=0.2)
+
+        # 2. Artistas animados (no forman parte del fondo cacheado)
+        self.raw_lines = [self.ax_t.plot([], [], color='gray', alpha=0.3, animated=True)[0]
+                          for _ in range(n_channels)]
+        self.filt_lines = [self.ax_t.plot([], [], linewidth=1, animated=True)[0]
+                           for _ in range(n_channels)]
+        self.spec_lines = [self.ax_f.plot([], [], 'o-', markersize=3, animated=True)[0]
+                           for _ in range(n_channels)]
+        self.status = self.ax_t.text(0.01, 0.95, "", transform=self.ax_t.transAxes,
+                                     va='top', animated=True)
+        self._animated = self.raw_lines + self.filt_lines + self.spec_lines + [self.status]
+
+        self._background = None
+        self.fig.canvas.mpl_connect('draw_event', self._on_draw)
+        plt.tight_layout()
+
+    def _on_draw(self, event):
+        # Cada redibujado completo (resize, cambio de límites) renueva el fondo
+        self._background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+
+    def _rescale(self, raw, mags):
+        """Ajusta los límites solo si los datos salen de ellos (requiere fondo nuevo)."""
+        changed = False
+        peak = float(np.max(np.abs(raw))) if raw.size else 1.0
+        y0, y1 = self.ax_t.get_ylim()
+        if peak > y1 or peak < 0.25 * y1:
+            self.ax_t.set_ylim(-1.2 * peak - 1e-9, 1.2 * peak + 1e-9)
+            changed = True
+        m_lo, m_hi = float(mags.min()) + 1e-12, float(mags.max()) + 1e-12
+        f0, f1 = self.ax_f.get_ylim()
+        if m_hi > f1 or m_lo < f0 or m_hi < 0.01 * f1:
+            self.ax_f.set_ylim(m_lo / 3, m_hi * 3)
+            changed = True
+        if changed:
+            self.fig.canvas.draw()
+
+    def update(self, raw_chunk, filtered_chunk):
+        """
+        Consume un bloque (crudo y filtrado). Redibuja solo si se cumplió el
+        intervalo del frame; retorna True si hubo frame.
+        """
+        self.raw.write(raw_chunk)
+        self.filtered.write(filtered_chunk)
+        self.spectrum.update(filtered_chunk)
+
+        now = time.perf_counter()
+        if now - self._last_draw < self.frame_interval:
+            return False
+        self._last_draw = now
+        self.draw_frame()
+        self.frame_time += time.perf_counter() - now
+        self.frames += 1
+        return True
+
+    def draw_frame(self):
+        raw = self.raw.latest()
+        filtered = self.filtered.latest()
+        n = raw.shape[1]
+        if n == 0:
+            return
+        t = (np.arange(n) - n) / self.fs
+
+        # Espectro móvil: último frame de la DFT deslizante (ya calculado en update)
+        mags, _ = self.spectrum.latest()
+
+        if self._background is None:
+            self.fig.canvas.draw()
+        self._rescale(raw, mags)
+
+        t_raw, env_raw = minmax_envelope(raw, self.n_points, t)
+        t_filt, env_filt = minmax_envelope(filtered, self.n_points, t)
+        for ch in range(self.n_channels):
+            self.raw_lines[ch].set_data(t_raw[ch], env_raw[ch])
+            self.filt_lines[ch].set_data(t_filt[ch], env_filt[ch])
+            self.spec_lines[ch].set_data(self.spectrum_freqs, mags[ch])
+        elapsed = self.raw.total_written / self.fs
+        self.status.set_text(f"t = {elapsed:,.1f}s | frames: {self.frames}")
+
+        # Blitting: fondo cacheado + solo los artistas que cambiaron
+        canvas = self.fig.canvas
+        canvas.restore_region(self._background)
+        for artist in self._animated:
+            artist.axes.draw_artist(artist)
+        canvas.blit(self.fig.bbox)
+        canvas.flush_events()
+
+    def summary(self):
+        """Estadísticas del monitor: frames dibujados y tiempo medio por frame."""
+        mean = self.frame_time / self.frames if self.frames else 0.0
+        return {"frames": self.frames, "mean_frame_s": mean,
+                "samples": self.raw.total_written, "buffer_bytes": self.raw.data.nbytes * 2}
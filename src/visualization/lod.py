@@ -0,0 +1,91 @@
+# src\visualization\lod.py
+"""
+Pirámide multirresolución para volúmenes de resistividad grandes.
+
+Cada nivel reduce a la mitad los ejes que aún superan el tamaño mínimo.
+Los niveles se construyen bajo demanda y quedan en caché, así el slicing
+interactivo trabaja sobre la resolución que la ventana realmente puede mostrar.
+"""
+
+import numpy as np
+
+
+def _downsample_axis(coords, values, axis):
+    """
+    Promedia pares de muestras consecutivas sobre un eje. Con largo impar la
+    última muestra pasa sin promediar, así el nivel sigue cubriendo toda la extensión.
+    """
+    n = (len(coords) // 2) * 2
+    pairs = np.take(values, np.arange(n), axis=axis)
+    shape = pairs.shape[:axis] + (n // 2, 2) + pairs.shape[axis + 1:]
+    reduced_coords = coords[:n].reshape(-1, 2).mean(axis=1)
+    reduced = pairs.reshape(shape).mean(axis=axis + 1)
+    if n < len(coords):
+        reduced_coords = np.append(reduced_coords, coords[-1]).astype(coords.dtype)
+        reduced = np.concatenate([reduced, np.take(values, [n], axis=axis)], axis=axis)
+    return reduced_coords, reduced
+
+
+class VolumePyramid:
+    """
+    volume: (nz, ny, nx) con los ejes x, y, z correspondientes (orden de VTK).
+    min_size: Un eje deja de reducirse al llegar a este número de puntos.
+    El promedio se hace en log10 (media geométrica), coherente con la escala de color.
+    """
+
+    def __init__(self, x, y, z, volume, min_size=16):
+        self.min_size = min_size
+        self._levels = [(np.asarray(x, dtype=np.float32), np.asarray(y, dtype=np.float32),
+                         np.asarray(z, dtype=np.float32),
+                         np.log10(np.maximum(np.asarray(volume, dtype=np.float32), 1e-12)))]
+        self._linear = {0: np.asarray(volume, dtype=np.float32)}
+        self._finished = False
+
+    def _build_next(self):
+        x, y, z, log_vol = self._levels[-1]
+        reduced = False
+        # Orden de los ejes en el volumen: (z, y, x)
+        if len(x) >= 2 * self.min_size:
+            x, log_vol = _downsample_axis(x, log_vol, axis=2)
+            reduced = True
+        if len(y) >= 2 * self.min_size:
+            y, log_vol = _downsample_axis(y, log_vol, axis=1)
+            reduced = True
+        if len(z) >= 2 * self.min_size:
+            z, log_vol = _downsample_axis(z, log_vol, axis=0)
+            reduced = True
+        if reduced:
+            self._levels.append((x, y, z, np.ascontiguousarray(log_vol, dtype=np.float32)))
+        else:
+            self._finished = True
+        return reduced
+
+    @property
+    def n_levels(self):
+        while not self._finished:
+            self._build_next()
+        return len(self._levels)
+
+    def level(self, index):
+        """Retorna (x, y, z, volumen) del nivel pedido (0 = resolución completa)."""
+        while index >= len(self._levels) and not self._finished:
+            self._build_next()
+        index = min(index, len(self._levels) - 1)
+        x, y, z, log_vol = self._levels[index]
+        if index not in self._linear:
+            self._linear[index] = np.power(10.0, log_vol, dtype=np.float32)
+        return x, y, z, self._linear[index]
+
+    def select_level(self, viewport_px):
+        """
+        Nivel más fino cuyo eje más largo no supera los píxeles del viewport.
+        Más celdas que píxeles no aportan detalle visible, solo costo de render.
+        """
+        index = 0
+        while True:
+            x, y, z, _ = self._levels[index]
+            if max(len(x), len(y), len(z)) <= viewport_px:
+                return index
+            if index + 1 >= len(self._levels) and (self._finished or not self._build_next()):
+                return index
+            index += 1
@@ -1,7 +1,9 @@
 # src\visualization\plots.py
 
 import matplotlib.pyplot as plt
+from matplotlib.collections import LineCollection
 import numpy as np
+from src.visualization.decimation import minmax_envelope, pixel_budget
 
 def plot_geophysical_time_series(
         t, 
@@ -74,14 +76,18 @@ def plot_streaming_results(
 ):
     """Visualiza el resultado del streaming marcando las divisiones de los bloques."""
     fig, ax = plt.subplots(figsize=(12, 6))
+    n_points = pixel_budget(fig, ax)
     
-    ax.plot(full_raw, label="Señal Cruda (Entrada)", alpha=0.3, color='gray')
-    ax.plot(full_filtered, label="Señal Filtrada (Salida)", color='green', linewidth=1.5)
+    # Envolvente min/max: el trazo se ve igual con una fracción de los vértices
+    t_raw, env_raw = minmax_envelope(np.asarray(full_raw), n_points)
+    t_filt, env_filt = minmax_envelope(np.asarray(full_filtered), n_points)
+    ax.plot(t_raw[0], env_raw[0], label="Señal Cruda (Entrada)", alpha=0.3, color='gray')
+    ax.plot(t_filt[0], env_filt[0], label="Señal Filtrada (Salida)", color='green', linewidth=1.5)
     
     # Dibujar líneas punteadas donde ocurre cada cambio de bloque para verificar continuidad
     total_samples = len(full_raw)
-    for x in range(chunk_size, total_samples, chunk_size):
-        ax.axvline(x=x, color='black', linestyle='--', alpha=0.2)
+    ax.vlines(np.arange(chunk_size, total_samples, chunk_size), 0, 1,
+              transform=ax.get_xaxis_transform(), colors='black', linestyles='--', alpha=0.2)
     
     ax.set_title(title)
     ax.set_xlabel("Muestras (Samples)")
@@ -94,7 +100,8 @@ def plot_streaming_results(
 def plot_benchmark_results(
         avg_py, 
         avg_cpp, 
-        n_samples
+        n_samples,
+        show=True
 ):
     """
     Genera un gráfico de barras comparando el rendimiento de los motores.
@@ -122,46 +129,55 @@ def plot_benchmark_results(
                  fontsize=12, color='darkgreen', y=0.92)
 
     plt.tight_layout()
-    plt.show()
+    if show:
+        plt.show()
+    return plt.gcf()
 
 def plot_multichannel_wiggle(raw_matrix, filtered_matrix, fs, title="Control de Calidad Multicanal"):
     """
     Crea un gráfico de trazas (Wiggle Plot) para inspección visual de múltiples canales.
+    Todos los canales van en un solo eje como LineCollection desplazadas, y cada
+    traza se decima por envolvente min/max a ~2x el ancho en píxeles.
     """
-    n_ch = raw_matrix.shape[0]
-    n_samples = raw_matrix.shape[1]
+    raw_matrix = np.atleast_2d(raw_matrix)
+    filtered_matrix = np.atleast_2d(filtered_matrix)
+    n_ch, n_samples = raw_matrix.shape
     t = np.arange(n_samples) / fs
-    
-    # Creamos un layout vertical denso
-    fig, axes = plt.subplots(n_ch, 1, figsize=(12, 14), sharex=True, 
-                             gridspec_kw={'hspace': 0.05})
-    
-    fig.suptitle(title, fontsize=16, y=0.95)
 
-    for i in range(n_ch):
-        # Normalización local por canal para comparar formas de onda
-        # Añadimos un pequeño epsilon para evitar división por cero
-        scale = np.max(np.abs(raw_matrix[i])) + 1e-9
-        
-        # Graficamos la señal cruda (fondo) y la filtrada (frente)
-        axes[i].plot(t, raw_matrix[i] / scale, color='gray', alpha=0.3, label='Crudo' if i==0 else "")
-        axes[i].plot(t, filtered_matrix[i] / scale, color='blue', alpha=0.8, linewidth=1, label='Filtrado' if i==0 else "")
-        
-        # Estética de osciloscopio de campo
-        axes[i].set_ylabel(f"CH{i+1:02d}", rotation=0, labelpad=25, verticalalignment='center')
-        axes[i].set_yticks([])
-        axes[i].grid(True, axis='x', alpha=0.2)
-        
-        if i == 0: 
-            axes[i].legend(loc='upper right', frameon=False)
-
-    plt.xlabel("Tiempo (segundos)")
-    # Ajuste fino de márgenes
+    fig, ax = plt.subplots(figsize=(12, 14))
+    fig.suptitle(title, fontsize=16, y=0.95)
     plt.subplots_adjust(left=0.1, right=0.95, top=0.92, bottom=0.05)
+    n_points = pixel_budget(fig, ax)
+
+    # Normalización local por canal para comparar formas de onda
+    # Añadimos un pequeño epsilon para evitar división por cero
+    peak = np.maximum(raw_matrix.max(axis=1), -raw_matrix.min(axis=1))
+    scale = (peak[:, np.newaxis] + 1e-9) / 0.45 # Cada canal ocupa su carril
+    offsets = np.arange(n_ch)[::-1, np.newaxis] # CH01 arriba
+
+    def _segments(matrix):
+        # La escala es lineal y positiva: se aplica sobre la envolvente ya decimada
+        t_env, env = minmax_envelope(matrix, n_points, t)
+        return np.stack((t_env, env / scale + offsets), axis=2)
+
+    # Graficamos la señal cruda (fondo) y la filtrada (frente)
+    ax.add_collection(LineCollection(_segments(raw_matrix), colors='gray', alpha=0.3,
+                                     linewidths=1, label='Crudo'))
+    ax.add_collection(LineCollection(_segments(filtered_matrix), colors='blue', alpha=0.8,
+                                     linewidths=1, label='Filtrado'))
+
+    # Estética de osciloscopio de campo
+    ax.set_xlim(t[0], t[-1])
+    ax.set_ylim(-0.6, n_ch - 0.4)
+    ax.set_yticks(offsets.ravel())
+    ax.set_yticklabels([f"CH{i+1:02d}" for i in range(n_ch)])
+    ax.grid(True, axis='x', alpha=0.2)
+    ax.legend(loc='upper right', frameon=False)
+    ax.set_xlabel("Tiempo (segundos)")
     
     return fig
 
-def plot_spectral_comparison(freqs, mag_pre, mag_post):
+def plot_spectral_comparison(freqs, mag_pre, mag_post, show=True):
     plt.figure(figsize=(12, 6))
     
     # Graficamos el promedio de todos los canales para ver la tendencia
@@ -174,7 +190,9 @@ def plot_spectral_comparison(freqs, mag_pre, mag_post):
     plt.title("Eficacia del Filtro: Comparativa de Magnitud por Frecuencia (Promedio 24 CH)")
     plt.legend()
     plt.grid(axis='y', linestyle='--', alpha=0.7)
-    plt.show()
+    if show:
+        plt.show()
+    return plt.gcf()
 
 def plot_sounding_curve(freqs, resistivity, title="Sondeo Magnetotelúrico"):
     """
@@ -219,3 +237,33 @@ def plot_stacking_comparison(t, individual_segment, stacked_signal, n_segments):
     
     return plt.gcf()
 
+
+def plot_inversion_result(freqs, rho_obs, rho_pred, depths, model_rho, title="Inversión MT 1D"):
+    """
+    Panel doble: ajuste de la curva de sondeo y modelo de capas recuperado.
+    """
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
+
+    ax1.loglog(freqs, rho_obs, 'o', color='#e67e22', label='Observado')
+    ax1.loglog(freqs, rho_pred, '-', color='#2d3436', linewidth=2, label='Respuesta del modelo')
+    ax1.invert_xaxis()
+    ax1.grid(True, which="both", ls="-", alpha=0.3)
+    ax1.set_xlabel("Frecuencia (Hz)")
+    ax1.set_ylabel("Resistividad Aparente (Ohm-m)")
+    ax1.legend()
+
+    # Modelo escalonado: cada capa se dibuja desde su techo hasta su base
+    tops = np.maximum(depths, depths[1] / 2) # Evitamos log(0) en la superficie
+    bottoms = np.append(tops[1:], tops[-1] * 1.5)
+    ax2.plot(np.repeat(model_rho, 2), np.column_stack((tops, bottoms)).ravel(),
+             color='#0984e3', linewidth=2)
+    ax2.set_xscale('log')
+    ax2.set_yscale('log')
+    ax2.invert_yaxis()
+    ax2.grid(True, which="both", ls="-", alpha=0.3)
+    ax2.set_xlabel("Resistividad (Ohm-m)")
+    ax2.set_ylabel("Profundidad (m)")
+
+    fig.suptitle(title, fontsize=14)
+    plt.tight_layout()
+    return fig
@@ -1,8 +1,81 @@
 # src\visualization\render_3d.py
+import hashlib
+from collections import OrderedDict
 import pyvista as pv
 import numpy as np
+from src.processing.cpp_bridge import c_interpolate_volume
+from src.visualization.lod import VolumePyramid
 
-def render_resistivity_grid(freqs, rho_matrix):
+# Por encima de estos tamaños se desactivan los bordes y se usa la pirámide LOD
+EDGE_CELL_LIMIT = 20_000
+LOD_POINT_LIMIT = 2_000_000
+
+# Caché de mallas: la geometría se construye una vez por ejes y cada llamada recibe
+# una copia superficial (coordenadas compartidas) con sus propios escalares
+_GRID_CACHE = OrderedDict()
+_GRID_CACHE_SIZE = 8
+
+def _axes_key(kind, *axes):
+    digest = hashlib.sha1()
+    for a in axes:
+        digest.update(np.ascontiguousarray(a, dtype=np.float32).tobytes())
+        digest.update(b"|")
+    return (kind, digest.hexdigest())
+
+def _cached_grid(kind, builder, *axes):
+    """
+    Malla para estos ejes: la geometría cacheada (construida una vez) en una
+    copia superficial sin arreglos, así dos vistas nunca comparten escalares.
+    """
+    key = _axes_key(kind, *axes)
+    if key in _GRID_CACHE:
+        _GRID_CACHE.move_to_end(key)
+    else:
+        _GRID_CACHE[key] = builder()
+        if len(_GRID_CACHE) > _GRID_CACHE_SIZE:
+            _GRID_CACHE.popitem(last=False)
+    grid = _GRID_CACHE[key].copy(deep=False)
+    grid.clear_data() # Solo quita los arreglos de la copia; la plantilla queda intacta
+    return grid
+
+def _section_grid(x, z, indexing='ij'):
+    """StructuredGrid plana (Y = 0) para una pseudo-sección estaciones x frecuencias."""
+    def build():
+        x_grid, z_grid = np.meshgrid(x, z, indexing=indexing)
+        return pv.StructuredGrid(x_grid, np.zeros_like(x_grid), z_grid)
+    return _cached_grid(("section", indexing), build, x, z)
+
+def _rectilinear_grid(x, y, z):
+    return _cached_grid("rectilinear", lambda: pv.RectilinearGrid(x, y, z), x, y, z)
+
+def _new_plotter(screenshot=None, **kwargs):
+    """Plotter interactivo, o fuera de pantalla si se pide una captura a archivo."""
+    return pv.Plotter(off_screen=screenshot is not None or pv.OFF_SCREEN, **kwargs)
+
+def _finish(p, screenshot=None):
+    """Muestra la ventana o, en modo headless, guarda la captura y libera el contexto."""
+    if screenshot is None:
+        p.show()
+    else:
+        p.show(screenshot=screenshot, auto_close=True)
+
+def update_scalars(grid, name, values, cell=False):
+    """
+    Actualiza un arreglo escalar sin reconstruir la malla.
+    Si el arreglo ya existe con la misma forma se sobreescribe en su lugar.
+    """
+    data = grid.cell_data if cell else grid.point_data
+    values = np.asarray(values, dtype=np.float32).ravel()
+    if name in data and data[name].shape == values.shape and data[name].dtype == values.dtype:
+        data[name][:] = values
+        grid.Modified()
+    else:
+        data[name] = values
+    # La malla puede tener otros arreglos (p. ej. de una actualización anterior): activamos el actual
+    grid.set_active_scalars(name, preference="cell" if cell else "point")
+    return grid
+
+def render_resistivity_grid(freqs, rho_matrix, screenshot=None):
     """
     Crea una representación 3D de la resistividad.
     X: Posición del sensor (Canales)
@@ -10,41 +83,35 @@ def render_resistivity_grid(freqs, rho_matrix):
     Z: Valor de Resistividad
     """
     # Generar las coordenadas de la malla
-    x = np.arange(rho_matrix.shape[0]) # Canales
-    z = np.log10(freqs)                # Profundidad (frecuencia invertida)
-    
-    x_grid, z_grid = np.meshgrid(x, z)
-    y_grid = np.zeros_like(x_grid)     # En un plano 2D inicial dentro del espacio 3D
+    x = np.arange(rho_matrix.shape[0], dtype=np.float32) # Canales
+    z = np.log10(freqs).astype(np.float32)               # Profundidad (frecuencia invertida)
 
-    # Crear la superficie de PyVista
-    grid = pv.StructuredGrid(x_grid, y_grid, z_grid)
-    grid["Resistividad"] = rho_matrix.flatten(order="F")
+    # Superficie en el plano Y = 0 (reutilizada si los ejes no cambian)
+    grid = _section_grid(x, z, indexing='xy')
+    update_scalars(grid, "Resistividad", rho_matrix.flatten(order="F"))
 
     # Visualización profesional
-    plotter = pv.Plotter()
+    plotter = _new_plotter(screenshot)
     plotter.add_mesh(grid, scalars="Resistividad", cmap="turbo", log_scale=True)
     plotter.add_scalar_bar(title="Resistividad (Ohm-m)")
     plotter.show_grid()
-    plotter.show()
+    _finish(plotter, screenshot)
 
-def render_resistivity_section(freqs, rho_matrix):
+def render_resistivity_section(freqs, rho_matrix, screenshot=None):
     """
     Renderiza una pseudo-sección 3D de resistividad sin errores de VTK.
+    screenshot: Ruta de imagen para renderizar fuera de pantalla (sin ventana).
     """
     # 1. Preparar coordenadas en float32
     x = np.arange(rho_matrix.shape[0], dtype=np.float32) 
     z = np.log10(freqs).astype(np.float32) 
     
-    # meshgrid con indexing='ij' para alinear Canales (X) con Frecuencias (Z)
-    x_grid, z_grid = np.meshgrid(x, z, indexing='ij')
-    y_grid = np.zeros_like(x_grid) 
-
-    # 2. Crear la malla estructurada
-    grid = pv.StructuredGrid(x_grid, y_grid, z_grid)
-    grid["Resistividad (Ohm-m)"] = rho_matrix.ravel()
+    # 2. Malla estructurada con indexing='ij' para alinear Canales (X) con Frecuencias (Z)
+    grid = _section_grid(x, z)
+    update_scalars(grid, "Resistividad (Ohm-m)", rho_matrix)
 
     # 3. Configuración del Plotter
-    p = pv.Plotter(title="GIF - Geophysical 3D Rendering")
+    p = _new_plotter(screenshot, title="GIF - Geophysical 3D Rendering")
     p.set_background("#111111") # Gris muy oscuro para mejor contraste
 
     # Añadir malla (Usando lighting en lugar de shading)
@@ -53,7 +120,7 @@ def render_resistivity_section(freqs, rho_matrix):
         scalars="Resistividad (Ohm-m)", 
         cmap="turbo", 
         log_scale=True, 
-        show_edges=True,
+        show_edges=grid.n_cells <= EDGE_CELL_LIMIT, # Bordes solo en mallas pequeñas
         edge_color="white",
         line_width=0.5,
         lighting=True
@@ -72,31 +139,28 @@ def render_resistivity_section(freqs, rho_matrix):
     
     # Orientar y mostrar
     p.view_xz()
-    p.show()
+    _finish(p, screenshot)
 
-def render_resistivity_isosurfaces(freqs, rho_matrix, target_value=1.0):
+def render_resistivity_isosurfaces(freqs, rho_matrix, target_value=1.0, screenshot=None):
     """
     Extrae superficies donde la resistividad es igual a 'target_value'.
     Ideal para detectar cuerpos mineralizados específicos.
     """
     x = np.arange(rho_matrix.shape[0], dtype=np.float32)
     z = np.log10(freqs).astype(np.float32)
-    x_grid, z_grid = np.meshgrid(x, z, indexing='ij')
-    y_grid = np.zeros_like(x_grid)
-
-    grid = pv.StructuredGrid(x_grid, y_grid, z_grid)
-    grid["Resistividad"] = rho_matrix.ravel()
+    grid = _section_grid(x, z)
+    update_scalars(grid, "Resistividad", rho_matrix)
 
     # Generar el contorno (isosuperficie)
     contours = grid.contour([target_value])
 
-    p = pv.Plotter()
+    p = _new_plotter(screenshot)
     p.add_mesh(grid, opacity=0.2, cmap="turbo", log_scale=True) # El fondo traslúcido
     p.add_mesh(contours, color="red", line_width=2, label=f"Cuerpo Conductor ({target_value} Ohm-m)")
     p.add_legend()
-    p.show()
+    _finish(p, screenshot)
 
-def render_block_model(freqs, rho_matrix):
+def render_block_model(freqs, rho_matrix, screenshot=None):
     """
     Convierte la sección en bloques 3D (Voxels).
     """
@@ -106,38 +170,91 @@ def render_block_model(freqs, rho_matrix):
     # Creamos un pequeño espesor en Y para que parezcan bloques
     y = np.array([-0.5, 0.5], dtype=np.float32) 
     
-    grid = pv.RectilinearGrid(x, y, z)
+    grid = _rectilinear_grid(x, y, z)
     # Asignamos los datos a las celdas (voxels)
-    grid.cell_data["Resistividad"] = rho_matrix.ravel()
+    update_scalars(grid, "Resistividad", rho_matrix, cell=True)
 
-    p = pv.Plotter()
+    p = _new_plotter(screenshot)
     # Usamos un filtro de umbral para solo ver bloques interesantes
     p.add_mesh_slice(grid, display_params={'show_edges': True}, cmap="turbo", log_scale=True)
-    p.show()
+    _finish(p, screenshot)
+
+def _interpolated_volume(station_xy, freqs, rho_matrix, grid_shape, k_neighbors, power):
+    station_xy = np.asarray(station_xy, dtype=np.float32)
+    x = np.linspace(station_xy[:, 0].min(), station_xy[:, 0].max(), grid_shape[0], dtype=np.float32)
+    y = np.linspace(station_xy[:, 1].min(), station_xy[:, 1].max(), grid_shape[1], dtype=np.float32)
+    z = np.log10(freqs).astype(np.float32)
 
-def render_dynamic_slicing(freqs, rho_matrix):
+    # (n_freqs, ny, nx): el ravel() ya sigue el orden de puntos de VTK (X más rápido)
+    volume = c_interpolate_volume(station_xy, rho_matrix, x, y, k_neighbors, power, copy=True)
+    return x, y, z, volume
+
+def build_resistivity_volume(station_xy, freqs, rho_matrix, grid_shape=(100, 100),
+                             k_neighbors=8, power=2.0):
+    """
+    Interpola un volumen real de resistividad desde estaciones dispersas (IDW en C++).
+    station_xy: (n_estaciones, 2) posiciones en planta
+    rho_matrix: (n_estaciones, n_freqs)
+    Retorna un pv.RectilinearGrid con X/Y en planta y Z = log10(frecuencia).
+    """
+    x, y, z, volume = _interpolated_volume(station_xy, freqs, rho_matrix, grid_shape, k_neighbors, power)
+    grid = _rectilinear_grid(x, y, z)
+    return update_scalars(grid, "Resistividad", volume)
+
+_PYRAMID_CACHE = OrderedDict() # clave → (volumen, pirámide)
+
+def volume_lod_grid(x, y, z, volume, viewport_px, name="Resistividad", cache_key=None):
+    """
+    Malla del nivel de detalle adecuado para un viewport de 'viewport_px' píxeles.
+    La pirámide se cachea por identidad del arreglo (o por 'cache_key' si el
+    llamador identifica el volumen) sin recorrer su contenido: si el volumen
+    cambia en el lugar, pase un cache_key nuevo. La geometría de cada nivel se reutiliza.
+    """
+    key = ("pyramid", cache_key) if cache_key is not None else \
+        ("pyramid", id(volume), np.shape(volume), _axes_key("axes", x, y, z))
+    cached = _PYRAMID_CACHE.get(key)
+    # La caché guarda el arreglo: mientras la entrada viva su id no puede reciclarse
+    if cached is None or (cache_key is None and cached[0] is not volume):
+        cached = (volume, VolumePyramid(x, y, z, volume))
+        _PYRAMID_CACHE[key] = cached
+        if len(_PYRAMID_CACHE) > _GRID_CACHE_SIZE:
+            _PYRAMID_CACHE.popitem(last=False)
+    _PYRAMID_CACHE.move_to_end(key)
+    pyramid = cached[1]
+
+    lx, ly, lz, level_volume = pyramid.level(pyramid.select_level(viewport_px))
+    grid = _rectilinear_grid(lx, ly, lz)
+    return update_scalars(grid, name, level_volume)
+
+def render_dynamic_slicing(freqs, rho_matrix, station_xy=None, grid_shape=(100, 100), screenshot=None):
     """
     Crea un volumen 3D con herramientas de corte dinámico usando Point Data.
+    screenshot: Ruta de imagen para renderizar fuera de pantalla (sin ventana).
+    Si se entregan las posiciones de las estaciones (station_xy), el volumen se
+    interpola en 3D; si no, la sección 2D se extruye a lo largo de Y.
+    Los volúmenes grandes se muestran en el nivel LOD que admite la ventana.
     """
-    # 1. Definir ejes
-    x = np.arange(rho_matrix.shape[0], dtype=np.float32)
-    z = np.log10(freqs).astype(np.float32)
-    y = np.linspace(-2, 2, 10, dtype=np.float32) # 10 capas de profundidad visual
-    
-    # 2. Crear malla de volumen (RectilinearGrid)
-    grid = pv.RectilinearGrid(x, y, z)
-    
-    # 3. Preparar los datos
-    # Expandimos la matriz de 2D a 3D para que coincida con cada punto del volumen
-    # Usamos order='F' (Fortran) o aseguramos el reshape correcto para VTK
-    vol_data = np.repeat(rho_matrix[:, np.newaxis, :], len(y), axis=1)
-    
-    # CAMBIO CLAVE: Usar point_data en lugar de cell_data
-    grid.point_data["Resistividad"] = vol_data.ravel()
+    if station_xy is not None:
+        x, y, z, volume = _interpolated_volume(station_xy, freqs, rho_matrix, grid_shape, 8, 2.0)
+    else:
+        # 1. Definir ejes
+        x = np.arange(rho_matrix.shape[0], dtype=np.float32)
+        z = np.log10(freqs).astype(np.float32)
+        y = np.linspace(-2, 2, 10, dtype=np.float32) # 10 capas de profundidad visual
+        
+        # 2. Una línea no tiene información transversal: la estación es la misma en
+        # todo Y. Reordenamos a (Z, Y, X) para respetar el orden de puntos de VTK.
+        volume = np.broadcast_to(rho_matrix.T[:, np.newaxis, :], (len(z), len(y), len(x)))
 
-    # 4. Configurar Plotter con Slicing
-    p = pv.Plotter(title="GIF - Análisis de Corte Dinámico")
+    # 3. Configurar Plotter con Slicing
+    p = _new_plotter(screenshot, title="GIF - Análisis de Corte Dinámico")
     p.set_background("#111111")
+
+    # 4. Malla reutilizable (y reducida por LOD si el volumen es muy grande)
+    if volume.size > LOD_POINT_LIMIT:
+        grid = volume_lod_grid(x, y, z, volume, max(p.window_size))
+    else:
+        grid = update_scalars(_rectilinear_grid(x, y, z), "Resistividad", volume)
     
     # Herramienta interactiva de plano de corte
     p.add_mesh_clip_plane(
@@ -149,10 +266,4 @@ def render_dynamic_slicing(freqs, rho_matrix):
     )
     
     p.show_grid(xtitle="Estaciones", ytitle="Offset Y", ztitle="log10(F)")
-    p.show()
-
-
-
-
-
-
+    _finish(p, screenshot)
@@ -0,0 +1,90 @@
+# src\visualization\reports.py
+"""
+Generación headless de reportes de QC.
+
+Cada trabajo describe una figura (tipo + datos). Los trabajos se reparten en un
+pool de procesos; cada proceso inicializa una sola vez su backend fuera de
+pantalla (Agg para Matplotlib, OFF_SCREEN para PyVista) y escribe las figuras
+directamente a disco, sin abrir ventanas.
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+REPORT_KINDS = ("wiggle", "sounding", "spectral", "section_3d", "slicing_3d")
+
+
+def _init_worker():
+    """Backend fuera de pantalla, una vez por proceso."""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.switch_backend("Agg") # Por si pyplot ya venía importado (fork)
+    try:
+        import pyvista as pv
+        pv.OFF_SCREEN = True
+    except ImportError:
+        pass
+
+
+def _render_job(job, output_dir, dpi):
+    """Renderiza un trabajo y retorna su registro de tiempo."""
+    kind = job["kind"]
+    path = os.path.join(output_dir, f"{job['name']}.png")
+    args = job.get("args", ())
+    kwargs = job.get("kwargs", {})
+    start_t = time.perf_counter()
+
+    if kind in ("wiggle", "sounding", "spectral"):
+        import matplotlib.pyplot as plt
+        from . import plots
+        if kind == "wiggle":
+            fig = plots.plot_multichannel_wiggle(*args, **kwargs)
+        elif kind == "sounding":
+            fig = plots.plot_sounding_curve(*args, **kwargs)
+        else:
+            fig = plots.plot_spectral_comparison(*args, show=False, **kwargs)
+        fig.savefig(path, dpi=dpi)
+        plt.close(fig)
+    elif kind == "section_3d":
+        from .render_3d import render_resistivity_section
+        render_resistivity_section(*args, screenshot=path, **kwargs)
+    elif kind == "slicing_3d":
+        from .render_3d import render_dynamic_slicing
+        render_dynamic_slicing(*args, screenshot=path, **kwargs)
+    else:
+        raise ValueError(f"Tipo de reporte desconocido: {kind}. Opciones: {REPORT_KINDS}")
+
+    return {"name": job["name"], "kind": kind, "path": path,
+            "seconds": time.perf_counter() - start_t, "pid": os.getpid()}
+
+
+def render_report_batch(jobs, output_dir, n_workers=None, dpi=120):
+    """
+    Renderiza una lista de trabajos a archivos PNG en paralelo.
+
+    jobs: lista de dicts {"kind": ..., "name": ..., "args": (...), "kwargs": {...}}
+    n_workers: Procesos del pool (1 = en el proceso actual, sin pool)
+    Retorna un registro por figura (ruta, tiempo de render, proceso) en el orden de 'jobs'.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    if n_workers == 1:
+        _init_worker()
+        return [_render_job(job, output_dir, dpi) for job in jobs]
+
+    with ProcessPoolExecutor(max_workers=n_workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_render_job, job, output_dir, dpi) for job in jobs]
+        return [f.result() for f in futures]
+
+
+def print_report_summary(records):
+    """Resumen en consola de los tiempos de render por figura."""
+    print(f"{'FIGURA':<40} | {'TIPO':<12} | {'TIEMPO'}")
+    print("-" * 66)
+    for rec in records:
+        print(f"{rec['name']:<40} | {rec['kind']:<12} | {rec['seconds']:.3f}s")
+    total = sum(rec["seconds"] for rec in records)
+    print("-" * 66)
+    print(f"{len(records)} figuras | tiempo de render acumulado: {total:.3f}s")
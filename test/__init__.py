@@ -5,3 +5,16 @@ from .test_multichannel import run_multichannel_test
 from .test_spectral_analyzer import run_spectral_analysis
 from .test_geophysics_analysis import run_geophysics_test
 from .test_stacking_refinement import run_stacking_test
+from .test_mt_inversion import run_inversion_test
+from .test_volume_interpolation import run_volume_test
+from .test_out_of_core import run_out_of_core_test
+from .test_async_streaming import run_async_streaming_test
+from .test_shared_memory_stream import run_shared_memory_test
+from .test_backends import run_backends_test
+from .test_parallel_policy import run_parallel_policy_test
+from .test_realtime_replay import run_realtime_replay_test
+from .test_sliding_spectrum import run_sliding_spectrum_test
+from .test_tem_stacking import run_tem_stacking_test
+from .test_timebase_alignment import run_timebase_alignment_test
+from .test_results_store import run_results_store_test
+from .test_batch_resume import run_batch_resume_test
@@ -0,0 +1,38 @@
+# test\test_async_streaming.py
+import asyncio
+import numpy as np
+
+from src.processing.async_pipeline import RunningStack, run_streaming_pipeline, print_streaming_report
+
+def run_async_streaming_test():
+    # 1. Configuración: 24 canales a 24 kHz, bloques de 100 ms
+    FS = 24000
+    N_CHANNELS = 24
+    DURATION = 10.0
+
+    # 2. Tiempo real: la fuente entrega al ritmo del reloj, se mide holgura y latencia
+    print(f"Streaming en tiempo real: {N_CHANNELS} canales x {FS} Hz durante {DURATION:.0f}s...")
+    report = asyncio.run(run_streaming_pipeline(fs=FS, n_channels=N_CHANNELS, duration=DURATION))
+    print_streaming_report(report)
+
+    # 3. Sin ritmo de reloj: las colas se llenan y aparece la contrapresión
+    print("\nStreaming a máxima velocidad (contrapresión)...")
+    report = asyncio.run(run_streaming_pipeline(fs=FS, n_channels=N_CHANNELS, duration=DURATION,
+                                                realtime=False))
+    print_streaming_report(report)
+
+    # 4. Stacking continuo con bloques que no son múltiplo del segmento (y más cortos que él):
+    #    debe coincidir con el stack del registro completo sobre la grilla absoluta
+    SEGMENT = 1000
+    signal = np.random.default_rng(5).standard_normal((N_CHANNELS, 23 * SEGMENT + 321)).astype(np.float32)
+    expected = signal[:, :23 * SEGMENT].reshape(N_CHANNELS, 23, SEGMENT).mean(axis=1)
+    for chunk in (700, 1300, 250):
+        stacker = RunningStack(SEGMENT)
+        for start in range(0, signal.shape[1], chunk):
+            stacker.update(signal[:, start:start + chunk])
+        err = np.abs(stacker.result() - expected).max()
+        print(f"[{'OK' if stacker.count == 23 and err < 1e-5 else 'ERROR'}] Stack en bloques de {chunk}: "
+              f"{stacker.count} segmentos, desvío vs registro completo {err:.1e}")
+
+if __name__ == "__main__":
+    run_async_streaming_test()
@@ -0,0 +1,79 @@
+# test\test_backends.py
+import os
+import tempfile
+import time
+import numpy as np
+from scipy import signal
+
+from src.processing import backends
+from src.processing.cpp_bridge import c_interpolate_data, native_available
+from src.processing.interpolation import InterpolationPlan
+
+def run_backends_test():
+    # 1. Configuración: un bloque de 0.5 s de 24 canales a 24 kHz
+    FS = 24000
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((24, 12000)).astype(np.float32)
+    target_freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+    b, a = signal.iirnotch(60.0, 100.0, FS)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+
+    # 2. Cada motor contra el primero disponible (mismo resultado, distinto tiempo)
+    cases = {
+        "filter": lambda be: backends.apply_filter(data, sos, np.zeros((24, 2), np.float32), backend=be)[0],
+        "spectrum": lambda be: backends.calculate_spectrum(data, FS, target_freqs, backend=be),
+        "stacking": lambda be: backends.compute_stacking(data, backend=be),
+    }
+    print(f"{'KERNEL':<10} | {'MOTOR':<7} | {'TIEMPO':>10} | {'DIF. REL.':>9}")
+    print("-" * 46)
+    for kernel, call in cases.items():
+        reference = None
+        for name in backends.available_backends(kernel):
+            start_t = time.perf_counter()
+            result = call(name)
+            elapsed = time.perf_counter() - start_t
+            if reference is None:
+                reference = result
+            diff = np.abs(result - reference).max() / (np.abs(reference).max() + 1e-12)
+            print(f"{kernel:<10} | {name:<7} | {elapsed * 1000:8.3f}ms | {diff:9.2e}")
+
+    # 3. Despacho automático según la tabla de autotune (si existe)
+    for kernel, size in (("filter", data.size), ("spectrum", data.size * 20), ("stacking", data.size)):
+        print(f"Despacho para {kernel} ({size:,}): {backends.select_backend(kernel, size)}")
+
+    # 4. InterpolationPlan: cada motor contra la interpolación directa en C++
+    rho = (rng.random((24, 20)) * 100 + 1).astype(np.float32)
+    batch = np.stack([rho, 2 * rho])
+    plan = InterpolationPlan.from_shapes(rho.shape, (200, 100))
+    reference = c_interpolate_data(rho, (200, 100), copy=True) if native_available() else None
+    for name in backends.available_backends("interpolation"):
+        out = backends.apply_interpolation_plan(batch, plan.row_idx, plan.row_w, plan.col_idx, plan.col_w,
+                                                backend=name)
+        if reference is None:
+            reference = out[0]
+        diff = max(np.abs(out[0] - reference).max(), np.abs(out[1] - 2 * reference).max()) / reference.max()
+        print(f"[{'OK' if diff < 1e-5 else 'ERROR'}] InterpolationPlan ({name}) vs c_interpolate_data: "
+              f"dif. rel. {diff:.2e}")
+    diff = np.abs(plan.apply(rho) - reference).max() / reference.max()
+    print(f"[{'OK' if diff < 1e-5 else 'ERROR'}] plan.apply (despacho automático): dif. rel. {diff:.2e}")
+
+    # 5. Lectura por bloques de un archivo truncado: error, no datos sin inicializar
+    fd, filename = tempfile.mkstemp(suffix=".raw")
+    os.close(fd)
+    try:
+        data[:, :1000].tofile(filename) # 24 canales declarados de 1000 muestras...
+        with open(filename, "r+b") as f:
+            f.truncate(23 * 1000 * 4 + 400) # ...pero el último quedó con 100
+        block = backends.load_raw_block(filename, 24, 1000, 0, 50, backend="numpy")
+        ok = np.array_equal(block, data[:, :50])
+        try:
+            backends.load_raw_block(filename, 24, 1000, 0, 500, backend="numpy")
+            ok = False
+        except OSError as e:
+            print(f"    Lectura corta detectada: {e}")
+        print(f"[{'OK' if ok else 'ERROR'}] load_block numpy: bloque completo leído, bloque truncado rechazado")
+    finally:
+        os.remove(filename)
+
+if __name__ == "__main__":
+    run_backends_test()
@@ -0,0 +1,69 @@
+# test\test_batch_resume.py
+import os
+import shutil
+import tempfile
+import numpy as np
+
+from src.processing.batch import discover_surveys, load_manifest, run_batch
+
+def _write_survey(path, seed, n_channels=2, fs=2400, seconds=10):
+    rng = np.random.default_rng(seed)
+    rng.standard_normal((n_channels, fs * seconds)).astype(np.float32).tofile(path)
+
+def run_batch_resume_test():
+    # 1. Tres levantamientos, dos con el mismo nombre en carpetas distintas (días de dos equipos)
+    PARAMS = {"n_channels": 2, "fs": 2400, "segment_sec": 0.5, "memory_budget_mb": 1}
+    workdir = tempfile.mkdtemp(prefix="gif_batch_")
+    try:
+        surveys = []
+        for i, rel in enumerate(("equipo_a/dia1.raw", "equipo_b/dia1.raw", "equipo_b/dia2.raw")):
+            path = os.path.join(workdir, rel)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            _write_survey(path, seed=i)
+            surveys.append(path)
+        surveys = discover_surveys(surveys)
+        output = os.path.join(workdir, "results")
+
+        # 2. Primera corrida: cada levantamiento con su propio .npz
+        print("--- Corrida 1: todo pendiente ---")
+        run_batch(surveys, output, n_workers=2, **PARAMS)
+        results = sorted(f for f in os.listdir(output) if f.endswith(".npz"))
+        manifest = load_manifest(output)
+        print(f"Resultados: {results}")
+        distinct = len({manifest[s]["result"] for s in surveys}) == len(surveys) == len(results)
+        print(f"Un resultado por levantamiento: {'OK' if distinct else 'ERROR'}")
+        a = np.load(os.path.join(output, manifest[surveys[0]]["result"]))["stacked"]
+        b = np.load(os.path.join(output, manifest[surveys[1]]["result"]))["stacked"]
+        print(f"dia1 de equipo_a y equipo_b difieren: {'OK' if not np.array_equal(a, b) else 'ERROR'}")
+
+        # 3. Reanudación: nada cambió, nada se reprocesa
+        print("\n--- Corrida 2: reanudación ---")
+        summary = run_batch(surveys, output, n_workers=2, **PARAMS)
+        print(f"Omitidos {summary['skipped']}/{len(surveys)}: {'OK' if summary['processed'] == 0 else 'ERROR'}")
+
+        # 4. Huella: un archivo reescrito (otro tamaño) se vuelve a procesar, el resto no
+        print("\n--- Corrida 3: equipo_b/dia2.raw reescrito ---")
+        _write_survey(surveys[2], seed=9, seconds=12)
+        summary = run_batch(surveys, output, n_workers=2, **PARAMS)
+        ok = summary["processed"] == 1 and summary["skipped"] == 2
+        print(f"Reprocesados {summary['processed']}, omitidos {summary['skipped']}: {'OK' if ok else 'ERROR'}")
+
+        # 5. Un resultado borrado a mano también invalida su entrada
+        os.remove(os.path.join(output, load_manifest(output)[surveys[0]]["result"]))
+        summary = run_batch(surveys, output, n_workers=1, verbose=False, **PARAMS)
+        print(f"Resultado borrado -> reprocesados {summary['processed']}: "
+              f"{'OK' if summary['processed'] == 1 else 'ERROR'}")
+
+        # 6. Otros parámetros (ej. --fs distinto): todo se reprocesa, y una corrida
+        #    más con esos mismos parámetros vuelve a omitirlo todo
+        other = dict(PARAMS, fs=1200)
+        summary = run_batch(surveys, output, n_workers=1, verbose=False, **other)
+        again = run_batch(surveys, output, n_workers=1, verbose=False, **other)
+        ok = summary["processed"] == len(surveys) and again["skipped"] == len(surveys)
+        print(f"Parámetros cambiados -> reprocesados {summary['processed']}, luego omitidos "
+              f"{again['skipped']}: {'OK' if ok else 'ERROR'}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_batch_resume_test()
@@ -23,7 +23,7 @@ def run_geophysics_test():
     print("Filtrando con Q=100 para máxima atenuación...")
     filtered_data, _ = c_apply_multichannel_filter(raw_data, sos, zi)
 
-    # 3. Cálculo de Magnitudes en C++
+    # 3. Cálculo de Magnitudes en C++ (con 2 canales el motor reparte pares canal-frecuencia)
     print("Analizando espectros de canales E (CH1) y H (CH2)...")
     mags = c_calculate_spectrum(filtered_data[:2], float(FS), freqs)
 
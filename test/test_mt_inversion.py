@@ -0,0 +1,39 @@
+# test\test_mt_inversion.py
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+
+from src.processing.geophysics import forward_mt_1d, invert_mt_line
+from src.visualization.plots import plot_inversion_result
+
+def run_inversion_test():
+    # 1. Configuración: una línea de 300 sondeos sintéticos de 3 capas
+    N_STATIONS = 300
+    freqs = np.logspace(-2, 3, 25)
+    thicknesses = np.array([500.0, 2000.0])
+
+    true_models = np.tile([100.0, 10.0, 1000.0], (N_STATIONS, 1))
+    true_models[:, 1] = np.logspace(0.5, 1.5, N_STATIONS) # Conductor que varía lateralmente
+
+    # 2. Modelado directo vectorizado + 3% de ruido
+    start_t = time.perf_counter()
+    rho_obs, phase_obs = forward_mt_1d(true_models, thicknesses, freqs)
+    print(f"Modelado directo de {N_STATIONS} estaciones: {time.perf_counter() - start_t:.4f}s")
+    rho_obs *= np.exp(0.03 * np.random.randn(*rho_obs.shape))
+
+    # 3. Inversión Occam en paralelo (pool de procesos)
+    print("Invirtiendo la línea completa...")
+    start_t = time.perf_counter()
+    result = invert_mt_line(freqs, rho_obs, phase_obs)
+    print(f"Inversión completada en: {time.perf_counter() - start_t:.4f}s")
+    print(f"RMS mediano: {np.median(result['rms']):.2f} | RMS máximo: {result['rms'].max():.2f}")
+
+    # 4. Visualización de la estación central
+    st = N_STATIONS // 2
+    plot_inversion_result(freqs, rho_obs[st], result["rho_pred"][st],
+                          result["depths"], result["resistivities"][st],
+                          title=f"Inversión MT 1D - Estación {st + 1}")
+    plt.show()
+
+if __name__ == "__main__":
+    run_inversion_test()
@@ -0,0 +1,57 @@
+# test\test_out_of_core.py
+import matplotlib.pyplot as plt
+import numpy as np
+from scipy import signal
+
+from src.processing.backends import calculate_spectrum
+from src.processing.out_of_core import process_survey_out_of_core
+
+def run_out_of_core_test():
+    # 1. Configuración: el levantamiento se recorre por bloques, nunca entero en RAM
+    FILENAME = "data/raw/survey_24ch.raw"
+    FS = 24000
+    MEMORY_BUDGET_MB = 8 # Presupuesto pequeño para forzar varios bloques
+
+    # 2. Filtrado + stacking + espectros por bloques con memoria acotada
+    result = process_survey_out_of_core(FILENAME, n_channels=24, fs=FS,
+                                        memory_budget_mb=MEMORY_BUDGET_MB)
+    stats = result["stats"]
+    print(f"Bloques: {stats['n_chunks']} x {stats['chunk_segments']} segmentos | "
+          f"Segmentos apilados: {stats['n_segments']}")
+
+    # 3. El resultado no depende del presupuesto: un solo bloque (4 GB) y la
+    #    referencia en memoria (todo el archivo, Notch continuo en float64 con SciPy)
+    single = process_survey_out_of_core(FILENAME, n_channels=24, fs=FS, memory_budget_mb=4096, verbose=False)
+    data = np.fromfile(FILENAME, dtype=np.float32).reshape(24, -1)
+    seg = int(FS * 0.5)
+    n_seg = data.shape[1] // seg
+    b, a = signal.iirnotch(60.0, 100.0, FS)
+    sos = signal.tf2sos(b, a).astype(np.float32).astype(np.float64) # Los mismos coeficientes que el motor
+    filtered = signal.sosfilt(sos, data[:, :n_seg * seg].astype(np.float64), axis=1)
+    ref_stacked = filtered.reshape(24, n_seg, seg).mean(axis=1).astype(np.float32)
+    ref_mags = calculate_spectrum(ref_stacked, float(FS), result["freqs"])
+    scale = np.abs(ref_stacked).max()
+    checks = [
+        ("stacked 8 MB vs 1 bloque", np.abs(result["stacked"] - single["stacked"]).max() / scale),
+        ("stacked 8 MB vs en memoria", np.abs(result["stacked"] - ref_stacked).max() / scale),
+        ("mags 8 MB vs en memoria", np.max(np.abs(result["mags"] - ref_mags) / ref_mags)),
+    ]
+    for label, err in checks:
+        print(f"[{'OK' if err < 1e-4 else 'ERROR'}] {label}: desvío relativo {err:.1e}")
+    print(f"[{'OK' if stats['n_chunks'] > 1 and single['stats']['n_chunks'] == 1 else 'ERROR'}] "
+          f"Bloques: {stats['n_chunks']} (8 MB) vs {single['stats']['n_chunks']} (4 GB)")
+
+    # 4. Espectro del stacking vs promedio de espectros por segmento (CH1)
+    freqs = result["freqs"]
+    plt.figure(figsize=(10, 5))
+    plt.loglog(freqs, result["mean_segment_mags"][0], 'o-', color='gray', label='Promedio por segmento')
+    plt.loglog(freqs, result["mags"][0], 'o-', color='green', label='Espectro del stacking')
+    plt.xlabel("Frecuencia (Hz)")
+    plt.ylabel("Magnitud")
+    plt.title(f"Out-of-core CH1 | pico RSS: {stats['peak_rss_mb']:.1f} MB")
+    plt.legend()
+    plt.grid(True, which="both", alpha=0.3)
+    plt.show()
+
+if __name__ == "__main__":
+    run_out_of_core_test()
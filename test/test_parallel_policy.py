@@ -0,0 +1,86 @@
+# test\test_parallel_policy.py
+import time
+import numpy as np
+from scipy import signal
+
+from src.processing.cpp_bridge import (c_apply_multichannel_filter, c_calculate_spectrum,
+                                       c_compute_stacking, get_library, get_num_procs,
+                                       parallel_policy)
+
+def run_parallel_policy_test():
+    # 1. Configuración: un trabajo de pocos canales (E y H) de 5 s a 24 kHz
+    FS = 24000
+    rng = np.random.default_rng(0)
+    data = rng.standard_normal((2, FS * 5)).astype(np.float32)
+    freqs = np.logspace(0.5, 3, 20).astype(np.float32)
+    b, a = signal.iirnotch(60.0, 100.0, FS)
+    sos = signal.tf2sos(b, a).flatten().astype(np.float32)
+    n_procs = get_num_procs()
+    print(f"Núcleos visibles para OpenMP: {n_procs}")
+
+    def run_filter():
+        return c_apply_multichannel_filter(data, sos, np.zeros((2, 2), np.float32))[0]
+
+    def run_spectrum():
+        return c_calculate_spectrum(data, float(FS), freqs)
+
+    # 2. Cada eje contra el reparto clásico por canales (mismo resultado, distinto tiempo)
+    cases = {
+        "filter": (run_filter, ("channels", "samples", "auto")),
+        "spectrum": (run_spectrum, ("channels", "frequencies", "samples", "auto")),
+    }
+    print(f"{'KERNEL':<9} | {'EJE':<12} | {'HILOS':>5} | {'TIEMPO':>10} | {'DIF. REL.':>9}")
+    print("-" * 58)
+    for kernel, (call, axes) in cases.items():
+        reference = None
+        for threads in sorted({1, n_procs}):
+            for axis in axes:
+                with parallel_policy(threads=threads, **{kernel: axis}):
+                    start_t = time.perf_counter()
+                    result = call()
+                    elapsed = time.perf_counter() - start_t
+                if reference is None:
+                    reference = result
+                diff = np.abs(result - reference).max() / (np.abs(reference).max() + 1e-12)
+                print(f"{kernel:<9} | {axis:<12} | {threads:>5} | {elapsed * 1000:8.3f}ms | {diff:9.2e}")
+
+    # 2b. Exactitud del filtro por bloques con polos cerca del círculo unitario.
+    # Hilos fijos (no solo los núcleos): con 1 núcleo el reparto en bloques también se ejercita.
+    long_data = rng.standard_normal((2, 120000)).astype(np.float32)
+    filters = {
+        "Butter BP 6º 1-1000Hz": signal.butter(6, [1.0, 1000.0], "bandpass", fs=FS, output="sos"),
+        "Butter HP 2º 1Hz": signal.butter(2, 1.0, "highpass", fs=FS, output="sos"),
+    }
+    print(f"{'FILTRO':<22} | {'HILOS':>5} | {'SAMPLES VS CHANNELS':>19} | {'VS SCIPY (DOUBLE)':>17}")
+    print("-" * 74)
+    for name, sos_design in filters.items():
+        sos32 = sos_design.astype(np.float32)
+        exact = signal.sosfilt(sos32.astype(np.float64), long_data.astype(np.float64), axis=1)
+        scale = np.abs(exact).max()
+        zi = np.zeros((2, len(sos32) * 2), np.float32)
+        for threads in (2, 4, 8):
+            with parallel_policy(threads=threads, filter="channels"):
+                by_channel = c_apply_multichannel_filter(long_data, sos32.flatten(), zi.copy())[0]
+            with parallel_policy(threads=threads, filter="samples"):
+                by_block = c_apply_multichannel_filter(long_data, sos32.flatten(), zi.copy())[0]
+            diff = np.abs(by_block - by_channel).max() / scale
+            err = np.abs(by_block - exact).max() / scale
+            status = "OK" if diff < 1e-5 else "ERROR"
+            print(f"{name:<22} | {threads:>5} | {diff:>13.2e} [{status:<5}]| {err:>17.2e}")
+
+    # Salir de un 'with' devuelve los hilos al valor sin fijar (sigue a OpenMP)
+    with parallel_policy(spectrum="frequencies"):
+        pass
+    print(f"Hilos fijados tras parallel_policy: {get_library().get_parallel_threads_setting()} (0 = OpenMP)")
+
+    # 3. Stacking sin atomics: cada hilo es dueño de un bloque de la salida
+    segments = rng.standard_normal((200, FS)).astype(np.float32)
+    with parallel_policy(threads=n_procs, schedule="dynamic", chunk=4):
+        start_t = time.perf_counter()
+        stacked = c_compute_stacking(segments)
+        elapsed = time.perf_counter() - start_t
+    diff = np.abs(stacked - segments.mean(axis=0)).max()
+    print(f"Stacking 200 x {FS}: {elapsed * 1000:.3f}ms | dif. máx. contra NumPy {diff:.2e}")
+
+if __name__ == "__main__":
+    run_parallel_policy_test()
@@ -0,0 +1,33 @@
+# test\test_realtime_replay.py
+import os
+import shutil
+import tempfile
+
+from src.acquisition.survey_generator import line_layout, make_spec, write_survey
+from src.processing.replay import print_replay_report, run_replay_sweep
+
+def run_realtime_replay_test():
+    # 1. Configuración: 12 estaciones E/H (24 canales) a 24 kHz, 10 s grabados
+    FS = 24000
+    workdir = tempfile.mkdtemp(prefix="gif_replay_")
+    filename = os.path.join(workdir, "replay_24ch.raw")
+    try:
+        spec = make_spec(line_layout(12), fs=FS, duration_sec=10.0, chunk_sec=5.0)
+        write_survey(filename, spec, n_workers=1, verbose=False)
+
+        # 2. Tiempo real: 3 s por caso, bloques de 10 ms y de 100 ms por ambas rutas
+        print(f"Replay en tiempo real de {spec['n_channels']} canales x {FS} Hz...")
+        report = run_replay_sweep(filename, chunk_samples=(240, 2400), threads=(1,),
+                                  speed=1.0, duration=3.0, verbose=False)
+        print_replay_report(report)
+
+        # 3. Al doble de velocidad el plazo se reduce a la mitad
+        print("\nReplay a 2x (plazo de medio bloque)...")
+        report = run_replay_sweep(filename, paths=("multichannel",), chunk_samples=(240,),
+                                  threads=(1,), speed=2.0, duration=3.0, verbose=False)
+        print_replay_report(report)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_realtime_replay_test()
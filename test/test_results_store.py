@@ -0,0 +1,87 @@
+# test\test_results_store.py
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+
+from src.io.results_store import ResultsStore
+
+def run_results_store_test():
+    # 1. Monitoreo largo: 24 estaciones x 20 frecuencias, una ventana cada 10 s durante 2 h
+    N_STATIONS = 24
+    N_WINDOWS = 720
+    freqs = np.logspace(0.5, 3, 20)
+    stations = [f"ST{i + 1:02d}" for i in range(N_STATIONS)]
+    t0 = np.datetime64("2024-03-01T12:00:00", "ns")
+    rng = np.random.default_rng(3)
+    base_rho = np.linspace(30, 300, N_STATIONS)[:, None] * (freqs / 10.0) ** -0.1
+
+    workdir = tempfile.mkdtemp(prefix="gif_store_")
+    try:
+        # 2. Escritura por ventanas: espectros, impedancia compleja y resistividad
+        start_t = time.perf_counter()
+        with ResultsStore(workdir, chunk_rows=32768) as store:
+            for w in range(N_WINDOWS):
+                t = t0 + np.timedelta64(10 * w, "s")
+                rho = base_rho * (1 + 0.05 * rng.standard_normal(base_rho.shape))
+                phase = np.full(rho.shape, 45.0) + rng.standard_normal(rho.shape)
+                z = np.sqrt(rho * 2e-7 * np.pi * freqs) * np.exp(1j * np.radians(phase))
+                store.append_matrix("spectra", stations, freqs, t,
+                                    mag=np.abs(z).astype(np.float32))
+                store.append_matrix("impedance", stations, freqs, t, z=z.astype(np.complex64))
+                store.append_matrix("resistivity", stations, freqs, t,
+                                    rho=rho.astype(np.float32), phase=phase.astype(np.float32))
+        elapsed = time.perf_counter() - start_t
+        size_mb = sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(workdir)
+                      for f in files) / 1e6
+        print(f"Escritura: {N_WINDOWS} ventanas en {elapsed:.2f}s | {size_mb:.1f} MB en disco")
+
+        # 3. Una sesión nueva abre el almacén sin reprocesar nada
+        store = ResultsStore(workdir)
+        print(f"{'TABLA':<12} | {'FILAS':>8} | {'CHUNKS':>6} | COLUMNAS")
+        print("-" * 50)
+        for name, info in store.tables().items():
+            print(f"{name:<12} | {info['rows']:>8} | {info['chunks']:>6} | {', '.join(info['columns'])}")
+
+        # 4. Consultas por estación, frecuencia y tiempo (sólo se abren los chunks que cruzan)
+        queries = [
+            ("2 estaciones, todo", {"stations": ["ST03", "ST17"]}),
+            ("10-100 Hz, 10 min", {"freq": (10, 100), "time": ("2024-03-01T13:00:00", "2024-03-01T13:10:00")}),
+            ("ST05 @ 1 ventana", {"stations": ["ST05"], "time": "2024-03-01T12:30:00"}),
+        ]
+        for label, kwargs in queries:
+            start_t = time.perf_counter()
+            sel = store.query("resistivity", columns=["rho"], **kwargs)
+            ms = (time.perf_counter() - start_t) * 1000
+            print(f"    {label:<20} -> {len(sel['rho']):>6} filas en {ms:6.2f} ms | "
+                  f"rho medio {np.mean(sel['rho']):7.1f} Ohm-m")
+
+        # 5. Matriz (estaciones, frecuencias) de una ventana, lista para render_3d
+        names, f, rho = store.matrix("resistivity", "rho", time="2024-03-01T13:59:50")
+        err = np.max(np.abs(rho / base_rho - 1))
+        print(f"Ventana 13:59:50 -> matriz {rho.shape} | desvío máximo del modelo {err:.1%}")
+
+        # 6. Dos escritores sobre el mismo almacén (abiertos antes de que cualquiera escriba)
+        shared = os.path.join(workdir, "compartido")
+        writer_a = ResultsStore(shared, chunk_rows=50)
+        writer_b = ResultsStore(shared, chunk_rows=50)
+        for w in range(4):
+            t = t0 + np.timedelta64(10 * w, "s")
+            writer_a.append_matrix("resistivity", ["A1", "A2"], freqs, t, rho=np.full((2, 20), 10.0, np.float32))
+            writer_b.append_matrix("resistivity", ["B1"], freqs, t, rho=np.full((1, 20), 20.0, np.float32))
+        writer_a.flush()
+        writer_b.flush()
+        reader = ResultsStore(shared)
+        ids = [entry["id"] for entry in reader.index["tables"]["resistivity"]["chunks"]]
+        rho_a = reader.query("resistivity", stations=["A1", "A2"])["rho"]
+        rho_b = reader.query("resistivity", stations=["B1"])["rho"]
+        ok = (len(ids) == len(set(ids)) and reader.stations() == ["A1", "A2", "B1"] and
+              len(rho_a) == 160 and np.all(rho_a == 10.0) and len(rho_b) == 80 and np.all(rho_b == 20.0))
+        print(f"[{'OK' if ok else 'ERROR'}] Dos escritores: {len(ids)} chunks con ids únicos, "
+              f"{len(rho_a)} + {len(rho_b)} filas, estaciones {reader.stations()}")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+if __name__ == "__main__":
+    run_results_store_test()
@@ -0,0 +1,38 @@
+# test\test_shared_memory_stream.py
+import multiprocessing as mp
+import sys
+import time
+
+from src.processing.mp_stream import _collect_stats, run_shared_memory_stream, print_shared_memory_report
+
+def run_shared_memory_test():
+    # 1. Configuración: 24 canales a 24 kHz, 2 procesos de filtrado (12 canales c/u)
+    FS = 24000
+    N_CHANNELS = 24
+    DURATION = 10.0
+
+    # 2. Lectores sin pausas: cero pérdidas, atraso mínimo
+    print(f"Adquisición en proceso separado: {N_CHANNELS} canales x {FS} Hz durante {DURATION:.0f}s...")
+    report = run_shared_memory_stream(fs=FS, n_channels=N_CHANNELS, duration=DURATION, n_workers=2)
+    print_shared_memory_report(report)
+
+    # 3. Lectores con pausas de 0.5 s (ej. redibujar gráficos): la adquisición no se
+    #    atrasa y el anillo de 32 ranuras (3.2 s) absorbe la pausa sin perder bloques
+    print("\nLectores con pausas simuladas de 0.5s cada 20 bloques...")
+    report = run_shared_memory_stream(fs=FS, n_channels=N_CHANNELS, duration=DURATION, n_workers=2,
+                                      stall_every=20, stall_s=0.5)
+    print_shared_memory_report(report)
+
+    # 4. Un proceso que muere sin reportar no cuelga la espera de estadísticas
+    dead = mp.Process(target=sys.exit, args=(3,))
+    dead.start()
+    start_t = time.perf_counter()
+    try:
+        _collect_stats(mp.Queue(), [dead], poll_s=0.2)
+        print("[ERROR] La espera de estadísticas no detectó el proceso muerto")
+    except RuntimeError as e:
+        print(f"[OK] Proceso muerto detectado en {time.perf_counter() - start_t:.2f}s: {e}")
+    dead.join()
+
+if __name__ == "__main__":
+    run_shared_memory_test()
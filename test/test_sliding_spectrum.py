@@ -0,0 +1,63 @@
+# test\test_sliding_spectrum.py
+import time
+import numpy as np
+
+from src.processing.backends import calculate_spectrum
+from src.processing.sliding_spectrum import SlidingSpectrum, peak_frequency
+
+def run_sliding_spectrum_test():
+    # 1. Configuración: 24 canales a 24 kHz, red de 60 Hz con deriva lenta (±0.2 Hz)
+    FS = 24000
+    N_CHANNELS = 24
+    DURATION = 20.0
+    CHUNK = 2400 # Bloques de 100 ms
+    rng = np.random.default_rng(0)
+    t = np.arange(int(FS * DURATION)) / FS
+    line_freq = 60.0 + 0.2 * np.sin(2 * np.pi * t / DURATION)
+    line = np.sin(2 * np.pi * np.cumsum(line_freq) / FS)
+    data = (0.5 * rng.standard_normal((N_CHANNELS, len(t))) + line).astype(np.float32)
+
+    # Grilla fina alrededor de la red (seguimiento) + bandas de monitoreo
+    track_freqs = np.arange(59.0, 61.01, 0.1)
+    freqs = np.concatenate((track_freqs, np.logspace(0.5, 3, 20)))
+    spec = SlidingSpectrum(FS, N_CHANNELS, freqs, window_sec=2.0, hop=CHUNK)
+    print(f"Motor: {'C++ (DLL)' if spec.use_cpp else 'NumPy'} | {len(freqs)} frecuencias | "
+          f"ventana {spec.window} muestras")
+
+    # 2. Streaming: un frame por bloque, costo independiente del largo de la ventana
+    times, mags, phases = [], [], []
+    start_t = time.perf_counter()
+    for start in range(0, data.shape[1], CHUNK):
+        frame_t, mag, phase = spec.update(data[:, start:start + CHUNK])
+        times.append(frame_t)
+        mags.append(mag)
+        phases.append(phase)
+    elapsed = time.perf_counter() - start_t
+    times = np.concatenate(times)
+    mags = np.concatenate(mags, axis=1)
+    n_chunks = data.shape[1] // CHUNK
+    print(f"SDFT: {elapsed / n_chunks * 1000:.3f} ms por bloque de {CHUNK / FS * 1000:.0f} ms "
+          f"({len(times)} frames de {N_CHANNELS} canales)")
+
+    # 3. Contra el DFT enfocado sobre la ventana completa en cada frame
+    window = data[:, -spec.window:]
+    start_t = time.perf_counter()
+    reference = calculate_spectrum(window, float(FS), freqs.astype(np.float32))
+    direct_ms = (time.perf_counter() - start_t) * 1000
+    rel_err = np.abs(mags[:, -1] - reference).max() / reference.max()
+    print(f"DFT enfocado: {direct_ms:.3f} ms por frame | error relativo del último frame: {rel_err:.2e}")
+
+    # 4. Seguimiento de la red: máximo interpolado sobre la grilla fina, frame a frame
+    valid = times >= spec.window / FS # Ventana completa
+    n_track = len(track_freqs)
+    estimate = peak_frequency(mags[:, valid, :n_track].mean(axis=0), track_freqs)
+    # Frecuencia real promediada sobre la ventana de cada frame
+    ends = np.round(times[valid] * FS).astype(int)
+    cums = np.concatenate(([0.0], np.cumsum(line_freq)))
+    truth = (cums[ends] - cums[ends - spec.window]) / spec.window
+    err = np.abs(estimate - truth)
+    print(f"Red seguida en {valid.sum()} frames: error medio {err.mean() * 1000:.1f} mHz | "
+          f"máx {err.max() * 1000:.1f} mHz | rango {estimate.min():.2f}-{estimate.max():.2f} Hz")
+
+if __name__ == "__main__":
+    run_sliding_spectrum_test()
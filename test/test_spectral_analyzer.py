@@ -5,6 +5,7 @@ from src.processing.cpp_bridge import (
     c_apply_multichannel_filter, 
     c_calculate_spectrum
 )
+from src.processing.qc import compute_qc, print_qc_summary
 from src.visualization.plots import plot_spectral_comparison
 
 def run_spectral_analysis():
@@ -42,19 +43,28 @@ def run_spectral_analysis():
     print("Analizando espectro final...")
     mag_post = c_calculate_spectrum(filtered_matrix, float(FS), target_freqs)
 
-    # 6. Mostrar Resultados Cuantitativos (QC Report)
+    # 6. Tabla de QC por canal (una pasada vectorizada: SNR, rechazo del Notch, RMS, saturación, coherencia)
+    qc_table = compute_qc(data_matrix, FS, filtered=filtered_matrix, ref_channel=1)
     print("\n" + "="*50)
-    print(f"{'CANAL':<8} | {'2Hz (Señal)':<12} | {'60Hz (Ruido)':<12} | {'REDUCCIÓN 60Hz'}")
-    print("-" * 50)
-    
-    reducciones = []
-    for i in range(N_CHANNELS):
-        red_db = 20 * np.log10(mag_pre[i, 1] / (mag_post[i, 1] + 1e-9))
-        reducciones.append(red_db)
-        print(f"CH {i+1:02d}    | {mag_post[i,0]:.4f}     | {mag_post[i,1]:.4f}     | {red_db:.2f} dB")
-    
+    print(qc_table[["rms", "snr_1-10Hz_db", "line_excess_db", "notch_rejection_db",
+                    "coherence_ref", "status"]].to_string(float_format=lambda v: f"{v:.2f}"))
     print("="*50)
-    print(f"Reducción promedio del ruido: {np.mean(reducciones):.2f} dB")
+    print(f"Reducción promedio del ruido: {qc_table['notch_rejection_db'].mean():.2f} dB")
+    print_qc_summary(qc_table)
+
+    # 6b. Saturación sin clip_level: un conversor entero repite valores sin estar saturado
+    rng = np.random.default_rng(0)
+    t = np.arange(N_SAMPLES_PER_CH) / FS
+    adc = np.round(np.vstack([3 * rng.standard_normal(N_SAMPLES_PER_CH),
+                              400 * np.sin(2 * np.pi * 2 * t) + 3 * rng.standard_normal(N_SAMPLES_PER_CH)]))
+    adc[1] = np.clip(adc[1], -350, 350) # Canal 1 pegado al riel en cada pico
+    adc_qc = compute_qc(adc, FS, signal_bands=((1.0, 10.0),))
+    expected = np.count_nonzero(np.abs(adc[1]) == 350) / N_SAMPLES_PER_CH
+    ok = (adc_qc["status"].iloc[0] != "saturado" and adc_qc["clip_ratio"].iloc[0] == 0 and
+          adc_qc["status"].iloc[1] == "saturado" and abs(adc_qc["clip_ratio"].iloc[1] - expected) < 0.01)
+    print(f"[{'OK' if ok else 'ERROR'}] Saturación por tramos en el pico: entero "
+          f"{adc_qc['clip_ratio'].iloc[0]:.4f}, recortado {adc_qc['clip_ratio'].iloc[1]:.4f} "
+          f"(esperado {expected:.4f})")
 
     # 7. Visualización
     plot_spectral_comparison(target_freqs, mag_pre, mag_post)
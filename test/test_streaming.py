@@ -2,6 +2,7 @@
 
 from src.processing.stream_filters import GeophysicalStreamFilter
 from src.acquisition.simulator import generate_geophysical_signal
+from src.visualization.live_monitor import LiveStreamMonitor
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -17,8 +18,11 @@ def run_test():
     CHUNK_SIZE = int(FS * CHUNK_DURATION)
 
     stream_filter = GeophysicalStreamFilter(fs=FS)
-    full_raw = []
-    full_filtered = []
+
+    # Monitor en vivo: buffer circular fijo (10 s) + blitting a 10 fps
+    target_freqs = np.array([2.0, 10.0, 60.0, 120.0, 240.0], dtype=np.float32)
+    monitor = LiveStreamMonitor(fs=FS, window_sec=10.0, spectrum_freqs=target_freqs, fps=10.0)
+    plt.show(block=False)
 
     print(f"Iniciando streaming: {TOTAL_CHUNKS} bloques de {CHUNK_SIZE} muestras cada uno...")
 
@@ -26,18 +30,20 @@ def run_test():
     for i in range(TOTAL_CHUNKS):
         # Simulación de llegada de datos
         t, chunk_raw, _ = generate_geophysical_signal(duration=CHUNK_DURATION, fs=FS)
-        
+
         # Procesamiento manteniendo estado interno (memoria del filtro)
         chunk_filtered = stream_filter.process_chunk(chunk_raw)
-        
-        # Acumulación para QA final
-        full_raw.extend(chunk_raw)
-        full_filtered.extend(chunk_filtered)
+
+        # QC en vivo: memoria constante sin importar la duración de la adquisición
+        monitor.update(chunk_raw, chunk_filtered)
         print(f"Bloque {i+1}/{TOTAL_CHUNKS} [OK]")
 
-    # 3. Visualización delegada
-    plot_streaming_results(full_raw, full_filtered, FS, CHUNK_SIZE)
+    stats = monitor.summary()
+    print(f"Frames: {stats['frames']} | Tiempo medio por frame: {stats['mean_frame_s'] * 1000:.2f} ms")
+
+    # 3. Visualización delegada (contenido del buffer circular)
+    plot_streaming_results(monitor.raw.latest()[0], monitor.filtered.latest()[0], FS, CHUNK_SIZE)
     plt.show()
 
 if __name__ == "__main__":
-    run_test()
\ No newline at end of file
+    run_test()
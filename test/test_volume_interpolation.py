@@ -0,0 +1,104 @@
+# test\test_volume_interpolation.py
+import time
+import numpy as np
+
+from src.processing.cpp_bridge import c_interpolate_volume
+from src.processing.geophysics import forward_mt_1d
+from src.visualization.lod import VolumePyramid
+from src.visualization.render_3d import (_PYRAMID_CACHE, build_resistivity_volume, render_dynamic_slicing,
+                                         volume_lod_grid)
+
+def run_volume_test():
+    # 1. Configuración: levantamiento 3D de 300 estaciones dispersas
+    N_STATIONS = 300
+    AREA_M = 5000.0
+    freqs = np.logspace(0.5, 3, 40).astype(np.float32)
+    rng = np.random.default_rng(42)
+    station_xy = rng.uniform(0, AREA_M, (N_STATIONS, 2)).astype(np.float32)
+
+    # 2. Sondeos sintéticos: un conductor circular en el centro del área
+    dist = np.hypot(station_xy[:, 0] - AREA_M / 2, station_xy[:, 1] - AREA_M / 2)
+    models = np.tile([100.0, 100.0, 1000.0], (N_STATIONS, 1))
+    models[:, 1] = np.where(dist < AREA_M / 5, 5.0, 100.0)
+    rho_matrix, _ = forward_mt_1d(models, [300.0, 1000.0], freqs)
+
+    # 3. Interpolación 3D (IDW + índice espacial en C++)
+    print(f"Interpolando volumen desde {N_STATIONS} estaciones...")
+    start_t = time.perf_counter()
+    grid = build_resistivity_volume(station_xy, freqs, rho_matrix, grid_shape=(150, 150))
+    print(f"Volumen de {grid.n_points:,} puntos en: {time.perf_counter() - start_t:.4f}s")
+
+    # 4. Mallas independientes: un segundo volumen con los mismos ejes no pisa al primero
+    rho_before = np.array(grid.point_data["Resistividad"])
+    other = build_resistivity_volume(station_xy, freqs, rho_matrix * 10, grid_shape=(150, 150))
+    ok = other is not grid and np.array_equal(grid.point_data["Resistividad"], rho_before)
+    print(f"[{'OK' if ok else 'ERROR'}] Mallas de build_resistivity_volume con escalares propios")
+
+    # 5. Pirámide LOD: ejes impares conservan la última muestra y la pirámide se reutiliza
+    x = np.linspace(0, AREA_M, 151, dtype=np.float32)
+    y = np.linspace(0, AREA_M, 75, dtype=np.float32)
+    z = np.log10(freqs)
+    volume = np.asarray(grid.point_data["Resistividad"]).reshape(len(z), 150, 150)[:, :75, :]
+    volume = np.concatenate([volume, volume[:, :, -1:]], axis=2) # (40, 75, 151)
+    pyramid = VolumePyramid(x, y, z, volume)
+    lx, ly, lz, lvol = pyramid.level(1)
+    corner = 10 ** np.log10(volume[:, -1, -1]).reshape(-1, 2).mean(axis=1) # Solo Z (par) se promedia
+    ok = (lvol.shape == (len(lz), len(ly), len(lx)) == (20, 38, 76) and lx[-1] == x[-1] and ly[-1] == y[-1]
+          and np.allclose(lvol[:, -1, -1], corner, rtol=1e-4))
+    print(f"[{'OK' if ok else 'ERROR'}] Nivel 1 {lvol.shape}: bordes impares conservados "
+          f"(x hasta {lx[-1]:.0f} m, y hasta {ly[-1]:.0f} m)")
+
+    n_cached = len(_PYRAMID_CACHE)
+    start_t = time.perf_counter()
+    first = volume_lod_grid(x, y, z, volume, viewport_px=80)
+    first_ms = (time.perf_counter() - start_t) * 1000
+    start_t = time.perf_counter()
+    second = volume_lod_grid(x, y, z, volume, viewport_px=80)
+    second_ms = (time.perf_counter() - start_t) * 1000
+    third = volume_lod_grid(x, y, z, volume * 2, viewport_px=80) # Otro arreglo: otra pirámide
+    ok = (len(_PYRAMID_CACHE) == n_cached + 2 and first is not second and
+          np.array_equal(first.point_data["Resistividad"], second.point_data["Resistividad"]) and
+          np.allclose(third.point_data["Resistividad"], 2 * first.point_data["Resistividad"], rtol=1e-5))
+    print(f"[{'OK' if ok else 'ERROR'}] volume_lod_grid: {first.dimensions} puntos, "
+          f"1ª llamada {first_ms:.2f} ms, 2ª (pirámide en caché) {second_ms:.2f} ms")
+
+    # 6. Entradas inválidas: error de Python, no lecturas fuera de rango en C++
+    gx = np.linspace(0, AREA_M, 10, dtype=np.float32)
+    invalid = [("k_neighbors=0", (station_xy, rho_matrix, gx, gx, 0)),
+               ("sin estaciones", (np.empty((0, 2), np.float32), np.empty((0, len(freqs)), np.float32), gx, gx, 8))]
+    for label, args in invalid:
+        try:
+            c_interpolate_volume(*args, copy=True)
+            print(f"[ERROR] c_interpolate_volume aceptó {label}")
+        except ValueError as e:
+            print(f"[OK] c_interpolate_volume rechaza {label}: {e}")
+
+    # 6b. Geometrías degeneradas y malla mucho más grande que el área de estaciones:
+    #     la búsqueda debe terminar y coincidir con IDW por fuerza bruta
+    def brute_idw(xy, values, grid_x, grid_y, k, power=2.0):
+        px, py = np.meshgrid(grid_x, grid_y)
+        d2 = (px[..., None] - xy[:, 0]) ** 2 + (py[..., None] - xy[:, 1]) ** 2  # (ny, nx, n_st)
+        nearest = np.argsort(d2, axis=-1, kind="stable")[..., :k]
+        w = np.take_along_axis(d2, nearest, -1) ** (-power / 2)
+        return np.einsum("yxk,yxkz->zyx", w, values[nearest]) / w.sum(-1)[None]
+
+    wide = np.linspace(-50 * AREA_M, 50 * AREA_M, 40, dtype=np.float32)
+    degenerate = [
+        ("1 estación", station_xy[:1], rho_matrix[:1]),
+        ("3 estaciones coincidentes", np.repeat(station_xy[:1], 3, axis=0), rho_matrix[:3]),
+        ("malla 100x el área", station_xy[:40], rho_matrix[:40]),
+    ]
+    for label, xy, values in degenerate:
+        start_t = time.perf_counter()
+        vol = c_interpolate_volume(xy, values, wide, wide, 8, 2.0, copy=True)
+        ms = (time.perf_counter() - start_t) * 1000
+        ref = brute_idw(xy.astype(np.float64), values.astype(np.float64), wide, wide, min(8, len(xy)))
+        err = np.max(np.abs(vol - ref) / ref)
+        print(f"[{'OK' if err < 1e-4 else 'ERROR'}] IDW con {label}: {ms:.2f} ms | "
+              f"desvío vs fuerza bruta {err:.1e}")
+
+    # 7. Visualización con corte dinámico
+    render_dynamic_slicing(freqs, rho_matrix, station_xy=station_xy, grid_shape=(150, 150))
+
+if __name__ == "__main__":
+    run_volume_test()
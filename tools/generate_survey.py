@@ -0,0 +1,49 @@
+# tools\generate_survey.py
+"""
+Levantamientos sintéticos grandes para pruebas de carga (ver src/acquisition/survey_generator.py).
+
+    python tools/generate_survey.py data/raw/survey_10h.raw --hours 10 --stations 12
+    python tools/generate_survey.py data/raw/grid.raw --minutes 30 --layout grid --nx 4 --ny 3
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.acquisition.survey_generator import grid_layout, line_layout, make_spec, write_survey
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GIF - Generador de levantamientos sintéticos")
+    parser.add_argument("filename", help="Archivo .raw de salida (se escribe además un .raw.json)")
+    parser.add_argument("--hours", type=float, default=0.0)
+    parser.add_argument("--minutes", type=float, default=0.0)
+    parser.add_argument("--seconds", type=float, default=0.0)
+    parser.add_argument("--fs", type=int, default=24000)
+    parser.add_argument("--layout", choices=("line", "grid"), default="line")
+    parser.add_argument("--stations", type=int, default=12, help="Estaciones del perfil (layout line)")
+    parser.add_argument("--nx", type=int, default=4)
+    parser.add_argument("--ny", type=int, default=3)
+    parser.add_argument("--spacing", type=float, default=100.0, help="Separación entre estaciones (m)")
+    parser.add_argument("--components", default="E,H", help="Canales por estación, ej. Ex,Ey,Hx,Hy")
+    parser.add_argument("--rho", type=float, default=100.0, help="Resistividad del semiespacio (Ohm-m)")
+    parser.add_argument("--line-freq", type=float, default=60.0)
+    parser.add_argument("--spikes-per-min", type=float, default=2.0)
+    parser.add_argument("--chunk-sec", type=float, default=10.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    duration = args.hours * 3600 + args.minutes * 60 + args.seconds or 60.0
+    components = tuple(c.strip() for c in args.components.split(",") if c.strip())
+    if args.layout == "line":
+        layout = line_layout(args.stations, args.spacing, components, rho=args.rho)
+    else:
+        layout = grid_layout(args.nx, args.ny, args.spacing, components, rho=args.rho)
+
+    spec = make_spec(layout, fs=args.fs, duration_sec=duration, chunk_sec=args.chunk_sec,
+                     seed=args.seed, line_freq=args.line_freq,
+                     spike_rate_per_min=args.spikes_per_min)
+    write_survey(args.filename, spec, n_workers=args.workers)
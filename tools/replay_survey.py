@@ -0,0 +1,54 @@
+# tools\replay_survey.py
+"""
+Reproduce un levantamiento grabado en tiempo real y mide la latencia por bloque
+(ver src/processing/replay.py).
+
+    python tools/replay_survey.py data/raw/survey_10h.raw                     # tiempo real, 10 s por caso
+    python tools/replay_survey.py data/raw/survey_10h.raw --speed 4 --chunks 1200 2400
+    python tools/replay_survey.py data/raw/survey_24ch.raw --channels 24 --fs 24000 --paths stream
+
+El resultado (percentiles, deadlines perdidos e histogramas) se guarda en JSON.
+El proceso termina con código 1 si algún caso perdió deadlines.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.processing.benchmark import save_results
+from src.processing.replay import REPLAY_PATHS, print_replay_report, run_replay_sweep
+
+REPLAY_DIR = os.path.join("build", "replay")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="GIF - Replay en tiempo real con latencias")
+    parser.add_argument("filename", help="Archivo .raw canal-tras-canal")
+    parser.add_argument("--channels", type=int, default=None, help="Canales (si no hay .raw.json)")
+    parser.add_argument("--fs", type=int, default=None, help="Frecuencia de muestreo (si no hay .raw.json)")
+    parser.add_argument("--paths", nargs="+", choices=REPLAY_PATHS, default=list(REPLAY_PATHS))
+    parser.add_argument("--chunks", type=int, nargs="+", default=[240, 1200, 2400, 12000],
+                        help="Tamaños de bloque a barrer (muestras por canal)")
+    parser.add_argument("--threads", type=int, nargs="+", default=None,
+                        help="Hilos OpenMP a barrer (por defecto: 1 y todos los núcleos)")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Múltiplo del tiempo real (0 = sin ritmo de reloj)")
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de señal por caso")
+    parser.add_argument("--start", type=float, default=0.0, help="Segundo del archivo donde empezar")
+    parser.add_argument("--output", default=None, help="JSON de resultados")
+    args = parser.parse_args()
+
+    print(f"--- Replay de {args.filename} a {args.speed:g}x ---")
+    report = run_replay_sweep(args.filename, paths=args.paths, chunk_samples=args.chunks,
+                              threads=args.threads, speed=args.speed, duration=args.duration,
+                              start_sec=args.start, n_channels=args.channels, fs=args.fs)
+    print()
+    print_replay_report(report)
+
+    output = args.output or os.path.join(REPLAY_DIR, time.strftime("replay_%Y%m%d_%H%M%S.json"))
+    save_results(report, output)
+    print(f"[OK] Resultados guardados en {output}")
+    sys.exit(1 if any(c["deadline_misses"] for c in report["results"]) else 0)